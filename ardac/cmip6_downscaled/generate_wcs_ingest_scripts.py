@@ -1,6 +1,11 @@
 #!/usr/bin/env python3
-import json
 import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "utilities" / "recipe_builder"))
+
+from recipe_builder import Template, write_recipe  # noqa: E402
 
 netcdf_dir = "/opt/rasdaman-storage/coverage_data/cmip6_downscaled/wcs"
 output_dir = "wcs_ingest_scripts"
@@ -14,6 +19,8 @@ ensemble_models = [
     "TaiESM1",
 ]
 
+template = Template("wcs_ingest_template.json")
+
 def generate_script(varname, model, scenario):
     kwargs = {
         "varname": varname,
@@ -21,22 +28,8 @@ def generate_script(varname, model, scenario):
         "scenario": scenario
     }
 
-    with open("wcs_ingest_template.json", "r") as file:
-        data = json.load(file)
-
-    coverage_id = data["input"]["coverage_id"].format(**kwargs).replace("-", "_")
-    data["input"]["coverage_id"] = coverage_id
-
-    data["input"]["paths"][0] = data["input"]["paths"][0].format(**kwargs)
-
-    band_name = data["recipe"]["options"]["coverage"]["slicer"]["bands"][0]["name"].format(**kwargs)
-    data["recipe"]["options"]["coverage"]["slicer"]["bands"][0]["name"] = band_name
-
-    band_identifier = data["recipe"]["options"]["coverage"]["slicer"]["bands"][0]["identifier"].format(**kwargs)
-    data["recipe"]["options"]["coverage"]["slicer"]["bands"][0]["identifier"] = band_identifier
-
-    title = data["recipe"]["options"]["coverage"]["metadata"]["global"]["Title"].format(**kwargs)
-    data["recipe"]["options"]["coverage"]["metadata"]["global"]["Title"] = title
+    data = template.render(**kwargs)
+    data["input"]["coverage_id"] = data["input"]["coverage_id"].replace("-", "_")
 
     if model == "6ModelAvg":
         abstract = "6ModelAvg is an equal-weighted mean of: "
@@ -44,10 +37,7 @@ def generate_script(varname, model, scenario):
         data["recipe"]["options"]["coverage"]["metadata"]["global"]["Abstract"] = abstract
 
     output_file = "{varname}_{model}_{scenario}_adjusted.json".format(**kwargs)
-    output_path = output_dir + "/" + output_file
-
-    with open(output_path, "w") as file:
-        json.dump(data, file, indent=4)
+    write_recipe(data, output_dir + "/" + output_file)
 
 os.makedirs(output_dir, exist_ok=True)
 
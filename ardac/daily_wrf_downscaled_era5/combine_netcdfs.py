@@ -1,12 +1,39 @@
 import glob
+import json
 import time
 import os
 import sys
 
+import numpy as np
 import xarray as xr
 from dask.distributed import Client, LocalCluster
 
 
+def time_index_path(merged_file):
+    return os.path.splitext(merged_file)[0] + "_time.json"
+
+
+def write_time_index(merged_file):
+    """
+    Writes the merged file's time axis as a JSON list of "%Y-%m-%dT%H:%M" strings next to it (<name>_time.json).
+    Recipes generated with `generate_ingest_recipes.py --time-index` read their directPositions from this list
+    instead of calling netCDF4.num2date for every day of the series inside wcst_import.
+    """
+    index_file = time_index_path(merged_file)
+    with xr.open_dataset(merged_file, engine="netcdf4") as ds:
+        times = ds["time"].values
+
+    if np.issubdtype(times.dtype, np.datetime64):
+        positions = np.datetime_as_string(times, unit="m").tolist()
+    else:
+        # non-standard calendars decode to cftime objects, which numpy can't format
+        positions = [t.strftime("%Y-%m-%dT%H:%M") for t in times]
+
+    with open(index_file, "w") as f:
+        json.dump(positions, f)
+    print(f"Wrote {len(positions)} time positions to {index_file}")
+
+
 def merge_netcdfs(variable_name):
     """
     Merges yearly NetCDF files to create a single NetCDF file before ingesting into rasdaman.
@@ -70,6 +97,7 @@ def merge_netcdfs(variable_name):
                     10
                 )  # CP note: yeah I'm just sprinkling random sleeps in here for stability
 
+        write_time_index(output_file)
         print("Preprocessing complete. Merged file created successfully.")
 
     except Exception as e:
@@ -77,8 +105,12 @@ def merge_netcdfs(variable_name):
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python combine_netcdfs.py <variable_name>")
+    if len(sys.argv) not in (2, 3) or sys.argv[2:] not in ([], ["--time-index-only"]):
+        print("Usage: python combine_netcdfs.py <variable_name> [--time-index-only]")
         sys.exit(1)
+    if sys.argv[2:] == ["--time-index-only"]:
+        # for files merged before the time index existed
+        write_time_index(f"{sys.argv[1]}_merged.nc")
+        sys.exit(0)
     merge_netcdfs(sys.argv[1])
     time.sleep(10)
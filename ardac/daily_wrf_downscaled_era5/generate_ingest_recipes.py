@@ -0,0 +1,260 @@
+"""
+Generate the WMS and WCS ingest recipes for every daily ERA5 4km variable:
+  {var}_ingest.json           coverage era5_4km_daily_{var}, wms_import plus the ARDAC style hook
+  {var}_ingest_wcs_only.json  coverage era5_4km_daily_{var}_wcs, tiled for time-series reads
+Edit VARIABLES or the tilings below and rerun instead of editing the JSON files by hand.
+
+--time-index makes the time axis read its directPositions from the {var}_merged_time.json list that
+combine_netcdfs.py writes (or `combine_netcdfs.py <var> --time-index-only` for files merged before it did),
+instead of decoding every day of the series with num2date inside wcst_import.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "utilities" / "recipe_builder"))
+
+from recipe_builder import (  # noqa: E402
+    ansidate_axis,
+    band,
+    netcdf_recipe,
+    regular_axis,
+    style_hook,
+    tiling_clause,
+    wcs_twin,
+    wms_twin,
+    write_recipe,
+)
+
+
+CONFIG = {
+    "service_url": "https://localhost/rasdaman/ows",
+    "tmp_directory": "/tmp/",
+    "crs_resolver": "http://localhost:8080/def/",
+    "default_crs": "http://localhost:8080/def/crs/EPSG/0/3338",
+    "default_null_values": ["nan"],
+    "mock": False,
+    "automated": True,
+}
+
+CRS = 'OGC/0/AnsiDate?axis-label="time"@EPSG/0/3338'
+
+# whole daily maps for WMS, 8x8-cell columns over the full time series for WCS point queries
+# (the WCS clause keeps the upper-case keyword the existing recipes were ingested with)
+WMS_TILING = tiling_clause([None, None, None], 4194304)
+WCS_TILING = tiling_clause([None, 8, 8], 8388608).replace("tile size", "TILE SIZE")
+
+# WCS recipes that read their merged file from somewhere other than next to the recipe
+WCS_PATHS = {
+    "rainnc_sum": "/opt/rasdaman-storage/coverage_data/wrf_downscaled_era5_4km/rainnc_sum/rainnc_sum_merged.nc",
+}
+
+
+def ramp(color_table: dict) -> dict:
+    return {"type": "ramp", "colorTable": color_table}
+
+
+PRECIPITATION = ramp(
+    {
+        "0": [255, 255, 255, 255],
+        "1": [198, 219, 239, 255],
+        "5": [158, 202, 225, 255],
+        "10": [107, 174, 214, 255],
+        "20": [66, 146, 198, 255],
+        "30": [33, 113, 181, 255],
+        "40": [8, 81, 156, 255],
+        "60": [0, 104, 55, 255],
+        "80": [255, 191, 0, 255],
+        "100": [255, 127, 0, 255],
+        "150": [255, 0, 0, 255],
+        "9999": [0, 0, 0, 0],
+    }
+)
+
+RELATIVE_HUMIDITY = ramp(
+    {
+        "0": [139, 69, 19, 255],
+        "20": [205, 133, 63, 255],
+        "40": [244, 164, 96, 255],
+        "60": [230, 230, 250, 255],
+        "70": [173, 216, 230, 255],
+        "80": [135, 206, 235, 255],
+        "90": [70, 130, 180, 255],
+        "100": [25, 25, 112, 255],
+        "9999": [0, 0, 0, 0],
+    }
+)
+
+# kept as the exact definition text the seaice_max style was registered with (spaced arrays and all), so
+# regenerating the recipe doesn't change the style rasdaman stores
+SEA_ICE = (
+    '{"type":"ramp","colorTable":{"0":[0,0,0,0],"0.2":[0, 72, 110, 255],"0.4":[0, 109, 155, 255],'
+    '"0.6":[66, 144, 185, 255],"0.8":[144, 192, 216, 255],"1.0":[202, 234, 245, 255],"9999":[0,0,0,0]}}'
+)
+
+TEMPERATURE = ramp(
+    {
+        "-40": [59, 76, 192, 255],
+        "-20": [155, 178, 232, 255],
+        "0": [247, 247, 247, 255],
+        "15": [252, 187, 161, 255],
+        "30": [214, 96, 77, 255],
+        "9999": [0, 0, 0, 0],
+    }
+)
+
+WIND_DIRECTION = ramp(
+    {
+        "0": [255, 0, 0, 255],
+        "45": [255, 255, 0, 255],
+        "90": [0, 255, 0, 255],
+        "135": [0, 255, 255, 255],
+        "180": [0, 0, 255, 255],
+        "225": [255, 0, 255, 255],
+        "270": [128, 0, 128, 255],
+        "315": [255, 128, 0, 255],
+        "360": [255, 0, 0, 255],
+        "9999": [0, 0, 0, 0],
+    }
+)
+
+WIND_SPEED = ramp(
+    {
+        "0": [255, 255, 255, 255],
+        "2": [199, 233, 180, 255],
+        "5": [127, 205, 187, 255],
+        "10": [65, 182, 196, 255],
+        "15": [44, 127, 184, 255],
+        "20": [37, 52, 148, 255],
+        "25": [255, 255, 191, 255],
+        "30": [254, 224, 144, 255],
+        "35": [253, 174, 97, 255],
+        "40": [244, 109, 67, 255],
+        "50": [215, 48, 39, 255],
+        "60": [165, 0, 38, 255],
+        "9999": [0, 0, 0, 0],
+    }
+)
+
+# variable: (coverage title, style name, style abstract, colormap)
+VARIABLES = {
+    "rainnc_sum": (
+        "Daily Sum of Precipitation",
+        "Daily Total Precipitation",
+        "Daily Total 2m Precipitation",
+        PRECIPITATION,
+    ),
+    "rh2_max": (
+        "Daily Maximum 2m Relative Humidity",
+        "Daily Maximum Relative Humidity",
+        "Daily Maximum Relative Humidity",
+        RELATIVE_HUMIDITY,
+    ),
+    "rh2_mean": (
+        "Daily Mean 2m Relative Humidity",
+        "Daily Mean Relative Humidity",
+        "Daily Mean Relative Humidity",
+        RELATIVE_HUMIDITY,
+    ),
+    "rh2_min": (
+        "Daily Minimum 2m Relative Humidity",
+        "Daily Minimum Relative Humidity",
+        "Daily Minimum Relative Humidity",
+        RELATIVE_HUMIDITY,
+    ),
+    "seaice_max": (
+        "Daily Maximum Sea Ice Concentration",
+        "Daily Maximum Sea Ice Concentration",
+        "Daily Maximum Sea Ice Concentration",
+        SEA_ICE,
+    ),
+    "t2_max": (
+        "Daily Maximum 2m Temperature",
+        "Daily Maximum 2m Temperature",
+        "Daily Maximum 2m Temperature",
+        TEMPERATURE,
+    ),
+    "t2_mean": (
+        "Daily Mean 2m Temperature",
+        "Daily Mean 2m Temperature",
+        "Daily Mean 2m Temperature",
+        TEMPERATURE,
+    ),
+    "t2_min": (
+        "Daily Minimum 2m Temperature",
+        "Daily Minimum 2m Temperature",
+        "Daily Minimum 2m Temperature",
+        TEMPERATURE,
+    ),
+    "wdir10_mean": (
+        "Daily Mean 10m Wind Direction",
+        "Daily Mean 10m Wind Direction",
+        "Daily Mean 10m Wind Direction",
+        WIND_DIRECTION,
+    ),
+    "wspd10_max": (
+        "Daily Maximum 10m Wind Speed",
+        "Daily Maximum 10m Wind Speed",
+        "Daily Maximum 10m Wind Speed",
+        WIND_SPEED,
+    ),
+    "wspd10_mean": (
+        "Daily Mean 10m Wind Speed",
+        "Daily Mean 10m Wind Speed",
+        "Daily Mean 10m Wind Speed",
+        WIND_SPEED,
+    ),
+}
+
+
+def generate(var: str, out_dir: Path, time_index: bool = False, wcs_path: Optional[str] = None) -> None:
+    """Write both recipes for one variable; `wcs_path` overrides the WCS recipe's input file."""
+    title, style_name, abstract, colormap = VARIABLES[var]
+    coverage_id = f"era5_4km_daily_{var}"
+    base = netcdf_recipe(
+        coverage_id,
+        paths=[f"{var}_merged.nc"],
+        crs=CRS,
+        axes={
+            "time": ansidate_axis("time", 0, time_index=time_index),
+            "X": regular_axis("x", 2),
+            "Y": regular_axis("y", 1),
+        },
+        bands=[band(var)],
+        title=f"'{title}'",
+        config=CONFIG,
+    )
+    hook = style_hook(
+        coverage_id,
+        f"ardac_{var}_daily",
+        f"{abstract} (ERA5 4km)",
+        colormap,
+        f"Create {style_name} WMS style for ARDAC",
+    )
+    write_recipe(wms_twin(base, WMS_TILING, [hook]), out_dir / f"{var}_ingest.json")
+    wcs = wcs_twin(base, WCS_TILING)
+    if wcs_path:
+        wcs["input"]["paths"] = [wcs_path]
+    write_recipe(wcs, out_dir / f"{var}_ingest_wcs_only.json")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the daily ERA5 4km ingest recipes.")
+    parser.add_argument("variables", nargs="*", help="Variables to generate (default: all)")
+    parser.add_argument(
+        "--time-index",
+        action="store_true",
+        help="Read time positions from the precomputed <var>_merged_time.json instead of num2date",
+    )
+    args = parser.parse_args()
+
+    unknown = [v for v in args.variables if v not in VARIABLES]
+    if unknown:
+        print(f"Unknown variable(s): {', '.join(unknown)}", file=sys.stderr)
+        sys.exit(1)
+    out_dir = Path(__file__).resolve().parent
+    for var in args.variables or VARIABLES:
+        generate(var, out_dir, args.time_index, WCS_PATHS.get(var))
+        print(f"Wrote {var}_ingest.json and {var}_ingest_wcs_only.json")
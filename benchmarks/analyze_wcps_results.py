@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Analyze WCPS (ProcessCoverages) benchmark results and summarize latency per coverage and query class.
+The coverage comes from each query's "for $c in (ID)" clause; the query class (time_average, ensemble_mean, ...)
+is looked up in the request CSV from build_wcps_benchmark_requests.py.
+"""
+
+import argparse
+import sys
+
+import pandas as pd
+
+from benchlib.results import p50, p95, p99, throughput_bps, to_bool_success, to_num
+from benchlib.tables import parquet_error, read_table, write_table
+from benchlib.urls import extract_query_param_series, extract_wcps_coverage_series
+from benchlib.warmup import mark_warmup, parse_warmup
+
+
+def query_classes(urls: pd.Series, requests_path: str) -> pd.Series:
+    """
+    Query class per result row, matched on the decoded WCPS query text so it doesn't matter how the runner
+    re-encoded the URL. Rows whose query isn't in the request CSV (or without one) are "unknown".
+    """
+    try:
+        requests = read_table(requests_path, ["query_class", "wcps_query"])
+    except Exception as exc:
+        print(f"[WARN] Failed to read {requests_path} ({exc}); query classes are unknown.")
+        return pd.Series("unknown", index=urls.index)
+    keys = extract_query_param_series("?" + requests["wcps_query"].astype(str), "QUERY")
+    lookup = dict(zip(keys, requests["query_class"]))
+    return extract_query_param_series(urls, "QUERY").map(lookup).fillna("unknown")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Summarize WCPS benchmark results by coverage and query class.")
+    ap.add_argument(
+        "--results",
+        default="wcps_benchmark_results.csv",
+        help="JMeter-style CSV results (default: wcps_benchmark_results.csv)",
+    )
+    ap.add_argument(
+        "--requests",
+        default="zeus_wcps_benchmark_requests.csv",
+        help="Request CSV from build_wcps_benchmark_requests.py, for the query classes",
+    )
+    ap.add_argument("--coverages", default="zeus_coverages.csv", help="Coverage metadata CSV")
+    ap.add_argument(
+        "--out-summary",
+        default="wcps_results_summary.csv",
+        help="Output CSV for the per-coverage, per-class summary",
+    )
+    ap.add_argument(
+        "--warmup",
+        default="auto",
+        help="Warm-up samples to exclude per coverage: auto (detect, the default), none, or a fixed count",
+    )
+    args = ap.parse_args()
+
+    try:
+        warmup = parse_warmup(args.warmup)
+    except ValueError:
+        print("[ERROR] --warmup must be auto, none or a non-negative integer.", file=sys.stderr)
+        return 2
+    error = parquet_error(args.results, args.requests, args.coverages, args.out_summary)
+    if error:
+        print(f"[ERROR] {error}", file=sys.stderr)
+        return 2
+
+    try:
+        df = read_table(args.results)
+    except Exception as exc:
+        print(f"[ERROR] Failed to read results CSV: {exc}", file=sys.stderr)
+        return 2
+    if "URL" not in df.columns:
+        print("[ERROR] results CSV missing URL column.", file=sys.stderr)
+        return 2
+
+    df["coverageId"] = extract_wcps_coverage_series(df["URL"])
+    df = df[df["coverageId"].notna()].copy()
+    if df.empty:
+        print("[ERROR] No WCPS queries could be parsed from results.", file=sys.stderr)
+        return 2
+    df["query_class"] = query_classes(df["URL"], args.requests)
+
+    df["success"] = to_bool_success(df["success"]) if "success" in df.columns else True
+    df["elapsed_ms"] = to_num(df.get("elapsed"))
+    df["latency_ms"] = to_num(df.get("Latency" if "Latency" in df.columns else "elapsed"))
+    df["bytes"] = to_num(df.get("bytes"))
+    df["throughput_bps"] = throughput_bps(df["bytes"], df["elapsed_ms"])
+    # open-loop runs from load_generator.py: add the send delay back (coordinated omission)
+    if "scheduleLag" in df.columns:
+        df["latency_ms"] = df["latency_ms"] + to_num(df["scheduleLag"]).fillna(0)
+
+    # the first queries against a coverage read cold tiles whatever their class; leave them out of the latency stats
+    df = mark_warmup(df, warmup)
+    df_all = df
+    df = df[~df["warmup"]]
+    if df.empty:
+        print("[ERROR] No rows to analyze after filtering.", file=sys.stderr)
+        return 2
+    excluded = int(df_all["warmup"].sum())
+    if excluded:
+        print(f"Excluded {excluded} warm-up samples.")
+
+    keys = ["coverageId", "query_class"]
+    counts = df_all.groupby(keys).agg(
+        count_total=("coverageId", "size"),
+        count_success=("success", "sum"),
+        success_rate=("success", "mean"),
+    )
+    # latency of failed queries says little about the aggregation cost
+    ok = df[df["success"]]
+    summary = ok.groupby(keys).agg(
+        count_used=("coverageId", "size"),
+        latency_mean_ms=("latency_ms", "mean"),
+        latency_p50_ms=("latency_ms", p50),
+        latency_p95_ms=("latency_ms", p95),
+        latency_p99_ms=("latency_ms", p99),
+        bytes_mean=("bytes", "mean"),
+        throughput_mean_bps=("throughput_bps", "mean"),
+    )
+    summary = counts.join(summary, how="left").reset_index()
+
+    if args.coverages:
+        try:
+            cov = read_table(args.coverages)
+            cols = [c for c in ["coverageId", "size_bytes", "num_dimensions", "axisList"] if c in cov.columns]
+            summary = summary.merge(cov[cols].drop_duplicates(subset=["coverageId"]), on="coverageId", how="left")
+        except Exception as exc:
+            print(f"[WARN] Failed to read/merge coverages CSV: {exc}")
+
+    for col in [
+        "latency_mean_ms",
+        "latency_p50_ms",
+        "latency_p95_ms",
+        "latency_p99_ms",
+        "bytes_mean",
+        "throughput_mean_bps",
+    ]:
+        summary[col] = summary[col].round(0).astype("Int64")
+    summary["success_rate"] = summary["success_rate"].round(2)
+    write_table(summary, args.out_summary)
+
+    by_class = df_all.groupby("query_class").agg(
+        count_total=("query_class", "size"), success_rate=("success", "mean")
+    )
+    by_class = by_class.join(
+        ok.groupby("query_class").agg(
+            latency_p50_ms=("latency_ms", p50),
+            latency_p95_ms=("latency_ms", p95),
+            bytes_mean=("bytes", "mean"),
+        )
+    )
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(by_class.round({"success_rate": 2, "latency_p50_ms": 0, "latency_p95_ms": 0, "bytes_mean": 0}))
+    print(f"[OK] Wrote summary: {args.out_summary}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the result analyzers' column parsing: compares the old row-wise throughput/success parsing
+with the vectorized versions in benchlib/results.py on a synthetic JMeter-style results file, and checks that both
+produce the same output.
+"""
+
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchlib.results import parse_success_value, throughput_bps, to_bool_success, to_num
+
+
+def legacy_throughput(df: pd.DataFrame) -> pd.Series:
+    """Row-wise throughput as the analyzers computed it before benchlib.results."""
+    return df.apply(
+        lambda r: (
+            (r["bytes"] / (r["elapsed_ms"] / 1000.0))
+            if r["elapsed_ms"] and r["elapsed_ms"] > 0
+            else math.nan
+        ),
+        axis=1,
+    )
+
+
+def legacy_success(series: pd.Series) -> pd.Series:
+    """Per-value success parsing as the analyzers did it before benchlib.results."""
+    return series.map(parse_success_value).astype(bool)
+
+
+def synthetic_results(rows: int, seed: int) -> pd.DataFrame:
+    """
+    Build a results frame shaped like a JMeter CSV. A few blank success values keep the column as object dtype,
+    which is what a real results file with error rows reads back as.
+    """
+    rng = np.random.default_rng(seed)
+    elapsed = rng.lognormal(5, 1, rows).round()
+    elapsed[rng.random(rows) < 0.001] = 0
+    success = np.where(rng.random(rows) < 0.98, "true", "false").astype(object)
+    success[rng.random(rows) < 0.0005] = ""
+    return pd.DataFrame(
+        {
+            "elapsed": elapsed,
+            "bytes": rng.integers(200, 5_000_000, rows),
+            "success": success,
+        }
+    )
+
+
+def timed(label: str, fn):
+    start = time.perf_counter()
+    out = fn()
+    seconds = time.perf_counter() - start
+    print(f"{label:<32} {seconds:8.3f}s")
+    return out, seconds
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="Benchmark row-wise vs vectorized results parsing."
+    )
+    ap.add_argument("--rows", type=int, default=5_000_000, help="Synthetic rows (default: 5000000)")
+    ap.add_argument("--seed", type=int, default=0, help="Random seed")
+    ap.add_argument(
+        "--results",
+        default=None,
+        help="Benchmark an existing results CSV instead of a synthetic one",
+    )
+    ap.add_argument(
+        "--skip-legacy-throughput",
+        action="store_true",
+        help="Skip the row-wise throughput baseline, which takes minutes at 5M rows",
+    )
+    args = ap.parse_args()
+
+    if args.results:
+        path = args.results
+        cleanup = False
+    else:
+        print(f"Writing {args.rows} synthetic rows...", file=sys.stderr)
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        os.close(fd)
+        synthetic_results(args.rows, args.seed).to_csv(path, index=False)
+        cleanup = True
+
+    try:
+        df = pd.read_csv(path, usecols=["elapsed", "bytes", "success"])
+    finally:
+        if cleanup:
+            os.remove(path)
+
+    df["elapsed_ms"] = to_num(df["elapsed"])
+    df["bytes"] = to_num(df["bytes"])
+    print(f"{len(df)} rows, success dtype {df['success'].dtype}")
+
+    new_success, t_new_success = timed("to_bool_success (vectorized)", lambda: to_bool_success(df["success"]))
+    old_success, t_old_success = timed("to_bool_success (row-wise)", lambda: legacy_success(df["success"]))
+    if not new_success.equals(old_success):
+        print("[ERROR] success parsing results differ", file=sys.stderr)
+        return 1
+    print(f"success speedup: {t_old_success / t_new_success:.1f}x")
+
+    new_tp, t_new_tp = timed("throughput_bps (vectorized)", lambda: throughput_bps(df["bytes"], df["elapsed_ms"]))
+    if not args.skip_legacy_throughput:
+        old_tp, t_old_tp = timed("throughput_bps (row-wise)", lambda: legacy_throughput(df))
+        if not np.allclose(new_tp.to_numpy(), old_tp.to_numpy(), equal_nan=True):
+            print("[ERROR] throughput results differ", file=sys.stderr)
+            return 1
+        print(f"throughput speedup: {t_old_tp / t_new_tp:.1f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
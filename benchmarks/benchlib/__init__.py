@@ -0,0 +1,4 @@
+"""
+Shared helpers for the benchmark scripts in this directory.
+The scripts are run from the benchmarks directory, so `benchlib` is importable without installing anything.
+"""
@@ -0,0 +1,234 @@
+"""
+Helpers for reading zeus_coverages.csv rows when building benchmark requests.
+"""
+
+import json
+import math
+import random
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+
+SPATIAL_AXES = {"x", "y", "lon", "lat"}
+TIME_AXES = {"time", "ansi", "date", "unix", "t"}
+
+
+def spatial_spec_from_row(row: pd.Series) -> Optional[Dict[str, object]]:
+    """
+    Derive spatial axes, centroid and EPSG code for a coverage; prefer projected XY when available.
+    Returns None for coverages without recognizable X/Y or lon/lat axes.
+    """
+    axes = [a.strip() for a in str(row["axisList"]).split(",") if a.strip()]
+    if not axes:
+        return None
+
+    axes_lower = {a.lower() for a in axes}
+
+    # Prioritize projected XY coordinates when present.
+    if "x" in axes_lower and "y" in axes_lower:
+        return {
+            "axis_x": "X",
+            "axis_y": "Y",
+            "center_x": float(row["xy_centroid_x"]),
+            "center_y": float(row["xy_centroid_y"]),
+            "is_projected": True,
+            "epsg": str(row["epsg"]),
+            "bounds": bounds_from_row(row, "xy_lower", "xy_upper"),
+        }
+
+    if "lon" in axes_lower and "lat" in axes_lower:
+        return {
+            "axis_x": "lon",
+            "axis_y": "lat",
+            "center_x": float(row["wgs84_centroid_lon"]),
+            "center_y": float(row["wgs84_centroid_lat"]),
+            "is_projected": False,
+            "epsg": "4326",
+            "bounds": bounds_from_row(row, "wgs84_lower", "wgs84_upper"),
+        }
+
+    return None
+
+
+def bounds_from_row(row: pd.Series, lower_col: str, upper_col: str) -> Optional[Tuple[float, float, float, float]]:
+    """(minx, miny, maxx, maxy) from a pair of "x y" corner columns, or None if they are missing."""
+    try:
+        minx, miny = (float(v) for v in str(row[lower_col]).split()[:2])
+        maxx, maxy = (float(v) for v in str(row[upper_col]).split()[:2])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return minx, miny, maxx, maxy
+
+
+def non_spatial_axis_names(axis_list: str) -> List[str]:
+    """Return non-spatial axis names in axisList order."""
+    axes = [a.strip() for a in str(axis_list).split(",") if a.strip()]
+    return [a for a in axes if a.lower() not in SPATIAL_AXES]
+
+
+def is_time_axis(axis: str) -> bool:
+    return axis.strip().lower() in TIME_AXES
+
+
+def json_cell(row: pd.Series, column: str) -> dict:
+    """Decode a JSON-valued cell (blank or missing cells give an empty dict)."""
+    raw = row.get(column)
+    if raw is None or pd.isna(raw) or not str(raw).strip():
+        return {}
+    return json.loads(str(raw))
+
+
+def non_spatial_lower_bounds_from_row(row: pd.Series) -> Dict[str, str]:
+    """Load non-spatial axis lower bounds from the coverage metadata CSV."""
+    return json_cell(row, "non_spatial_lower_bounds")
+
+
+def non_spatial_positions(row: pd.Series) -> Dict[str, List[str]]:
+    """
+    Valid positions along each non-spatial axis, in axis order.
+    Uses the DescribeCoverage columns from get_zeus_capabilities.py --describe when present: listed positions for
+    irregular axes, lower bound plus multiples of the resolution for regular ones. Without them the only known
+    position is the lower bound from GetCapabilities.
+    """
+    lower = non_spatial_lower_bounds_from_row(row)
+    irregular = json_cell(row, "irregular_axes")
+    resolution = json_cell(row, "axis_resolution")
+    grid_axes = [a for a in str(row.get("grid_axes", "") or "").split(",") if a]
+    grid_shape = str(row.get("grid_shape", "") or "").split()
+    sizes = dict(zip(grid_axes, grid_shape))
+
+    out: Dict[str, List[str]] = {}
+    for axis in non_spatial_axis_names(row.get("axisList", "")):
+        if irregular.get(axis):
+            out[axis] = [str(v) for v in irregular[axis]]
+            continue
+        start = lower.get(axis)
+        if start is None:
+            continue
+        try:
+            step = float(resolution[axis])
+            count = int(sizes[axis])
+            first = float(start)
+        except (KeyError, TypeError, ValueError):
+            out[axis] = [str(start)]
+            continue
+        out[axis] = [format_position(first + i * step) for i in range(max(count, 1))]
+    return out
+
+
+def spatial_resolution(row: pd.Series, spec: Dict[str, object]) -> Optional[Tuple[float, float]]:
+    """
+    Absolute cell size along the spec's x and y axes, from the DescribeCoverage axis_resolution column.
+    Returns None when the coverage CSV was built without --describe or the axes aren't listed.
+    """
+    resolution = {k.lower(): v for k, v in json_cell(row, "axis_resolution").items()}
+    try:
+        res_x = abs(float(resolution[str(spec["axis_x"]).lower()]))
+        res_y = abs(float(resolution[str(spec["axis_y"]).lower()]))
+    except (KeyError, TypeError, ValueError):
+        return None
+    if res_x == 0 or res_y == 0:
+        return None
+    return res_x, res_y
+
+
+def format_position(val: float) -> str:
+    return f"{val:.10g}"
+
+
+def subset_value(val: str) -> str:
+    """Format one subset coordinate: numbers as-is, anything else (e.g. ISO timestamps) quoted."""
+    try:
+        float(val)
+        return val
+    except ValueError:
+        return f'"{val}"'
+
+
+def format_coord(val: float, decimals: int) -> str:
+    """Helper to format coordinates to avoid excessive precision."""
+    return f"{val:.{decimals}f}"
+
+
+def keep_optimized_twins(df: pd.DataFrame, suffix: str) -> pd.DataFrame:
+    """
+    Only retain the optimized twin (e.g. "_wcs" or "_wms" suffix) when both base and optimized coverage IDs exist.
+    """
+    s = df["coverageId"].astype(str)
+    # base id = strip the suffix if present
+    base = s.str.replace(rf"{suffix}$", "", regex=True)
+    # keep all suffixed rows; for the others, drop if a suffixed twin exists
+    is_twin = s.str.endswith(suffix)
+    has_twin = base.map(is_twin.groupby(base).any())
+    return df.loc[is_twin | ~has_twin].copy()
+
+
+def jitter_points(
+    center_x: float,
+    center_y: float,
+    radius: float,
+    count: int,
+    rng: random.Random,
+) -> List[Tuple[float, float]]:
+    """Generate random points within a centered bbox."""
+    points: List[Tuple[float, float]] = []
+    minx = center_x - radius
+    maxx = center_x + radius
+    miny = center_y - radius
+    maxy = center_y + radius
+
+    for _ in range(count):
+        # Pick x/y uniformly within the centered bbox:
+        # [center_x - radius, center_x + radius] x [center_y - radius, center_y + radius].
+        x = rng.uniform(minx, maxx)
+        y = rng.uniform(miny, maxy)
+        points.append((x, y))
+    return points
+
+
+def sample_slices(positions: Dict[str, List[str]], rng: random.Random) -> Dict[str, str]:
+    """One randomly chosen position per non-spatial axis, as subset values."""
+    return {axis: subset_value(rng.choice(values)) for axis, values in positions.items() if values}
+
+
+def decimals_for(resolution: float, default: int) -> int:
+    """Enough decimals to place a bbox edge within a quarter cell."""
+    quarter = resolution / 4.0
+    if quarter >= 1:
+        return default
+    return max(default, math.ceil(-math.log10(quarter)))
+
+
+def cell_bbox_subsets(
+    spec: Dict[str, object],
+    x: float,
+    y: float,
+    resolution: Tuple[float, float],
+    cells: int,
+    decimals: int,
+) -> Tuple[Dict[str, str], int, int]:
+    """
+    X/Y range subsets covering `cells` x `cells` grid cells near (x, y).
+    Edges are snapped to the grid (cell edges are counted from the coverage's lower bounds) and inset by a quarter
+    cell, so the server returns exactly the intended cells rather than an extra partially touched row/column.
+    Boxes larger than the coverage are clipped; returns the subsets and the actual cell counts along x and y.
+    """
+    bounds = spec.get("bounds")
+    counts: List[int] = []
+    ranges: List[str] = []
+    for i, (center, res) in enumerate(zip((x, y), resolution)):
+        origin = bounds[i] if bounds else 0.0
+        n = cells
+        first = math.floor((center - origin) / res) - n // 2
+        if bounds:
+            total = max(int(round((bounds[i + 2] - origin) / res)), 1)
+            n = min(cells, total)
+            first = min(max(first, 0), total - n)
+        places = decimals_for(res, decimals)
+        lo = origin + first * res + res / 4.0
+        hi = origin + (first + n) * res - res / 4.0
+        counts.append(n)
+        ranges.append(f"{format_coord(lo, places)},{format_coord(hi, places)}")
+    subsets = {str(spec["axis_x"]): ranges[0], str(spec["axis_y"]): ranges[1]}
+    return subsets, counts[0], counts[1]
@@ -0,0 +1,200 @@
+"""
+Harvest WCS DescribeCoverage documents for the coverages listed in GetCapabilities.
+GetCapabilities only carries bounds, axisList and sizeInBytes. DescribeCoverage adds the grid extent of every axis,
+the resolution of regular axes, the positions along irregular axes (e.g. a time axis with gaps) and the bands with
+their nil values, which is what realistic request generation needs.
+"""
+
+import json
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+import xml.etree.ElementTree as ET
+
+from benchlib.http_cache import HttpCache
+
+
+NS: Dict[str, str] = {
+    "wcs": "http://www.opengis.net/wcs/2.0",
+    "gml": "http://www.opengis.net/gml/3.2",
+    "gmlcov": "http://www.opengis.net/gmlcov/1.0",
+    "gmlrgrid": "http://www.opengis.net/gml/3.3/rgrid",
+    "swe": "http://www.opengis.net/swe/2.0",
+}
+
+DESCRIBE_HEADERS = [
+    "grid_axes",
+    "grid_shape",
+    "grid_cells",
+    "axis_resolution",
+    "irregular_axes",
+    "band_names",
+    "band_count",
+    "nil_values",
+]
+
+# coefficients are space separated, but time coefficients come quoted, e.g. "2001-01-01T00:00:00.000Z"
+TOKEN_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def describe_coverage_url(endpoint: str, coverage_id: str) -> str:
+    return endpoint + "?" + urlencode(
+        {
+            "SERVICE": "WCS",
+            "VERSION": "2.1.0",
+            "REQUEST": "DescribeCoverage",
+            "COVERAGEID": coverage_id,
+        }
+    )
+
+
+def split_tokens(text: Optional[str]) -> List[str]:
+    return [a or b for a, b in TOKEN_RE.findall(text or "")]
+
+
+def fmt_step(x: float) -> str:
+    return f"{x:.10g}"
+
+
+def grid_axes_and_shape(desc: ET.Element) -> Dict[str, object]:
+    """Grid axis labels (in grid order), cells per axis, and the step of each regular axis."""
+    grid = desc.find("gml:domainSet/*", NS)
+    if grid is None:
+        return {}
+    labels = split_tokens(grid.findtext("gml:axisLabels", default="", namespaces=NS))
+    low = split_tokens(grid.findtext(".//gml:GridEnvelope/gml:low", default="", namespaces=NS))
+    high = split_tokens(grid.findtext(".//gml:GridEnvelope/gml:high", default="", namespaces=NS))
+    shape: List[int] = []
+    for lo, hi in zip(low, high):
+        try:
+            shape.append(int(hi) - int(lo) + 1)
+        except ValueError:
+            shape.append(0)
+
+    resolution: Dict[str, str] = {}
+    irregular: Dict[str, List[str]] = {}
+    # RectifiedGrid: one offsetVector per grid axis, in axisLabels order
+    for label, vec in zip(labels, grid.findall("gml:offsetVector", NS)):
+        steps = [float(v) for v in split_tokens(vec.text) if v]
+        nonzero = [s for s in steps if s != 0]
+        if nonzero:
+            resolution[label] = fmt_step(nonzero[0])
+    # ReferenceableGridByVectors: each axis names itself and lists coefficients if it is irregular
+    for axis in grid.findall("gmlrgrid:generalGridAxis/gmlrgrid:GeneralGridAxis", NS):
+        label = (axis.findtext("gmlrgrid:gridAxesSpanned", default="", namespaces=NS) or "").strip()
+        coefficients = split_tokens(axis.findtext("gmlrgrid:coefficients", default="", namespaces=NS))
+        if coefficients:
+            irregular[label] = coefficients
+            continue
+        vec = axis.findtext("gmlrgrid:offsetVector", default="", namespaces=NS)
+        steps = [float(v) for v in split_tokens(vec) if v]
+        nonzero = [s for s in steps if s != 0]
+        if label and nonzero:
+            resolution[label] = fmt_step(nonzero[0])
+
+    cells = 1
+    for n in shape:
+        cells *= n
+    return {
+        "grid_axes": labels,
+        "grid_shape": shape,
+        "grid_cells": cells if shape else None,
+        "axis_resolution": resolution,
+        "irregular_axes": irregular,
+    }
+
+
+def bands_and_nils(desc: ET.Element) -> Dict[str, object]:
+    names: List[str] = []
+    nils: Dict[str, List[str]] = {}
+    for field in desc.findall("gmlcov:rangeType/swe:DataRecord/swe:field", NS):
+        name = field.attrib.get("name", "")
+        names.append(name)
+        values = [
+            (v.text or "").strip()
+            for v in field.findall(".//swe:nilValues/swe:NilValues/swe:nilValue", NS)
+            if (v.text or "").strip()
+        ]
+        if values:
+            nils[name] = values
+    return {"band_names": names, "band_count": len(names), "nil_values": nils}
+
+
+def parse_describe_coverage(content: bytes) -> Dict[str, object]:
+    """Pull grid, axis and band details out of a DescribeCoverage response."""
+    root = ET.fromstring(content.strip())
+    desc = root if root.tag == f"{{{NS['wcs']}}}CoverageDescription" else root.find("wcs:CoverageDescription", NS)
+    if desc is None:
+        raise ValueError("no CoverageDescription in response")
+    out = grid_axes_and_shape(desc)
+    out.update(bands_and_nils(desc))
+    return out
+
+
+def describe_columns(info: Optional[Dict[str, object]]) -> List[str]:
+    """Flatten a parsed description into CSV cells matching DESCRIBE_HEADERS (blank if the harvest failed)."""
+    if not info:
+        return [""] * len(DESCRIBE_HEADERS)
+
+    def js(value: object) -> str:
+        return json.dumps(value, ensure_ascii=False) if value else ""
+
+    return [
+        ",".join(info.get("grid_axes", [])),
+        " ".join(str(n) for n in info.get("grid_shape", [])),
+        "" if info.get("grid_cells") is None else str(info["grid_cells"]),
+        js(info.get("axis_resolution")),
+        js(info.get("irregular_axes")),
+        ",".join(info.get("band_names", [])),
+        str(info.get("band_count", "")),
+        js(info.get("nil_values")),
+    ]
+
+
+class DescribeHarvester:
+    """
+    Fetch DescribeCoverage for many coverages on a bounded thread pool.
+    All workers share one requests.Session whose connection pool is sized to the worker count, so connections are
+    kept alive and reused instead of paying a TCP/TLS handshake per coverage. Responses go through the on-disk
+    HttpCache when one is given, so re-runs only transfer descriptions that changed.
+    """
+
+    def __init__(self, endpoint: str, workers: int = 8, cache: Optional[HttpCache] = None, timeout: float = 60):
+        self.endpoint = endpoint
+        self.cache = cache
+        self.timeout = timeout
+        self.workers = workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.failures: Dict[str, str] = {}
+
+    def fetch(self, coverage_id: str) -> bytes:
+        url = describe_coverage_url(self.endpoint, coverage_id)
+        if self.cache is not None:
+            content, _ = self.cache.get(url, session=self.session, timeout=self.timeout)
+            return content
+        r = self.session.get(url, timeout=self.timeout)
+        r.raise_for_status()
+        return r.content
+
+    def describe(self, coverage_id: str) -> Optional[Dict[str, object]]:
+        """Parsed description for one coverage, or None (recorded in self.failures) if it can't be had."""
+        try:
+            return parse_describe_coverage(self.fetch(coverage_id))
+        except Exception as exc:
+            self.failures[coverage_id] = str(exc)
+            return None
+
+    def submit(self, coverage_id: str) -> "Future[Optional[Dict[str, object]]]":
+        return self.pool.submit(self.describe, coverage_id)
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True)
+        self.session.close()
@@ -0,0 +1,94 @@
+"""
+HDR-style latency histogram.
+Values are bucketed log-linearly: exact below 2048, then 1024 linear sub-buckets per power of two, so every recorded
+value is kept to within 0.1% (3 significant digits) in a fixed-size counts array no matter how many samples are added.
+"""
+
+from typing import Dict, Iterable
+
+import numpy as np
+
+
+SUB_BUCKET_BITS = 10
+SUB_BUCKET_HALF = 1 << SUB_BUCKET_BITS  # 1024
+SUB_BUCKET_COUNT = SUB_BUCKET_HALF * 2  # 2048
+
+# One hour in milliseconds; anything slower is clamped to this value.
+DEFAULT_HIGHEST_TRACKABLE_MS = 3_600_000
+
+DEFAULT_PERCENTILES = (50.0, 90.0, 95.0, 99.0, 99.9)
+
+
+def _bucket_indices(values: np.ndarray) -> np.ndarray:
+    """Map non-negative integer values to histogram bucket indices."""
+    values = values.astype(np.int64, copy=False)
+    # bit_length - 1 == floor(log2(v)) for v >= 1; values below SUB_BUCKET_COUNT are stored exactly.
+    exponent = np.zeros(values.shape, dtype=np.int64)
+    large = values >= SUB_BUCKET_COUNT
+    if large.any():
+        exponent[large] = np.floor(np.log2(values[large])).astype(np.int64) - SUB_BUCKET_BITS
+    sub = values >> exponent
+    return np.where(
+        large,
+        SUB_BUCKET_COUNT + (exponent - 1) * SUB_BUCKET_HALF + (sub - SUB_BUCKET_HALF),
+        values,
+    )
+
+
+def _highest_equivalent(index: np.ndarray) -> np.ndarray:
+    """Largest value that maps to each bucket index."""
+    index = np.asarray(index, dtype=np.int64)
+    exponent = np.where(index >= SUB_BUCKET_COUNT, (index - SUB_BUCKET_COUNT) // SUB_BUCKET_HALF + 1, 0)
+    sub = np.where(
+        index >= SUB_BUCKET_COUNT,
+        (index - SUB_BUCKET_COUNT) % SUB_BUCKET_HALF + SUB_BUCKET_HALF,
+        index,
+    )
+    return ((sub + 1) << exponent) - 1
+
+
+class LatencyHistogram:
+    """Fixed-memory histogram of integer latencies (ms) supporting vectorized recording and percentile queries."""
+
+    def __init__(self, highest_trackable: int = DEFAULT_HIGHEST_TRACKABLE_MS):
+        self.highest_trackable = int(highest_trackable)
+        size = int(_bucket_indices(np.array([self.highest_trackable]))[0]) + 1
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0
+
+    def record(self, values: Iterable[float]) -> None:
+        """Record a batch of latencies. NaN and negative values are ignored; values above the ceiling are clamped."""
+        arr = np.asarray(values, dtype=np.float64)
+        arr = arr[~np.isnan(arr) & (arr >= 0)]
+        if arr.size == 0:
+            return
+        ints = np.minimum(np.rint(arr), self.highest_trackable).astype(np.int64)
+        self.counts += np.bincount(_bucket_indices(ints), minlength=self.counts.size)
+        self.total += int(ints.size)
+        self.sum += float(arr.sum())
+        self.max = max(self.max, int(ints.max()))
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add another histogram's samples to this one."""
+        if other.counts.size != self.counts.size:
+            raise ValueError("cannot merge histograms with different ranges")
+        self.counts += other.counts
+        self.total += other.total
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def mean(self) -> float:
+        return self.sum / self.total if self.total else float("nan")
+
+    def percentiles(self, percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[float, float]:
+        """Return {percentile: value}; each value is the upper edge of the bucket holding that rank, capped at max."""
+        pcts = list(percentiles)
+        if not self.total:
+            return {p: float("nan") for p in pcts}
+        cumulative = np.cumsum(self.counts)
+        ranks = np.maximum(np.ceil(np.array(pcts) / 100.0 * self.total), 1)
+        index = np.searchsorted(cumulative, ranks)
+        values = np.minimum(_highest_equivalent(index), self.max)
+        return {p: float(v) for p, v in zip(pcts, values)}
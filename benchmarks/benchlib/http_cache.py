@@ -0,0 +1,140 @@
+"""
+Small on-disk HTTP cache for OGC metadata documents (GetCapabilities, DescribeCoverage).
+Each URL gets a body file and a metadata JSON with its ETag, Last-Modified and content hash. Later fetches send
+If-None-Match / If-Modified-Since, so an unchanged document costs a 304 instead of a full download and parse.
+"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+
+import requests
+
+
+def content_digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def conditional_headers(meta: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Revalidation headers for a cached entry's metadata."""
+    headers: Dict[str, str] = {}
+    if meta:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+class HttpCache:
+    """Conditional-GET cache rooted at a directory."""
+
+    def __init__(self, cache_dir: str):
+        self.dir = Path(cache_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self.dir / f"{key}.body", self.dir / f"{key}.json"
+
+    def metadata(self, url: str) -> Optional[Dict[str, str]]:
+        """Cached metadata for a URL, or None if nothing usable is cached."""
+        body_path, meta_path = self._paths(url)
+        if not body_path.exists() or not meta_path.exists():
+            return None
+        try:
+            return json.loads(meta_path.read_text(encoding="utf-8"))
+        except ValueError:
+            return None
+
+    def read(self, url: str) -> Optional[bytes]:
+        body_path, _ = self._paths(url)
+        return body_path.read_bytes() if self.metadata(url) is not None else None
+
+    def store(self, url: str, content: bytes, headers: Mapping[str, str]) -> Dict[str, str]:
+        body_path, _ = self._paths(url)
+        # write the body first so a crash never leaves metadata pointing at a missing/partial body
+        tmp = body_path.with_suffix(".tmp")
+        tmp.write_bytes(content)
+        tmp.replace(body_path)
+        return self._write_metadata(url, headers, content_digest(content))
+
+    def _write_metadata(self, url: str, headers: Mapping[str, str], sha256: str) -> Dict[str, str]:
+        _, meta_path = self._paths(url)
+        # header names are case-insensitive; requests' headers already handle that, plain dicts are normalized here
+        headers = {k.lower(): v for k, v in headers.items()}
+        meta = {
+            "url": url,
+            "etag": headers.get("etag", ""),
+            "last_modified": headers.get("last-modified", ""),
+            "sha256": sha256,
+            "fetched_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        return meta
+
+    def get(
+        self,
+        url: str,
+        session: Optional[requests.Session] = None,
+        timeout: float = 30,
+    ) -> Tuple[bytes, bool]:
+        """
+        Fetch a URL through the cache. Returns (content, changed) where changed is False when the server answered
+        304 or returned a body identical to the cached one.
+        """
+        meta = self.metadata(url)
+        headers = conditional_headers(meta)
+
+        r = (session or requests).get(url, timeout=timeout, headers=headers)
+        if r.status_code == 304 and meta:
+            return self.read(url) or b"", False
+        r.raise_for_status()
+        content = r.content.strip()
+        changed = not meta or meta.get("sha256") != content_digest(content)
+        self.store(url, content, r.headers)
+        return content, changed
+
+    def stream(
+        self,
+        url: str,
+        session: Optional[requests.Session] = None,
+        timeout: float = 30,
+        chunk_size: int = 1 << 16,
+    ) -> Iterator[bytes]:
+        """
+        Like get(), but yields the body in chunks as it arrives so callers can parse incrementally. A fresh body is
+        written to a temporary file alongside and only becomes the cached copy (with new metadata) once the
+        response has been read to the end; an interrupted download leaves the previous cache entry intact.
+        """
+        meta = self.metadata(url)
+        headers = conditional_headers(meta)
+
+        with (session or requests).get(url, timeout=timeout, headers=headers, stream=True) as r:
+            body_path, _ = self._paths(url)
+            if r.status_code == 304 and meta:
+                with open(body_path, "rb") as f:
+                    for chunk in iter(lambda: f.read(chunk_size), b""):
+                        yield chunk
+                return
+            r.raise_for_status()
+
+            tmp = body_path.with_suffix(".tmp")
+            digest = hashlib.sha256()
+            leading = True
+            with open(tmp, "wb") as out:
+                for chunk in r.iter_content(chunk_size=chunk_size):
+                    if leading:
+                        # match get(), which strips the body before storing it
+                        chunk = chunk.lstrip()
+                        if not chunk:
+                            continue
+                        leading = False
+                    digest.update(chunk)
+                    out.write(chunk)
+                    yield chunk
+
+        tmp.replace(body_path)
+        self._write_metadata(url, r.headers, digest.hexdigest())
@@ -0,0 +1,102 @@
+"""
+Per-request phase timings written by load_generator.py: DNS, TCP connect, TLS, time to first byte, transfer, and
+whatever the server reports in a Server-Timing header. The analyzers summarize them per coverage so network cost,
+Petascope's request handling and rasdaman's tile reads can be told apart.
+"""
+
+from typing import Dict, List
+
+import pandas as pd
+
+from benchlib.results import p50, p95, to_num
+
+
+# results column -> summary column prefix
+PHASE_COLUMNS: Dict[str, str] = {
+    "dnsTime": "dns",
+    "tcpConnectTime": "tcp_connect",
+    "tlsTime": "tls",
+    "ttfbTime": "ttfb",
+    "transferTime": "transfer",
+}
+
+# Connection setup phases are blank when a request reused a keep-alive connection.
+SETUP_PHASES = ["dns", "tcp_connect", "tls"]
+
+
+def has_phases(df: pd.DataFrame) -> bool:
+    return "ttfbTime" in df.columns
+
+
+def add_phase_columns(df: pd.DataFrame) -> List[str]:
+    """
+    Add numeric <phase>_ms columns and one server_<metric>_ms column per Server-Timing metric.
+    Returns the Server-Timing metric names found.
+    """
+    for column, prefix in PHASE_COLUMNS.items():
+        df[f"{prefix}_ms"] = to_num(df.get(column))
+    if "serverTiming" not in df.columns:
+        return []
+    metrics = server_timing_frame(df["serverTiming"])
+    for name in metrics.columns:
+        df[f"server_{name}_ms"] = metrics[name]
+    return list(metrics.columns)
+
+
+def server_timing_frame(header: pd.Series) -> pd.DataFrame:
+    """
+    Parse Server-Timing header values (e.g. "plan;dur=12.5, tiles;dur=140") into one column of durations per
+    metric name, aligned with the input index. Metrics without a dur are ignored; repeated names are summed.
+    """
+    entries = header.dropna().astype(str).str.split(",").explode()
+    parts = pd.DataFrame(
+        {
+            "name": entries.str.extract(r"^\s*([^;\s]+)", expand=False),
+            "dur": to_num(entries.str.extract(r";\s*dur=([0-9.eE+-]+)", expand=False)),
+        }
+    )
+    parts = parts.dropna()
+    if parts.empty:
+        return pd.DataFrame(index=header.index)
+    wide = parts.groupby([parts.index, "name"])["dur"].sum().unstack()
+    return wide.reindex(header.index)
+
+
+def network_rtt_ms(df: pd.DataFrame) -> float:
+    """Round-trip estimate: the median TCP handshake over all new connections in the run (0 if there were none)."""
+    rtt = df["tcp_connect_ms"].median()
+    return 0.0 if pd.isna(rtt) else float(rtt)
+
+
+def phase_summary(df_used: pd.DataFrame, df_all: pd.DataFrame, server_metrics: List[str]) -> pd.DataFrame:
+    """
+    Per-coverage phase breakdown. Connection setup is averaged over the requests that opened a new connection (from
+    all samples, since most of them happen during warm-up). Time to first byte, transfer and server metrics use the
+    samples behind the latency columns. server_est_mean_ms is time to first byte minus one network round trip, i.e.
+    the time the request spent inside Petascope/rasdaman.
+    """
+    setup = df_all.groupby("coverageId").agg(
+        new_connections=("tcp_connect_ms", "count"),
+        **{f"{p}_mean_ms": (f"{p}_ms", "mean") for p in SETUP_PHASES},
+    )
+    used = df_used.assign(server_est_ms=(df_used["ttfb_ms"] - network_rtt_ms(df_all)).clip(lower=0))
+    request = used.groupby("coverageId").agg(
+        ttfb_p50_ms=("ttfb_ms", p50),
+        ttfb_p95_ms=("ttfb_ms", p95),
+        transfer_mean_ms=("transfer_ms", "mean"),
+        server_est_mean_ms=("server_est_ms", "mean"),
+        **{f"server_{m}_mean_ms": (f"server_{m}_ms", "mean") for m in server_metrics},
+    )
+    return setup.join(request, how="outer").round(1).reset_index()
+
+
+def phase_means_line(df_used: pd.DataFrame, df_all: pd.DataFrame, server_metrics: List[str]) -> str:
+    """One-line run-wide phase breakdown for the console (connection setup over new connections only)."""
+    parts = [
+        f"{p.replace('_', ' ')} {(df_all if p in SETUP_PHASES else df_used)[f'{p}_ms'].mean():.1f}"
+        for p in PHASE_COLUMNS.values()
+    ]
+    line = "Phase means (ms): " + ", ".join(parts).replace("nan", "-")
+    if server_metrics:
+        line += "; Server-Timing: " + ", ".join(f"{m} {df_used[f'server_{m}_ms'].mean():.1f}" for m in server_metrics)
+    return line
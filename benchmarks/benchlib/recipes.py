@@ -0,0 +1,146 @@
+"""
+Read the wcst_import ingest recipes (ingest JSON files) kept in this repo.
+Many recipes carry raw control characters inside hook commands, which wcst_import tolerates, so they are parsed
+non-strictly here too.
+"""
+
+import glob
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+TILING_RE = re.compile(
+    r"^\s*(ALIGNED|REGULAR|DIRECTIONAL|AREA\s+OF\s+INTEREST)\s*(\[[^\]]*\])?.*?TILE\s+SIZE\s+(\d+)",
+    re.IGNORECASE,
+)
+
+# style registration hooks call rasdaman's admin endpoint: .../admin/layer/style/add?COVERAGEID=...&STYLEID=...
+STYLE_ADD_RE = re.compile(r"layer/style/add\?([^\"' ]*)", re.IGNORECASE)
+QUERY_PARAM_RE = re.compile(r"(?:^|&)([A-Za-z]+)=([^&]*)")
+
+# ${netcdf:variable:x:min} and friends name the coordinate variable an axis is read from
+NETCDF_VARIABLE_RE = re.compile(r"\$\{netcdf:variable:([^:}]+)")
+
+# Recipes under these directories are kept for reference only; live recipes win when coverage IDs collide.
+INACTIVE_DIRS = {"archive", "deprecated"}
+
+
+def load_recipe(path: Path) -> Optional[dict]:
+    """Load an ingest JSON; returns None for JSON files that aren't wcst_import recipes (e.g. style definitions)."""
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"), strict=False)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or "recipe" not in data or "input" not in data:
+        return None
+    return data
+
+
+def find_recipes(root: Path) -> Iterator[Tuple[Path, dict]]:
+    """Yield (path, recipe) for every ingest recipe under root, live recipes before archived/deprecated ones."""
+    paths = sorted(
+        Path(root).rglob("*.json"),
+        key=lambda p: (bool(INACTIVE_DIRS & set(p.relative_to(root).parts)), str(p)),
+    )
+    for path in paths:
+        if ".git" in path.parts:
+            continue
+        recipe = load_recipe(path)
+        if recipe is not None:
+            yield path, recipe
+
+
+def parse_tiling(tiling: Optional[str]) -> Dict[str, object]:
+    """
+    Split a rasdaman tiling clause like "ALIGNED [0:*, 0:31, 0:31] tile size 16777216" into scheme, tile
+    configuration and tile size, plus a normalized label for grouping. Recipes without a tiling option get
+    rasdaman's default tiling, labelled "default".
+    """
+    if not tiling:
+        return {"tiling": "default", "tiling_scheme": "default", "tile_config": "", "tile_size": None}
+    m = TILING_RE.match(tiling)
+    if not m:
+        return {"tiling": tiling.strip(), "tiling_scheme": "unknown", "tile_config": "", "tile_size": None}
+    scheme = " ".join(m.group(1).upper().split())
+    config = re.sub(r"\s+", "", m.group(2) or "").replace(",", ", ")
+    size = int(m.group(3))
+    label = f"{scheme} {config} tile size {size}" if config else f"{scheme} tile size {size}"
+    return {"tiling": label, "tiling_scheme": scheme, "tile_config": config, "tile_size": size}
+
+
+def recipe_options(recipe: dict) -> dict:
+    return recipe.get("recipe", {}).get("options", {}) or {}
+
+
+def recipe_bands(recipe: dict) -> List[dict]:
+    """Bands declared in the recipe's slicer (empty if the slicer takes them from the file)."""
+    slicer = recipe_options(recipe).get("coverage", {}).get("slicer", {}) or {}
+    return slicer.get("bands", []) or []
+
+
+def recipe_axes(recipe: dict) -> List[Tuple[str, Optional[str]]]:
+    """(axis name, NetCDF coordinate variable or None) for the slicer's axes, in gridOrder."""
+    axes = recipe_options(recipe).get("coverage", {}).get("slicer", {}).get("axes", {}) or {}
+    out = []
+    for name, spec in axes.items():
+        spec = spec or {}
+        text = " ".join(str(spec.get(k, "")) for k in ("min", "max", "directPositions"))
+        m = NETCDF_VARIABLE_RE.search(text)
+        out.append((int(spec.get("gridOrder", len(out))), name, m.group(1) if m else None))
+    return [(name, variable) for _, name, variable in sorted(out)]
+
+
+def input_files(recipe: dict, recipe_path: Path) -> List[Path]:
+    """Files matched by input.paths; like wcst_import, relative paths are resolved against the recipe's directory."""
+    files: List[Path] = []
+    for pattern in recipe.get("input", {}).get("paths", []) or []:
+        full = Path(pattern) if Path(pattern).is_absolute() else recipe_path.parent / pattern
+        files.extend(Path(p) for p in sorted(glob.glob(str(full), recursive=True)))
+    return files
+
+
+def recipe_row(path: Path, recipe: dict, root: Path) -> Dict[str, object]:
+    """Flatten the benchmarking-relevant parts of a recipe into one row."""
+    options = recipe_options(recipe)
+    bands = recipe_bands(recipe)
+    row: Dict[str, object] = {
+        "coverageId": recipe.get("input", {}).get("coverage_id", ""),
+        "recipe_path": str(path.relative_to(root)),
+        "recipe_name": recipe.get("recipe", {}).get("name", ""),
+    }
+    row.update(parse_tiling(options.get("tiling")))
+    row["wms_import"] = bool(options.get("wms_import", False))
+    row["band_count"] = len(bands) if bands else None
+    return row
+
+
+def recipe_styles(recipe: dict) -> List[Tuple[str, str]]:
+    """
+    (coverage ID, style ID) pairs registered by a recipe's hooks. Hooks that template the coverage ID fall back to
+    the recipe's own coverage_id.
+    """
+    out: List[Tuple[str, str]] = []
+    default_id = str(recipe.get("input", {}).get("coverage_id", ""))
+    for hook in recipe.get("hooks", []) or []:
+        cmd = str(hook.get("cmd", "")) if isinstance(hook, dict) else ""
+        for query in STYLE_ADD_RE.findall(cmd):
+            params = {k.upper(): v for k, v in QUERY_PARAM_RE.findall(query)}
+            style = params.get("STYLEID", "")
+            cov = params.get("COVERAGEID", "")
+            if not cov or "{" in cov or "$" in cov:
+                cov = default_id
+            if style and cov:
+                out.append((cov, style))
+    return out
+
+
+def find_styles(root: Path) -> Dict[str, List[str]]:
+    """Coverage ID -> style IDs registered by any ingest recipe under root, in recipe order."""
+    styles: Dict[str, List[str]] = {}
+    for _, recipe in find_recipes(root):
+        for cov, style in recipe_styles(recipe):
+            if style not in styles.setdefault(cov, []):
+                styles[cov].append(style)
+    return styles
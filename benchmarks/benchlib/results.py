@@ -0,0 +1,91 @@
+"""
+Column-wise parsing of JMeter-style results shared by analyze_wcs_results.py and analyze_wms_results.py.
+Everything here works on whole pandas Series at once; no per-row Python calls.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from benchlib.tables import read_table, table_columns
+from benchlib.urls import detect_id_param, extract_query_param_series
+
+
+# Rows per chunk when a results CSV is read incrementally.
+DEFAULT_CHUNKSIZE = 500_000
+
+
+def to_num(series: pd.Series) -> pd.Series:
+    """Coerce a series to numeric values, using NaN for non-numeric entries."""
+    return pd.to_numeric(series, errors="coerce")
+
+
+def parse_success_value(value: object) -> bool:
+    """Normalize a single JMeter success value (e.g., 'true'/'false', 1/0) to a boolean."""
+    if pd.isna(value):
+        return False
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float, np.number)):
+        return value != 0
+    s = str(value).strip().lower()
+    return s in {"true", "1"}
+
+
+def to_bool_success(series: pd.Series) -> pd.Series:
+    """
+    Normalize JMeter success values to booleans (e.g., 'true'/'false').
+    A results file only ever holds a handful of distinct success values, so they are factorized and only the
+    unique values go through parse_success_value.
+    """
+    if pd.api.types.is_bool_dtype(series) and not series.hasnans:
+        return series.astype(bool)
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.fillna(0).ne(0)
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    lookup = np.array([parse_success_value(u) for u in uniques] + [False], dtype=bool)
+    # NaN gets code -1, which indexes the trailing False
+    return pd.Series(lookup[codes], index=series.index, name=series.name)
+
+
+def throughput_bps(size_bytes: pd.Series, elapsed_ms: pd.Series) -> pd.Series:
+    """Bytes per second for each sample; NaN where elapsed is missing or not positive."""
+    return (size_bytes / (elapsed_ms / 1000.0)).where(elapsed_ms > 0)
+
+
+def p50(series: pd.Series) -> float:
+    """Compute 50th percentile for a numeric series."""
+    return series.quantile(0.50)
+
+
+def p95(series: pd.Series) -> float:
+    """Compute 95th percentile for a numeric series."""
+    return series.quantile(0.95)
+
+
+def p99(series: pd.Series) -> float:
+    """Compute 99th percentile for a numeric series."""
+    return series.quantile(0.99)
+
+
+def load_results(path: str, id_param: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read a JMeter-style results CSV into per-sample columns: coverageId, success, latency_ms, elapsed_ms,
+    throughput_bps. `id_param` defaults to COVERAGEID or LAYERS, whichever the URLs carry.
+    Raises ValueError if the file has no URL column.
+    """
+    header = table_columns(path)
+    if "URL" not in header:
+        raise ValueError("results CSV missing URL column.")
+    usecols = [c for c in ["URL", "success", "elapsed", "Latency", "bytes"] if c in header]
+    raw = read_table(path, usecols)
+
+    param = id_param or detect_id_param(raw["URL"])
+    df = pd.DataFrame({"coverageId": extract_query_param_series(raw["URL"], param)})
+    df["success"] = to_bool_success(raw["success"]) if "success" in raw else True
+    df["elapsed_ms"] = to_num(raw.get("elapsed"))
+    df["latency_ms"] = to_num(raw.get("Latency" if "Latency" in raw else "elapsed"))
+    df["throughput_bps"] = throughput_bps(to_num(raw.get("bytes")), df["elapsed_ms"])
+    return df[df["coverageId"].notna()].reset_index(drop=True)
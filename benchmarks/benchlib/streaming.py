@@ -0,0 +1,120 @@
+"""
+Streaming per-coverage aggregation of JMeter-style results CSVs.
+The results file is read in chunks with only the needed columns, and each chunk is folded into per-coverage
+histograms and running sums, so memory stays flat no matter how many result rows there are.
+"""
+
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from benchlib.histogram import DEFAULT_PERCENTILES, LatencyHistogram
+from benchlib.results import DEFAULT_CHUNKSIZE, throughput_bps, to_bool_success, to_num
+from benchlib.tables import iter_table_chunks, table_columns
+from benchlib.urls import extract_query_param_series
+
+
+RESULT_COLUMNS = ["URL", "success", "elapsed", "Latency", "bytes", "scheduleLag"]
+
+
+def percentile_label(p: float) -> str:
+    """Column suffix for a percentile, e.g. 95 -> 'p95', 99.9 -> 'p999'."""
+    return "p" + f"{p:g}".replace(".", "")
+
+
+class CoverageAccumulator:
+    """Running totals for one coverage."""
+
+    def __init__(self, track_schedule: bool):
+        self.latency = LatencyHistogram()
+        self.corrected = LatencyHistogram() if track_schedule else None
+        self.count_total = 0
+        self.count_success = 0
+        self.schedule_lag_sum = 0.0
+        self.throughput_sum = 0.0
+        self.throughput_count = 0
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        self.count_total += len(chunk)
+        self.count_success += int(chunk["success"].sum())
+
+        latency = chunk["latency_ms"].to_numpy(dtype=np.float64)
+        self.latency.record(latency)
+
+        throughput = chunk["throughput_bps"].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(throughput)
+        self.throughput_sum += float(throughput[valid].sum())
+        self.throughput_count += int(valid.sum())
+
+        if self.corrected is not None:
+            lag = chunk["schedule_lag_ms"].to_numpy(dtype=np.float64)
+            self.schedule_lag_sum += float(np.nansum(lag))
+            self.corrected.record(latency + np.nan_to_num(lag))
+
+    def row(self, coverage_id: str, percentiles: List[float]) -> Dict[str, object]:
+        out: Dict[str, object] = {
+            "coverageId": coverage_id,
+            "count_used": self.latency.total,
+            "latency_mean_ms": self.latency.mean(),
+        }
+        for p, v in self.latency.percentiles(percentiles).items():
+            out[f"latency_{percentile_label(p)}_ms"] = v
+        out["latency_max_ms"] = self.latency.max if self.latency.total else float("nan")
+        out["throughput_mean_bps"] = (
+            self.throughput_sum / self.throughput_count if self.throughput_count else float("nan")
+        )
+        if self.corrected is not None:
+            out["schedule_lag_mean_ms"] = (
+                self.schedule_lag_sum / self.count_total if self.count_total else float("nan")
+            )
+            for p, v in self.corrected.percentiles([50.0, 95.0, 99.0]).items():
+                out[f"corrected_latency_{percentile_label(p)}_ms"] = v
+        out["count_total"] = self.count_total
+        out["count_success"] = self.count_success
+        out["success_rate"] = self.count_success / self.count_total if self.count_total else float("nan")
+        return out
+
+
+def stream_summary(
+    path: str,
+    id_param: str,
+    parse_success: Callable[[pd.Series], pd.Series] = to_bool_success,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    percentiles: List[float] = list(DEFAULT_PERCENTILES),
+) -> pd.DataFrame:
+    """
+    Summarize a results CSV per coverage without loading it all at once.
+    `id_param` is the URL query parameter naming the coverage (COVERAGEID or LAYERS) and `parse_success`
+    normalizes the success column.
+    Raises ValueError if the file has no URL column.
+    """
+    header = table_columns(path)
+    if "URL" not in header:
+        raise ValueError("results CSV missing URL column.")
+    usecols = [c for c in RESULT_COLUMNS if c in header]
+    latency_col = "Latency" if "Latency" in header else "elapsed"
+    track_schedule = "scheduleLag" in header
+
+    accumulators: Dict[str, CoverageAccumulator] = {}
+    for chunk in iter_table_chunks(path, usecols, chunksize):
+        chunk["coverageId"] = extract_query_param_series(chunk["URL"], id_param)
+        chunk = chunk[chunk["coverageId"].notna()]
+        if chunk.empty:
+            continue
+
+        frame = pd.DataFrame({"coverageId": chunk["coverageId"]})
+        frame["success"] = parse_success(chunk["success"]) if "success" in chunk else True
+        frame["latency_ms"] = to_num(chunk.get(latency_col))
+        frame["throughput_bps"] = throughput_bps(to_num(chunk.get("bytes")), to_num(chunk.get("elapsed")))
+        if track_schedule:
+            frame["schedule_lag_ms"] = to_num(chunk["scheduleLag"])
+
+        for coverage_id, group in frame.groupby("coverageId", sort=False):
+            acc = accumulators.get(coverage_id)
+            if acc is None:
+                acc = accumulators[coverage_id] = CoverageAccumulator(track_schedule)
+            acc.add(group)
+
+    rows = [acc.row(cov, percentiles) for cov, acc in sorted(accumulators.items())]
+    return pd.DataFrame(rows)
@@ -0,0 +1,284 @@
+"""
+Per-coverage latency/throughput summary and command line shared by analyze_wcs_results.py and
+analyze_wms_results.py. The two analyzers differ only in the service name and the URL parameter that carries the
+coverage (COVERAGEID for WCS, LAYERS for WMS).
+"""
+
+import argparse
+import sys
+from typing import Optional
+
+import pandas as pd
+
+from benchlib.phases import add_phase_columns, has_phases, phase_means_line, phase_summary
+from benchlib.results import DEFAULT_CHUNKSIZE, p50, p95, p99, throughput_bps, to_bool_success, to_num
+from benchlib.tables import parquet_error, read_table, write_table
+from benchlib.urls import extract_query_param_series
+from benchlib.warmup import cold_warm_summary, latency_timeseries, mark_warmup, parse_warmup, warmup_line
+
+
+# Coverage metadata merged into the summary when --coverages is readable.
+COVERAGE_COLUMNS = ["coverageId", "epsg", "size_bytes", "num_dimensions", "axisList"]
+
+# Millisecond and bytes/sec columns rounded to whole numbers for readable output (whichever are present).
+ROUNDED_COLUMNS = [
+    "latency_mean_ms",
+    "latency_p50_ms",
+    "latency_p90_ms",
+    "latency_p95_ms",
+    "latency_p99_ms",
+    "latency_p999_ms",
+    "latency_max_ms",
+    "throughput_mean_bps",
+    "schedule_lag_mean_ms",
+    "corrected_latency_p50_ms",
+    "corrected_latency_p95_ms",
+    "corrected_latency_p99_ms",
+    "first_hit_latency_ms",
+    "cold_latency_mean_ms",
+    "warm_latency_mean_ms",
+]
+
+
+def summarize_in_memory(
+    results_path: str,
+    id_param: str,
+    warmup: Optional[int] = None,
+    out_timeseries: Optional[str] = None,
+    bucket_s: float = 10.0,
+) -> Optional[pd.DataFrame]:
+    """
+    Load the whole results CSV and summarize latency/throughput per coverage with pandas groupby, taking each
+    sample's coverage from the `id_param` query parameter of its URL.
+    Each coverage's leading warm-up samples (detected when `warmup` is None, else a fixed count) are left out of the
+    latency/throughput columns and reported separately as cold latency.
+    """
+    # Load JMeter results and ensure required columns are present.
+    try:
+        df = read_table(results_path)
+    except Exception as exc:
+        print(f"[ERROR] Failed to read results CSV: {exc}", file=sys.stderr)
+        return None
+
+    if "URL" not in df.columns:
+        print("[ERROR] results CSV missing URL column.", file=sys.stderr)
+        return None
+
+    # Parse coverage IDs from the URL query string.
+    df["coverageId"] = extract_query_param_series(df["URL"], id_param)
+    df = df[df["coverageId"].notna()].copy()
+    if df.empty:
+        print("[ERROR] No coverage IDs could be parsed from results.", file=sys.stderr)
+        return None
+
+    # Normalize success flags (missing column means everything succeeded).
+    if "success" in df.columns:
+        df["success"] = to_bool_success(df["success"])
+    else:
+        df["success"] = True
+
+    # Convert key numeric fields and compute throughput in bytes/sec.
+    df["elapsed_ms"] = to_num(df.get("elapsed"))
+    latency_col = "Latency" if "Latency" in df.columns else "elapsed"
+    df["latency_ms"] = to_num(df.get(latency_col))
+    df["bytes"] = to_num(df.get("bytes"))
+
+    df["throughput_bps"] = throughput_bps(df["bytes"], df["elapsed_ms"])
+
+    # load_generator.py records how late each request was sent relative to its schedule.
+    # Adding that lag back corrects latency for coordinated omission (JMeter results won't have the column).
+    has_schedule = "scheduleLag" in df.columns
+    if has_schedule:
+        df["schedule_lag_ms"] = to_num(df["scheduleLag"]).fillna(0)
+        df["corrected_latency_ms"] = df["latency_ms"] + df["schedule_lag_ms"]
+
+    # load_generator.py also records DNS/connect/TLS/first-byte/transfer phases and any Server-Timing metrics.
+    server_metrics = add_phase_columns(df) if has_phases(df) else []
+
+    # Order samples by send time and flag each coverage's cold start; warm-up is excluded from the latency stats.
+    df = mark_warmup(df, warmup)
+    if out_timeseries:
+        if df["offset_s"].isna().all():
+            print("[WARN] results CSV has no timeStamp column; skipping the latency time series.")
+        else:
+            write_table(latency_timeseries(df, bucket_s).round(1), out_timeseries)
+            print(f"[OK] Wrote latency time series: {out_timeseries}")
+
+    # Keep counts based on all requests
+    df_all = df.copy()
+    df = df[~df["warmup"]]
+
+    if df.empty:
+        print("[ERROR] No rows to analyze after filtering.", file=sys.stderr)
+        return None
+
+    # Per-coverage counts and success rate (based on all rows).
+    counts = (
+        df_all.groupby("coverageId")
+        .agg(
+            count_total=("coverageId", "size"),
+            count_success=("success", "sum"),
+            success_rate=("success", "mean"),
+        )
+        .reset_index()
+    )
+
+    # Per-coverage latency and throughput summaries
+    summary = (
+        df.groupby("coverageId")
+        .agg(
+            count_used=("coverageId", "size"),
+            latency_mean_ms=("latency_ms", "mean"),
+            latency_p95_ms=("latency_ms", p95),
+            throughput_mean_bps=("throughput_bps", "mean"),
+        )
+        .reset_index()
+    )
+
+    if has_schedule:
+        corrected = (
+            df.groupby("coverageId")
+            .agg(
+                schedule_lag_mean_ms=("schedule_lag_ms", "mean"),
+                corrected_latency_p50_ms=("corrected_latency_ms", p50),
+                corrected_latency_p95_ms=("corrected_latency_ms", p95),
+                corrected_latency_p99_ms=("corrected_latency_ms", p99),
+            )
+            .reset_index()
+        )
+        summary = summary.merge(corrected, on="coverageId", how="left")
+
+    if warmup != 0:
+        summary = summary.merge(cold_warm_summary(df_all), on="coverageId", how="left")
+        print(warmup_line(df_all, df))
+
+    if has_phases(df_all):
+        summary = summary.merge(phase_summary(df, df_all, server_metrics), on="coverageId", how="left")
+        print(phase_means_line(df, df_all, server_metrics))
+
+    summary = summary.merge(counts, on="coverageId", how="left")
+    return summary
+
+
+def merge_coverages(summary: pd.DataFrame, coverages_path: str) -> pd.DataFrame:
+    """Add the COVERAGE_COLUMNS metadata from the coverages table; warns and returns the summary as is on failure."""
+    try:
+        cov = read_table(coverages_path)
+        if "coverageId" not in cov.columns:
+            raise ValueError("coverageId column missing from coverages CSV")
+        cols = [c for c in COVERAGE_COLUMNS if c in cov.columns]
+        cov = cov[cols].drop_duplicates(subset=["coverageId"])
+        return summary.merge(cov, on="coverageId", how="left")
+    except Exception as exc:
+        print(f"[WARN] Failed to read/merge coverages CSV: {exc}")
+        return summary
+
+
+def round_summary(summary: pd.DataFrame) -> pd.DataFrame:
+    """Round metrics for readable output."""
+    for col in ROUNDED_COLUMNS:
+        if col in summary.columns:
+            summary[col] = summary[col].round(0).astype("Int64")
+    summary["success_rate"] = summary["success_rate"].round(1)
+    return summary
+
+
+def analyzer_main(service: str, id_param: str) -> int:
+    """
+    Command line of a per-coverage analyzer for `service` ("WCS" or "WMS"), whose request URLs name the coverage
+    in `id_param`. File defaults follow the service, e.g. wms_benchmark_results.csv -> wms_results_summary.csv.
+    """
+    prefix = service.lower()
+    ap = argparse.ArgumentParser(description=f"Summarize {service} benchmark results by coverage.")
+    ap.add_argument(
+        "--results",
+        default=f"{prefix}_benchmark_results.csv",
+        help=f"JMeter CSV results (default: {prefix}_benchmark_results.csv)",
+    )
+    ap.add_argument(
+        "--coverages",
+        default="zeus_coverages.csv",
+        help="Coverage metadata CSV",
+    )
+    ap.add_argument(
+        "--out-summary",
+        default=f"{prefix}_results_summary.csv",
+        help="Output CSV for per-coverage summary",
+    )
+    ap.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Aggregate in chunks with HDR histograms (bounded memory; adds p50/p90/p99/p99.9/max columns)",
+    )
+    ap.add_argument(
+        "--chunksize",
+        type=int,
+        default=DEFAULT_CHUNKSIZE,
+        help=f"Rows per chunk with --streaming (default: {DEFAULT_CHUNKSIZE})",
+    )
+    ap.add_argument(
+        "--warmup",
+        default=None,
+        help="Warm-up samples to exclude per coverage: auto (detect, the default), none, or a fixed count",
+    )
+    ap.add_argument(
+        "--out-timeseries",
+        default=None,
+        help="Also write per-coverage latency over time (buckets of --bucket-s seconds) to this CSV",
+    )
+    ap.add_argument(
+        "--bucket-s",
+        type=float,
+        default=10.0,
+        help="Time-series bucket width in seconds (default: 10)",
+    )
+    args = ap.parse_args()
+
+    try:
+        warmup = parse_warmup(args.warmup or "auto")
+    except ValueError:
+        print("[ERROR] --warmup must be auto, none or a non-negative integer.", file=sys.stderr)
+        return 2
+    if args.bucket_s <= 0:
+        print("[ERROR] --bucket-s must be positive.", file=sys.stderr)
+        return 2
+    error = parquet_error(args.results, args.coverages, args.out_summary, args.out_timeseries)
+    if error:
+        print(f"[ERROR] {error}", file=sys.stderr)
+        return 2
+
+    if args.streaming:
+        # Fold the CSV chunk by chunk into per-coverage histograms instead of loading it whole.
+        # Imported here so the default path doesn't pay for the histogram code.
+        from benchlib.streaming import stream_summary
+
+        if args.warmup or args.out_timeseries:
+            print("[WARN] --warmup and --out-timeseries need the in-memory path; ignored with --streaming.")
+
+        try:
+            summary = stream_summary(
+                args.results,
+                id_param=id_param,
+                chunksize=args.chunksize,
+            )
+        except Exception as exc:
+            print(f"[ERROR] Failed to read results CSV: {exc}", file=sys.stderr)
+            return 2
+        if summary.empty:
+            print("[ERROR] No coverage IDs could be parsed from results.", file=sys.stderr)
+            return 2
+    else:
+        summary = summarize_in_memory(args.results, id_param, warmup, args.out_timeseries, args.bucket_s)
+        if summary is None:
+            return 2
+
+    if args.coverages:
+        summary = merge_coverages(summary, args.coverages)
+    summary = round_summary(summary)
+
+    write_table(summary, args.out_summary)
+
+    print(f"[OK] Wrote summary: {args.out_summary}")
+
+    return 0
+
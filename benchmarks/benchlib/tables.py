@@ -0,0 +1,88 @@
+"""
+Reading and writing pipeline tables (coverage metadata, request lists, results, summaries).
+CSV stays the default; a path ending in .parquet selects Parquet, which keeps dtypes and loads much faster for
+large results files. Parquet needs pyarrow, imported only when a Parquet path is used.
+"""
+
+import importlib.util
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
+
+import pandas as pd
+
+
+PARQUET_SUFFIXES = {".parquet", ".pq"}
+
+
+def is_parquet(path: str) -> bool:
+    return Path(str(path)).suffix.lower() in PARQUET_SUFFIXES
+
+
+def parquet_error(*paths: Optional[str]) -> Optional[str]:
+    """Error message if any of the paths is Parquet but pyarrow isn't installed, else None."""
+    wanted = [p for p in paths if p and is_parquet(p)]
+    if not wanted:
+        return None
+    if importlib.util.find_spec("pyarrow") is None:
+        return f"Parquet files ({', '.join(wanted)}) need pyarrow: pip install pyarrow"
+    return None
+
+
+def table_columns(path: str) -> List[str]:
+    """Column names without reading the data."""
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+
+        return list(pq.read_schema(path).names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def read_table(path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Read a CSV or Parquet table, optionally only some columns."""
+    if is_parquet(path):
+        return pd.read_parquet(path, columns=list(columns) if columns is not None else None)
+    return pd.read_csv(path, usecols=list(columns) if columns is not None else None)
+
+
+def iter_table_chunks(path: str, columns: Sequence[str], chunksize: int) -> Iterator[pd.DataFrame]:
+    """Read a table in chunks of about `chunksize` rows (Parquet record batches or CSV chunks)."""
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=list(columns)):
+            yield batch.to_pandas()
+        return
+    yield from pd.read_csv(path, usecols=list(columns), chunksize=chunksize)
+
+
+def write_table(df: pd.DataFrame, path: str) -> None:
+    """Write a table as CSV or Parquet depending on the file extension."""
+    if is_parquet(path):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def csv_to_parquet(
+    csv_path: str,
+    parquet_path: str,
+    text_columns: Sequence[str] = (),
+    block_size: int = 1 << 24,
+) -> None:
+    """
+    Convert a CSV file to Parquet batch by batch, so very large results files don't need to fit in memory.
+    Column types are inferred from the first block; `text_columns` are always read as strings, since a column that is
+    empty or numeric early on (e.g. failureMessage) may hold text further down.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+
+    reader = pacsv.open_csv(
+        csv_path,
+        read_options=pacsv.ReadOptions(block_size=block_size),
+        convert_options=pacsv.ConvertOptions(column_types={c: pa.string() for c in text_columns}),
+    )
+    with pq.ParquetWriter(parquet_path, reader.schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
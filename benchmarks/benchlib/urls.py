@@ -0,0 +1,69 @@
+"""
+Pull query parameters (COVERAGEID, LAYERS, WCPS QUERY, ...) out of request URLs in results files.
+Harder to anticipate exactly what JMeter will output in a results file, so the matching is case-insensitive,
+tolerates missing schemes/paths, and percent-decodes values the way parse_qs does.
+"""
+
+import re
+from functools import lru_cache
+from typing import Optional
+from urllib.parse import unquote_plus
+
+import numpy as np
+import pandas as pd
+
+
+# coverage bound by a WCPS query's first "for $c in (ID)" clause
+WCPS_COVERAGE_RE = re.compile(r"for\s+\$\w+\s+in\s*\(\s*([^\s,()]+)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=None)
+def query_param_re(name: str) -> "re.Pattern[str]":
+    """Compiled, case-insensitive regex capturing the first value of a query parameter."""
+    return re.compile(rf"[?&]{re.escape(name)}=([^&#]*)", re.IGNORECASE)
+
+
+def extract_query_param(url: object, name: str) -> Optional[str]:
+    """Extract a query parameter value from one URL, or None if it is absent or empty."""
+    if url is None or (isinstance(url, float) and np.isnan(url)):
+        return None
+    m = query_param_re(name).search(str(url))
+    if not m or not m.group(1):
+        return None
+    return unquote_plus(m.group(1))
+
+
+def extract_query_param_series(urls: pd.Series, name: str) -> pd.Series:
+    """
+    Vectorized extract_query_param: one regex pass over the column, then percent-decoding of the distinct values only
+    (a results file has millions of URLs but only hundreds of coverage IDs).
+    """
+    raw = urls.astype("string").str.extract(query_param_re(name), expand=False)
+    raw = raw.where(raw.str.len() > 0)
+    codes, uniques = pd.factorize(raw, use_na_sentinel=True)
+    decoded = np.array([unquote_plus(str(u)) for u in uniques] + [None], dtype=object)
+    return pd.Series(decoded[codes], index=urls.index, name=name)
+
+
+def extract_coverage_id(url: object) -> Optional[str]:
+    """Extract COVERAGEID from a WCS request URL."""
+    return extract_query_param(url, "COVERAGEID")
+
+
+def extract_layers(url: object) -> Optional[str]:
+    """Extract LAYERS from a WMS request URL. WMS pings "LAYERS" rather than "CoverageID"."""
+    return extract_query_param(url, "LAYERS")
+
+
+def extract_wcps_coverage_series(urls: pd.Series) -> pd.Series:
+    """Coverage ID each ProcessCoverages request's WCPS QUERY iterates over (NaN for other requests)."""
+    queries = extract_query_param_series(urls, "QUERY").astype("string")
+    return queries.str.extract(WCPS_COVERAGE_RE, expand=False).rename("coverageId")
+
+
+def detect_id_param(urls: pd.Series) -> str:
+    """Guess whether a results file holds WCS (COVERAGEID) or WMS (LAYERS) requests from its first URLs."""
+    pattern = query_param_re("COVERAGEID")
+    if any(pattern.search(str(u)) for u in urls.dropna().head(100)):
+        return "COVERAGEID"
+    return "LAYERS"
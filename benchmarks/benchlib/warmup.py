@@ -0,0 +1,143 @@
+"""
+Warm-up detection for the analyzers: order each coverage's samples by send time and find where the cold
+(first-hit) part of the series ends, so steady-state latency can be reported apart from rasdaman's tile cache
+filling up.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Series shorter than this are too short to tell warm-up from noise; nothing is excluded.
+MIN_SAMPLES = 4
+
+# MSER always finds *some* prefix whose removal lowers the standard error, even in series with no warm-up at all
+# (about 40% of iid lognormal series lose a few high samples). A detected prefix only counts as warm-up when it is
+# clearly slower than the rest: its geometric mean at least COLD_RATIO times the warm median, and a z-score of at
+# least COLD_Z on log latency. That keeps false exclusions on iid latencies to at most 0.5%.
+COLD_RATIO = 1.2
+COLD_Z = 3.5
+
+
+def mser_truncation(values: np.ndarray, batch: int = 1) -> int:
+    """
+    Number of leading samples to discard as warm-up, by the MSER rule: pick the truncation point d that minimizes
+    the squared standard error of the remaining samples' mean, sum((x[d:] - mean)^2) / (n - d)^2. Only the first
+    half of the series is searched. With batch > 1 the rule runs on means of consecutive batches (MSER-5 uses 5),
+    which smooths noisy series; the result is still a sample count.
+    """
+    x = np.asarray(values, dtype=float)
+    if batch > 1:
+        usable = len(x) // batch * batch
+        x = x[:usable].reshape(-1, batch).mean(axis=1)
+    n = len(x)
+    if n < MIN_SAMPLES:
+        return 0
+    # suffix sums: s1[d] = sum(x[d:]), s2[d] = sum(x[d:] ** 2)
+    s1 = np.cumsum(x[::-1])[::-1]
+    s2 = np.cumsum((x * x)[::-1])[::-1]
+    d = np.arange(n // 2 + 1)
+    m = n - d
+    ss = s2[d] - s1[d] ** 2 / m
+    stat = np.maximum(ss, 0) / m**2
+    return int(np.argmin(stat)) * batch
+
+
+def clearly_cold(values: np.ndarray, d: int) -> bool:
+    """Whether the first d samples are significantly slower than the rest, compared on log latency."""
+    x = np.log(np.maximum(np.asarray(values, dtype=float), 1e-3))
+    cold, warm = x[:d], x[d:]
+    if d == 0 or len(warm) < 2:
+        return False
+    gap = cold.mean() - warm.mean()
+    if np.exp(cold.mean() - np.median(warm)) < COLD_RATIO:
+        return False
+    se = warm.std(ddof=1) * np.sqrt(1 / d + 1 / len(warm))
+    return gap > 0 if se == 0 else gap / se >= COLD_Z
+
+
+def fixed_or_auto(values: np.ndarray, warmup: Optional[int]) -> int:
+    """
+    Warm-up length for one series: a fixed count, or when None the MSER truncation point (MSER-5 once there are
+    enough samples), kept only if that prefix is clearly colder than the rest; otherwise the whole series is warm.
+    """
+    if warmup is not None:
+        return min(warmup, len(values))
+    d = mser_truncation(values, batch=5 if len(values) >= 50 else 1)
+    return d if clearly_cold(values, d) else 0
+
+
+def parse_warmup(value: str) -> Optional[int]:
+    """--warmup value: "auto" -> None (detect), "none" -> 0, otherwise a fixed sample count per coverage."""
+    if value == "auto":
+        return None
+    if value == "none":
+        return 0
+    count = int(value)
+    if count < 0:
+        raise ValueError("warm-up count must not be negative")
+    return count
+
+
+def mark_warmup(df: pd.DataFrame, warmup: Optional[int] = None) -> pd.DataFrame:
+    """
+    Sort samples by send time (JMeter's timeStamp, epoch ms; file order if it's missing) and add per-sample
+    columns: hit_index (0 = first request for the coverage), offset_s (seconds since the run's first request)
+    and warmup (True for the leading samples of each coverage's latency series that look cold).
+    `warmup` is a fixed number of samples per coverage, or None to detect it.
+    """
+    if "timeStamp" in df.columns:
+        df["timestamp_ms"] = pd.to_numeric(df["timeStamp"], errors="coerce")
+        df = df.sort_values("timestamp_ms", kind="stable")
+        df["offset_s"] = (df["timestamp_ms"] - df["timestamp_ms"].min()) / 1000.0
+    else:
+        df["offset_s"] = np.nan
+    df["hit_index"] = df.groupby("coverageId").cumcount()
+
+    # missing latencies (e.g. failed requests) take the coverage median so they neither start nor end a warm-up
+    filled = df["latency_ms"].fillna(df.groupby("coverageId")["latency_ms"].transform("median")).fillna(0)
+    cutoff = filled.groupby(df["coverageId"]).transform(lambda s: fixed_or_auto(s.to_numpy(), warmup))
+    df["warmup"] = df["hit_index"] < cutoff
+    return df
+
+
+def cold_warm_summary(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-coverage warm-up length and cold-vs-warm latency, from samples marked by mark_warmup."""
+    first = df[df["hit_index"] == 0].set_index("coverageId")["latency_ms"].rename("first_hit_latency_ms")
+    cold = df[df["warmup"]].groupby("coverageId")
+    warm = df[~df["warmup"]].groupby("coverageId")
+    out = pd.DataFrame({"warmup_count": df.groupby("coverageId")["warmup"].sum().astype(int)})
+    out = out.join(first)
+    out["cold_latency_mean_ms"] = cold["latency_ms"].mean()
+    out["warm_latency_mean_ms"] = warm["latency_ms"].mean()
+    out["cold_warm_ratio"] = (out["cold_latency_mean_ms"] / out["warm_latency_mean_ms"]).round(2)
+    # how long after the run started each coverage became warm
+    out["warm_after_s"] = warm["offset_s"].min().round(1)
+    return out.reset_index()
+
+
+def warmup_line(df_all: pd.DataFrame, df_used: pd.DataFrame) -> str:
+    """One-line report of the excluded warm-up samples and their mean latency against the rest."""
+    cold = df_all[df_all["warmup"]]
+    if cold.empty:
+        return "No warm-up detected."
+    return (
+        f"Excluded {len(cold)} warm-up samples across {cold['coverageId'].nunique()} coverages "
+        f"(cold mean {cold['latency_ms'].mean():.0f} ms, warm mean {df_used['latency_ms'].mean():.0f} ms)."
+    )
+
+
+def latency_timeseries(df: pd.DataFrame, bucket_s: float) -> pd.DataFrame:
+    """Per-coverage latency over time in fixed buckets of send time (needs the timeStamp column)."""
+    buckets = (df["offset_s"] // bucket_s * bucket_s).rename("bucket_start_s")
+    grouped = df.groupby([df["coverageId"], buckets])
+    out = grouped.agg(
+        count=("latency_ms", "size"),
+        warmup_count=("warmup", "sum"),
+        latency_mean_ms=("latency_ms", "mean"),
+        latency_p50_ms=("latency_ms", lambda s: s.quantile(0.50)),
+        latency_p95_ms=("latency_ms", lambda s: s.quantile(0.95)),
+    )
+    return out.reset_index()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Build a benchmark request CSV from Petascope/nginx access logs, so load tests follow real traffic.
+Reads local access logs in the common/combined format (nginx, or Tomcat's AccessLogValve in front of Petascope;
+.gz files are fine), keeps the OWS requests (GetCoverage and GetMap by default), normalizes their query strings and
+records when each was sent. The offset_s column holds the original inter-arrival timing divided by --speedup, so
+`load_generator.py --mode open --arrival replay` reproduces the recorded traffic pattern.
+"""
+
+import argparse
+import gzip
+import re
+import sys
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import pandas as pd
+
+from benchlib.tables import parquet_error, read_table, write_table
+
+
+# %h %l %u [%t] "%r" %s %b, optionally followed by referer/user agent (combined format)
+LOG_LINE_RE = re.compile(
+    r'^(?P<host>\S+) \S+ \S+ \[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<target>\S+)(?: [^"]*)?" '
+    r"(?P<status>\d{3}) (?P<bytes>\d+|-)"
+)
+
+# Parameters that carry the coverage/layer being requested, per service.
+ID_PARAMS = {"WCS": "COVERAGEID", "WMS": "LAYERS"}
+
+# Cache-busting parameters added by browsers/JS clients; they'd make every request unique.
+DEFAULT_DROP_PARAMS = "_,_DC,TIMESTAMP"
+
+
+@lru_cache(maxsize=65536)
+def parse_log_time(value: str) -> float:
+    """Epoch seconds from an access log timestamp like 10/Oct/2024:13:55:36 -0800 (cached: seconds repeat a lot)."""
+    return datetime.strptime(value, "%d/%b/%Y:%H:%M:%S %z").timestamp()
+
+
+def open_log(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, encoding="utf-8", errors="replace")
+
+
+def normalize_query(query: str, drop: Set[str]) -> Optional[Dict[str, object]]:
+    """
+    Canonical query string for an OWS request: parameter names upper-cased, cache busters dropped, values
+    re-encoded the way the request builders encode them. Returns None for anything that isn't a WCS/WMS call.
+    """
+    params = [(k.upper(), v) for k, v in parse_qsl(query, keep_blank_values=True) if k.upper() not in drop]
+    lookup = {k: v for k, v in params}
+    service = lookup.get("SERVICE", "").upper()
+    if service not in ID_PARAMS:
+        return None
+    return {
+        "service": service,
+        "request": lookup.get("REQUEST", ""),
+        "coverageId": lookup.get(ID_PARAMS[service], ""),
+        "query": urlencode(params, safe="():,/-"),
+    }
+
+
+def iter_log_requests(
+    path: str,
+    drop: Set[str],
+    requests: Set[str],
+    include_errors: bool,
+    path_filter: str,
+) -> Iterator[Dict[str, object]]:
+    """Yield one normalized record per matching log line."""
+    with open_log(path) as f:
+        for line in f:
+            m = LOG_LINE_RE.match(line)
+            if not m or m.group("method") != "GET":
+                continue
+            status = int(m.group("status"))
+            if not include_errors and not 200 <= status < 400:
+                continue
+            target = urlsplit(m.group("target"))
+            if path_filter not in target.path or not target.query:
+                continue
+            record = normalize_query(target.query, drop)
+            if record is None or str(record["request"]).lower() not in requests:
+                continue
+            try:
+                record["timestamp"] = parse_log_time(m.group("time"))
+            except ValueError:
+                continue
+            record["status"] = status
+            yield record
+
+
+def replay_frame(records: List[Dict[str, object]], speedup: float) -> pd.DataFrame:
+    """Sort by time and turn timestamps into offsets from the first request, compressed by the speed-up factor."""
+    df = pd.DataFrame(records).sort_values("timestamp", kind="stable").reset_index(drop=True)
+    df["offset_s"] = ((df["timestamp"] - df["timestamp"].iloc[0]) / speedup).round(3)
+    return df[["offset_s", "coverageId", "service", "request", "status", "query"]]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="Turn Petascope/nginx access logs into a replayable benchmark request CSV."
+    )
+    ap.add_argument("logs", nargs="+", help="Access log files (common/combined format, optionally .gz)")
+    ap.add_argument(
+        "--out",
+        default="log_replay_requests.csv",
+        help="Output request CSV (default: log_replay_requests.csv)",
+    )
+    ap.add_argument(
+        "--speedup",
+        type=float,
+        default=1.0,
+        help="Divide recorded inter-arrival gaps by this factor (default: 1 = real time)",
+    )
+    ap.add_argument(
+        "--requests",
+        default="GetCoverage,GetMap",
+        help="Comma-separated OWS REQUEST types to keep (default: GetCoverage,GetMap)",
+    )
+    ap.add_argument(
+        "--path",
+        default="/ows",
+        help="Only keep request paths containing this string (default: /ows)",
+    )
+    ap.add_argument(
+        "--drop-params",
+        default=DEFAULT_DROP_PARAMS,
+        help=f"Comma-separated query parameters to strip, case-insensitive (default: {DEFAULT_DROP_PARAMS})",
+    )
+    ap.add_argument(
+        "--include-errors",
+        action="store_true",
+        help="Also keep requests that were answered with 4xx/5xx",
+    )
+    ap.add_argument(
+        "--coverages",
+        default=None,
+        help="Optional coverages CSV (zeus_coverages.csv); requests for coverages not in it are dropped",
+    )
+    ap.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="Keep only the first N requests of the merged log",
+    )
+    args = ap.parse_args()
+
+    if args.speedup <= 0:
+        print("[ERROR] --speedup must be positive.", file=sys.stderr)
+        return 2
+    error = parquet_error(args.out, args.coverages)
+    if error:
+        print(f"[ERROR] {error}", file=sys.stderr)
+        return 2
+    drop = {p.strip().upper() for p in args.drop_params.split(",") if p.strip()}
+    requests = {r.strip().lower() for r in args.requests.split(",") if r.strip()}
+
+    records: List[Dict[str, object]] = []
+    for path in args.logs:
+        try:
+            records.extend(iter_log_requests(path, drop, requests, args.include_errors, args.path))
+        except OSError as exc:
+            print(f"[ERROR] Failed to read {path}: {exc}", file=sys.stderr)
+            return 2
+    if not records:
+        print("[ERROR] No matching OWS requests found in the logs.", file=sys.stderr)
+        return 2
+
+    df = replay_frame(records, args.speedup)
+    if args.coverages:
+        try:
+            known = set(read_table(args.coverages, ["coverageId"])["coverageId"].astype(str))
+        except Exception as exc:
+            print(f"[ERROR] Failed to read coverages CSV: {exc}", file=sys.stderr)
+            return 2
+        unknown = ~df["coverageId"].isin(known)
+        if unknown.any():
+            print(f"[WARN] Dropping {int(unknown.sum())} requests for coverages not in {args.coverages}.")
+            df = df[~unknown].reset_index(drop=True)
+    if args.limit is not None:
+        df = df.head(args.limit).copy()
+    if df.empty:
+        print("[ERROR] No requests left after filtering.", file=sys.stderr)
+        return 2
+    # the replay starts with the first request that was kept
+    df["offset_s"] = (df["offset_s"] - df["offset_s"].iloc[0]).round(3)
+
+    write_table(df, args.out)
+
+    span = float(df["offset_s"].iloc[-1])
+    rate = len(df) / span if span > 0 else float("nan")
+    print(
+        f"Wrote {len(df)} requests across {df['coverageId'].nunique()} coverages to {args.out} "
+        f"({span:.0f}s replay, {rate:.2f} req/s average)."
+    )
+    top: List[Tuple[str, int]] = list(df["coverageId"].value_counts().head(10).items())
+    if top:
+        print("Hottest coverages: " + ", ".join(f"{cov} ({n})" for cov, n in top))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
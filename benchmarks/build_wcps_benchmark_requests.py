@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Build WCPS (WCS ProcessCoverages) query strings that make the server aggregate rather than just cut out data, so
+benchmarks cover the processing work behind the SNAP Data API's summary endpoints. The script uses the same coverage
+CSV as build_wcs_benchmark_requests.py and writes one row per query with its class and the request string.
+
+Query classes (--classes), each generated --num-locations times per coverage it applies to:
+  time_average   avg() over a run of consecutive time positions in a small window around a jittered point,
+                 every other non-spatial axis sliced; returns a scalar
+  ensemble_mean  condense + over every integer-indexed non-time axis (model, scenario, era, ...) divided by the
+                 number of members, i.e. the ensemble mean of each cell in the window, time sliced
+  band_math      pixelwise arithmetic over the window: the normalized difference of the first two bands, or for
+                 single-band coverages each cell's anomaly from the window mean
+Windows are --cells x --cells grid cells around the point (cell-snapped like the WCS bbox class); coverages built
+without --describe have no grid resolution and get a single point instead, which makes every class return a scalar.
+"""
+
+import argparse
+import random
+import urllib.parse
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from benchlib.coverages import (
+    cell_bbox_subsets,
+    format_coord,
+    is_time_axis,
+    jitter_points,
+    keep_optimized_twins,
+    non_spatial_positions,
+    sample_slices,
+    spatial_resolution,
+    spatial_spec_from_row,
+    subset_value,
+)
+from benchlib.tables import parquet_error, read_table, write_table
+
+
+QUERY_CLASSES = ["time_average", "ensemble_mean", "band_math"]
+
+
+def build_wcps_query(coverage_id: str, expression: str, fmt: Optional[str]) -> str:
+    """
+    Query string for a WCS ProcessCoverages request evaluating `expression` over coverage $c.
+    Scalar results are returned as-is; coverage-valued ones are encoded in `fmt`.
+    """
+    body = f'encode({expression}, "{fmt}")' if fmt else expression
+    params = [
+        ("SERVICE", "WCS"),
+        ("VERSION", "2.0.1"),
+        ("REQUEST", "ProcessCoverages"),
+        ("QUERY", f"for $c in ({coverage_id}) return {body}"),
+    ]
+    return urllib.parse.urlencode(params, safe="():,$")
+
+
+def subset_expr(subsets: Dict[str, str]) -> str:
+    """$c[axis(value), axis(lo:hi), ...] from WCS-style subset values ("lo,hi" becomes a WCPS trim)."""
+    parts = [f"{axis}({value.replace(',', ':')})" for axis, value in subsets.items()]
+    return "$c[" + ", ".join(parts) + "]"
+
+
+def parse_classes(spec: str) -> List[str]:
+    classes = [c.strip() for c in spec.split(",") if c.strip()]
+    unknown = [c for c in classes if c not in QUERY_CLASSES]
+    if unknown or not classes:
+        raise ValueError(f"expected a comma-separated subset of {', '.join(QUERY_CLASSES)}")
+    return classes
+
+
+def ensemble_axes(positions: Dict[str, List[str]]) -> Dict[str, List[int]]:
+    """
+    Non-time axes whose known positions are consecutive integers (model/scenario indices and the like), which
+    condense can iterate over directly. Axes with a single position aren't worth aggregating.
+    """
+    out: Dict[str, List[int]] = {}
+    for axis, values in positions.items():
+        if is_time_axis(axis) or len(values) < 2:
+            continue
+        try:
+            numbers = [float(v) for v in values]
+        except ValueError:
+            continue
+        ints = [int(n) for n in numbers]
+        if ints != numbers or ints != list(range(ints[0], ints[0] + len(ints))):
+            continue
+        out[axis] = ints
+    return out
+
+
+def time_window(positions: Dict[str, List[str]], rng: random.Random, max_slices: int) -> Optional[Dict[str, str]]:
+    """A run of up to max_slices consecutive time positions (0 = all), or None without a usable time axis."""
+    for axis, values in positions.items():
+        if is_time_axis(axis) and len(values) > 1:
+            n = len(values) if max_slices <= 0 else min(max_slices, len(values))
+            start = rng.randrange(len(values) - n + 1)
+            return {axis: f"{subset_value(values[start])},{subset_value(values[start + n - 1])}"}
+    return None
+
+
+def band_math_expr(cut: str, bands: List[str]) -> str:
+    if len(bands) >= 2:
+        a, b = bands[0], bands[1]
+        return f"(({cut}).{a} - ({cut}).{b}) / (({cut}).{a} + ({cut}).{b})"
+    return f"{cut} - avg({cut})"
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Generate WCPS aggregation query strings for benchmarking.")
+    ap.add_argument("--in", dest="in_csv", default="zeus_coverages.csv", help="Input coverages CSV")
+    ap.add_argument(
+        "--out",
+        dest="out_csv",
+        default="zeus_wcps_benchmark_requests.csv",
+        help="Output CSV with WCPS query strings",
+    )
+    ap.add_argument(
+        "--format",
+        dest="fmt",
+        default="application/json",
+        help="Encoding for coverage-valued results (scalars are returned as-is)",
+    )
+    ap.add_argument(
+        "--classes",
+        default=",".join(QUERY_CLASSES),
+        help=f"Query classes to generate (default: {','.join(QUERY_CLASSES)})",
+    )
+    ap.add_argument(
+        "--num-locations",
+        dest="num_locations",
+        type=int,
+        default=5,
+        help="Queries per coverage and query class, each at its own jittered location",
+    )
+    ap.add_argument(
+        "--radius-xy-km",
+        dest="radius_xy_km",
+        type=float,
+        default=150.0,
+        help="Jitter radius (km) for projected X/Y coverages",
+    )
+    ap.add_argument(
+        "--radius-lonlat-deg",
+        dest="radius_lonlat_deg",
+        type=float,
+        default=2.0,
+        help="Jitter radius (degrees) for lon/lat coverages",
+    )
+    ap.add_argument(
+        "--cells",
+        type=int,
+        default=10,
+        help="Grid cells per side of the window each query aggregates over (default: 10)",
+    )
+    ap.add_argument(
+        "--time-slices",
+        dest="time_slices",
+        type=int,
+        default=0,
+        help="Maximum consecutive time positions averaged by time_average (default: 0 = the whole series)",
+    )
+    ap.add_argument(
+        "--seed",
+        dest="seed",
+        type=int,
+        default=None,
+        help="Random seed for reproducible locations",
+    )
+    args = ap.parse_args()
+
+    error = parquet_error(args.in_csv, args.out_csv)
+    if error:
+        print(f"[ERROR] {error}")
+        return 2
+    try:
+        classes = parse_classes(args.classes)
+    except ValueError as exc:
+        print(f"[ERROR] Invalid --classes: {exc}")
+        return 2
+    if args.cells < 1:
+        print("[ERROR] --cells must be a positive integer.")
+        return 2
+
+    rng = random.Random(args.seed)
+    df = read_table(args.in_csv)
+    df_filtered = keep_optimized_twins(df, "_wcs")
+
+    out_rows = []
+    no_resolution = set()
+    for _, r in df_filtered.iterrows():
+        if "wms" in r["coverageId"]:
+            continue
+        spec = spatial_spec_from_row(r)
+        if not spec:
+            continue
+
+        coverage_id = str(r["coverageId"])
+        radius = args.radius_xy_km * 1000.0 if spec["is_projected"] else args.radius_lonlat_deg
+        decimals = 0 if spec["is_projected"] else 4
+        positions = non_spatial_positions(r)
+        resolution = spatial_resolution(r, spec)
+        if resolution is None:
+            no_resolution.add(coverage_id)
+        members = ensemble_axes(positions)
+        bands = [b for b in str(r.get("band_names", "") or "").split(",") if b]
+
+        for query_class in classes:
+            if query_class == "ensemble_mean" and not members:
+                continue
+            if query_class == "time_average" and not any(
+                is_time_axis(a) and len(v) > 1 for a, v in positions.items()
+            ):
+                continue
+            points = jitter_points(
+                center_x=float(spec["center_x"]),
+                center_y=float(spec["center_y"]),
+                radius=radius,
+                count=args.num_locations,
+                rng=rng,
+            )
+            for x, y in points:
+                if resolution is not None:
+                    subsets, _, _ = cell_bbox_subsets(spec, x, y, resolution, args.cells, decimals)
+                else:
+                    subsets = {
+                        str(spec["axis_x"]): format_coord(x, decimals),
+                        str(spec["axis_y"]): format_coord(y, decimals),
+                    }
+                slices = sample_slices(positions, rng)
+                if query_class == "time_average":
+                    subsets.update(slices)
+                    subsets.update(time_window(positions, rng, args.time_slices))
+                    expression, fmt = f"avg({subset_expr(subsets)})", None
+                elif query_class == "ensemble_mean":
+                    subsets.update({a: v for a, v in slices.items() if a not in members})
+                    subsets.update({a: f"${a.lower()}" for a in members})
+                    over = ", ".join(f"${a.lower()} {a}({v[0]}:{v[-1]})" for a, v in members.items())
+                    count = 1
+                    for v in members.values():
+                        count *= len(v)
+                    expression = f"(condense + over {over} using {subset_expr(subsets)}) / {count}"
+                    fmt = args.fmt if resolution is not None else None
+                else:
+                    subsets.update(slices)
+                    expression = band_math_expr(subset_expr(subsets), bands)
+                    fmt = args.fmt if resolution is not None else None
+                out_rows.append(
+                    {
+                        "coverageId": coverage_id,
+                        "query_class": query_class,
+                        "wcps_query": build_wcps_query(coverage_id, expression, fmt),
+                    }
+                )
+
+    if no_resolution:
+        print(
+            f"[WARN] {len(no_resolution)} coverage(s) have no grid resolution in {args.in_csv} "
+            "(build it with get_zeus_capabilities.py --describe); their queries use a single point, and time_average "
+            "and ensemble_mean only see the axis positions --describe lists."
+        )
+    if not out_rows:
+        print("Warning: No request strings were generated.")
+    else:
+        cov_count = len({row["coverageId"] for row in out_rows})
+        print(f"Generated {len(out_rows)} requests across {cov_count} coverages.")
+        counts = pd.Series([row["query_class"] for row in out_rows]).value_counts()
+        print("Query classes: " + ", ".join(f"{name}={n}" for name, n in counts.items()))
+
+    rng.shuffle(out_rows)
+    write_table(pd.DataFrame(out_rows, columns=["coverageId", "query_class", "wcps_query"]), args.out_csv)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
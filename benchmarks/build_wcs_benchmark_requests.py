@@ -4,15 +4,41 @@ Build WCS 2.1 GetCoverage query strings that subset each OGC Coverage at one or
 spatial coordinate pairs in a bounding box around the centroid. The script uses a CSV of available
 coverages as the input and outputs a csv indexed by the coverage ID with a column
 for the request string.
+
+Each request is drawn from a mix of query classes (--mix) that differ in how much of the coverage they touch:
+  point             X/Y point, full extent of every other axis (the whole time series)
+  point_time_slice  X/Y point, one sampled position on every non-spatial axis
+  bbox_time_range   small bbox around a point, a run of consecutive time positions, other axes sliced
+  full_extent       whole spatial extent, one sampled position on every non-spatial axis
+  bbox              area of N x N grid cells (N drawn from --bbox-cells), one position on every non-spatial axis,
+                    so the payload scales with N^2 and latency can be plotted against bytes returned
+Non-spatial positions come from the coverage CSV (see benchlib.coverages.non_spatial_positions).
 """
 
 import argparse
 import random
 import urllib.parse
-from typing import Dict, Optional, Tuple, List
+from typing import Dict, Tuple, List
 
 import pandas as pd
 
+from benchlib.coverages import (
+    cell_bbox_subsets,
+    format_coord,
+    is_time_axis,
+    jitter_points,
+    keep_optimized_twins,
+    non_spatial_positions,
+    sample_slices,
+    spatial_resolution,
+    spatial_spec_from_row,
+    subset_value,
+)
+from benchlib.tables import parquet_error, read_table, write_table
+
+
+QUERY_CLASSES = ["point", "point_time_slice", "bbox_time_range", "full_extent", "bbox"]
+
 
 def build_wcs_query(
     coverage_id: str,
@@ -36,62 +62,82 @@ def build_wcs_query(
     return urllib.parse.urlencode(params, doseq=True, safe="():,/-")
 
 
-def spatial_spec_from_row(row: pd.Series) -> Optional[Dict[str, object]]:
-    """Derive spatial axes and centroid; prefer projected XY when available."""
-    axes = [a.strip() for a in str(row["axisList"]).split(",") if a.strip()]
-    if not axes:
-        return None
-
-    axes_lower = {a.lower() for a in axes}
-
-    # Prioritize projected XY coordinates when present.
-    if "x" in axes_lower and "y" in axes_lower:
-        return {
-            "axis_x": "X",
-            "axis_y": "Y",
-            "center_x": float(row["xy_centroid_x"]),
-            "center_y": float(row["xy_centroid_y"]),
-            "is_projected": True,
-        }
-
-    if "lon" in axes_lower and "lat" in axes_lower:
-        return {
-            "axis_x": "lon",
-            "axis_y": "lat",
-            "center_x": float(row["wgs84_centroid_lon"]),
-            "center_y": float(row["wgs84_centroid_lat"]),
-            "is_projected": False,
-        }
-
-    return None
-
-
-def jitter_points(
-    center_x: float,
-    center_y: float,
-    radius: float,
-    count: int,
-    rng: random.Random,
-) -> List[Tuple[float, float]]:
-    """Generate random points within a centered bbox."""
-    points: List[Tuple[float, float]] = []
-    minx = center_x - radius
-    maxx = center_x + radius
-    miny = center_y - radius
-    maxy = center_y + radius
-
-    for _ in range(count):
-        # Pick x/y uniformly within the centered bbox:
-        # [center_x - radius, center_x + radius] x [center_y - radius, center_y + radius].
-        x = rng.uniform(minx, maxx)
-        y = rng.uniform(miny, maxy)
-        points.append((x, y))
-    return points
-
-
-def format_coord(val: float, decimals: int) -> str:
-    """Helper to format coordinates to avoid excessive precision."""
-    return f"{val:.{decimals}f}"
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse a --mix value like "point=0.4,point_time_slice=0.3" into normalized class weights."""
+    weights: Dict[str, float] = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, sep, weight = part.partition("=")
+        name = name.strip()
+        if name not in QUERY_CLASSES:
+            raise ValueError(f"unknown query class {name!r} (expected one of {', '.join(QUERY_CLASSES)})")
+        try:
+            w = float(weight) if sep else 1.0
+        except ValueError:
+            raise ValueError(f"bad weight for {name!r}: {weight!r}")
+        if w < 0:
+            raise ValueError(f"negative weight for {name!r}")
+        weights[name] = w
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("mix needs at least one positive weight")
+    return {name: w / total for name, w in weights.items() if w > 0}
+
+
+def sample_time_range(
+    positions: Dict[str, List[str]], rng: random.Random, max_slices: int
+) -> Dict[str, str]:
+    """
+    Slice every non-spatial axis except time, which gets a run of up to max_slices consecutive positions.
+    Falls back to plain slices when the coverage has no time axis with more than one known position.
+    """
+    subsets = sample_slices(positions, rng)
+    for axis, values in positions.items():
+        if is_time_axis(axis) and len(values) > 1:
+            n = min(max(max_slices, 1), len(values))
+            start = rng.randrange(len(values) - n + 1)
+            subsets[axis] = f"{subset_value(values[start])},{subset_value(values[start + n - 1])}"
+            break
+    return subsets
+
+
+def clamp_range(lo: float, hi: float, bounds_lo: float, bounds_hi: float) -> Tuple[float, float]:
+    return max(lo, bounds_lo), min(hi, bounds_hi)
+
+
+def bbox_subsets(
+    spec: Dict[str, object],
+    x: float,
+    y: float,
+    half_width: float,
+    decimals: int,
+) -> Dict[str, str]:
+    """
+    X/Y range subsets for a square bbox around (x, y), clipped to the coverage bounds when known.
+    Jittered points can fall outside the coverage, so the center is pulled inside the bounds first.
+    """
+    bounds = spec.get("bounds")
+    if bounds:
+        x = min(max(x, bounds[0]), bounds[2])
+        y = min(max(y, bounds[1]), bounds[3])
+    minx, maxx = x - half_width, x + half_width
+    miny, maxy = y - half_width, y + half_width
+    if bounds:
+        minx, maxx = clamp_range(minx, maxx, bounds[0], bounds[2])
+        miny, maxy = clamp_range(miny, maxy, bounds[1], bounds[3])
+    return {
+        str(spec["axis_x"]): f"{format_coord(minx, decimals)},{format_coord(maxx, decimals)}",
+        str(spec["axis_y"]): f"{format_coord(miny, decimals)},{format_coord(maxy, decimals)}",
+    }
+
+
+def parse_cells(spec: str) -> List[int]:
+    """Parse --bbox-cells like "1,10,100,1000"."""
+    cells = [int(v) for v in spec.split(",") if v.strip()]
+    if not cells or any(c < 1 for c in cells):
+        raise ValueError("cells per side must be positive integers")
+    return cells
 
 
 def main() -> int:
@@ -131,6 +177,42 @@ def main() -> int:
         default=2.0,
         help="Jitter radius (degrees) for lon/lat coverages",
     )
+    ap.add_argument(
+        "--mix",
+        dest="mix",
+        default="point=1",
+        help=(
+            "Query class proportions, e.g. point=0.4,point_time_slice=0.3,bbox_time_range=0.2,full_extent=0.1 "
+            f"(classes: {', '.join(QUERY_CLASSES)}; default: point=1)"
+        ),
+    )
+    ap.add_argument(
+        "--bbox-radius-km",
+        dest="bbox_radius_km",
+        type=float,
+        default=25.0,
+        help="Half-width (km) of bbox_time_range boxes for projected X/Y coverages",
+    )
+    ap.add_argument(
+        "--bbox-radius-lonlat-deg",
+        dest="bbox_radius_lonlat_deg",
+        type=float,
+        default=0.25,
+        help="Half-width (degrees) of bbox_time_range boxes for lon/lat coverages",
+    )
+    ap.add_argument(
+        "--bbox-cells",
+        dest="bbox_cells",
+        default="1,10,100,1000",
+        help="Grid cells per side for bbox requests, drawn uniformly (default: 1,10,100,1000)",
+    )
+    ap.add_argument(
+        "--time-range-slices",
+        dest="time_range_slices",
+        type=int,
+        default=12,
+        help="Maximum consecutive time positions in a bbox_time_range request",
+    )
     ap.add_argument(
         "--seed",
         dest="seed",
@@ -140,18 +222,31 @@ def main() -> int:
     )
     args = ap.parse_args()
 
+    error = parquet_error(args.in_csv, args.out_csv)
+    if error:
+        print(f"[ERROR] {error}")
+        return 2
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as exc:
+        print(f"[ERROR] Invalid --mix: {exc}")
+        return 2
+    classes = list(mix)
+    class_weights = [mix[c] for c in classes]
+    try:
+        bbox_cells = parse_cells(args.bbox_cells)
+    except ValueError as exc:
+        print(f"[ERROR] Invalid --bbox-cells: {exc}")
+        return 2
+    no_resolution = set()
+
     rng = random.Random(args.seed)
 
-    df = pd.read_csv(args.in_csv)
+    df = read_table(args.in_csv)
 
     # only retain the "_wcs" twin when both base and optimized coverage IDs exist.
-    s = df["coverageId"].astype(str)
-    # base id = strip trailing "_wcs" if present
-    base = s.str.replace(r"_wcs$", "", regex=True)
-    # keep all "_wcs" rows; for non-_wcs rows, drop if a twin "_wcs" exists
-    has_wcs_twin = base.map((s.str.endswith("_wcs")).groupby(base).any())
-    keep = s.str.endswith("_wcs") | ~has_wcs_twin
-    df_filtered = df.loc[keep].copy()
+    df_filtered = keep_optimized_twins(df, "_wcs")
 
     out_rows = []
     for _, r in df_filtered.iterrows():
@@ -181,27 +276,68 @@ def main() -> int:
         axis_y = str(spec["axis_y"])
         # Coarser precision for meters; 4-decimal precision for lat/lon.
         decimals = 0 if spec["is_projected"] else 4
+        bbox_half_width = (
+            args.bbox_radius_km * 1000.0
+            if spec["is_projected"]
+            else args.bbox_radius_lonlat_deg
+        )
+        positions = non_spatial_positions(r)
+        resolution = spatial_resolution(r, spec)
         for x, y in points:
-            subsets = {
-                axis_x: format_coord(x, decimals),
-                axis_y: format_coord(y, decimals),
-            }
+            # a single-class mix doesn't draw, so the default output matches the point-only builder
+            query_class = classes[0] if len(classes) == 1 else rng.choices(classes, class_weights)[0]
+            if query_class == "bbox" and resolution is None:
+                # cell-sized boxes need the grid resolution from DescribeCoverage
+                no_resolution.add(r["coverageId"])
+                query_class = "point"
+            cell_info: Dict[str, object] = {}
+            if query_class == "bbox":
+                target = rng.choice(bbox_cells)
+                subsets, cells_x, cells_y = cell_bbox_subsets(spec, x, y, resolution, target, decimals)
+                subsets.update(sample_slices(positions, rng))
+                cell_info = {"bbox_cells_per_side": target, "cells": cells_x * cells_y}
+            elif query_class == "full_extent":
+                subsets = sample_slices(positions, rng)
+            elif query_class == "bbox_time_range":
+                subsets = bbox_subsets(spec, x, y, bbox_half_width, decimals)
+                subsets.update(sample_time_range(positions, rng, args.time_range_slices))
+            else:
+                subsets = {
+                    axis_x: format_coord(x, decimals),
+                    axis_y: format_coord(y, decimals),
+                }
+                if query_class == "point_time_slice":
+                    subsets.update(sample_slices(positions, rng))
             wcs_query = build_wcs_query(
                 coverage_id=str(r["coverageId"]),
                 subsets=subsets,
                 fmt=args.fmt,
             )
-            out_rows.append({"coverageId": r["coverageId"], "wcs_query": wcs_query})
+            out_rows.append(
+                {"coverageId": r["coverageId"], "wcs_query": wcs_query, "query_class": query_class, **cell_info}
+            )
 
+    if no_resolution:
+        print(
+            f"[WARN] {len(no_resolution)} coverage(s) have no grid resolution in {args.in_csv} "
+            "(build it with get_zeus_capabilities.py --describe); their bbox requests fell back to point."
+        )
     if not out_rows:
         print("Warning: No request strings were generated.")
     else:
         cov_count = len({row["coverageId"] for row in out_rows})
         print(f"Generated {len(out_rows)} requests across {cov_count} coverages.")
+        counts = pd.Series([row["query_class"] for row in out_rows]).value_counts()
+        print("Query classes: " + ", ".join(f"{name}={n}" for name, n in counts.items()))
 
     # shuffle to avoid pinging same coverage over and over.
     rng.shuffle(out_rows)
-    pd.DataFrame(out_rows).to_csv(args.out_csv, index=False)
+    # wcs_benchmarks.jmx binds columns by position (coverageId,wcs_query), so new columns only ever go after them
+    out = pd.DataFrame(out_rows, columns=["coverageId", "wcs_query", "query_class"])
+    if any("cells" in row for row in out_rows):
+        extra = pd.DataFrame(out_rows, columns=["bbox_cells_per_side", "cells"]).astype("Int64")
+        out = pd.concat([out, extra], axis=1)
+    write_table(out, args.out_csv)
     return 0
 
 
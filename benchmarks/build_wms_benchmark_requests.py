@@ -3,21 +3,47 @@
 Build WMS 1.3.0 GetMap query strings for benchmarking.
 Generates one request per coverage and writes them to a CSV
 with coverageId and wms_query columns.
+
+With --mode tiles it instead mimics a slippy-map client: 256x256 GetMap tiles from a tile pyramid laid over each
+coverage's bounds in its native CRS, requested in pan/zoom sessions with the styles registered by the coverage's
+ingest hooks. Each session only asks for tiles it hasn't already fetched (the browser keeps those), but different
+sessions overlap, so repeated tiles show how well the server caches.
 """
 
 import argparse
-import json
+import math
+import random
 import urllib.parse
-from typing import Dict, Optional, Tuple, List
+from pathlib import Path
+from typing import Dict, Tuple, List, Set
 
 import pandas as pd
 
+from benchlib.coverages import (
+    format_coord,
+    keep_optimized_twins,
+    non_spatial_axis_names,
+    non_spatial_lower_bounds_from_row,
+    spatial_spec_from_row,
+)
+from benchlib.recipes import find_styles
+from benchlib.tables import parquet_error, read_table, write_table
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# (dx, dy) tile steps for a pan
+PAN_DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
 
 def build_wms_query(
     coverage_id: str,
     bbox: str,
     crs: str,
     axis_params: Dict[str, str],
+    width: int = 800,
+    height: int = 600,
+    style: str = "",
 ) -> str:
     """Build the query string for a WMS GetMap request."""
     params = [
@@ -27,11 +53,11 @@ def build_wms_query(
         ("LAYERS", coverage_id),
         ("BBOX", bbox),
         ("CRS", crs),
-        ("WIDTH", 800),
-        ("HEIGHT", 600),
+        ("WIDTH", width),
+        ("HEIGHT", height),
         ("FORMAT", "image/png"),
         ("TRANSPARENT", "true"),
-        ("STYLES", ""),
+        ("STYLES", style),
     ]
     for name, value in axis_params.items():
         params.append((name, value))
@@ -39,35 +65,6 @@ def build_wms_query(
     return urllib.parse.urlencode(params, doseq=True)
 
 
-def spatial_spec_from_row(row: pd.Series) -> Optional[Dict[str, object]]:
-    """Derive spatial axes type and CRS; prefer projected XY when available."""
-    axes = [a.strip() for a in str(row["axisList"]).split(",") if a.strip()]
-    if not axes:
-        return None
-
-    axes_lower = {a.lower() for a in axes}
-
-    # Prioritize projected XY coordinates when present.
-    if "x" in axes_lower and "y" in axes_lower:
-        return {
-            "is_projected": True,
-            "epsg": str(row["epsg"]),
-        }
-
-    if "lon" in axes_lower and "lat" in axes_lower:
-        return {
-            "is_projected": False,
-            "epsg": "4326",
-        }
-
-    return None
-
-
-def format_coord(val: float, decimals: int) -> str:
-    """Helper to format coordinates to avoid excessive precision."""
-    return f"{val:.{decimals}f}"
-
-
 def parse_pair(val: str) -> Tuple[float, float]:
     """Parse a space-delimited numeric pair like 'x y' into a (x, y) tuple."""
     parts = str(val).split()
@@ -92,21 +89,6 @@ def bbox_from_bounds(
     return ",".join(format_coord(c, decimals) for c in coords)
 
 
-def non_spatial_axis_names(axis_list: str) -> List[str]:
-    """Return non-spatial axis names in axisList order."""
-    axes = [a.strip() for a in str(axis_list).split(",") if a.strip()]
-    spatial = {"x", "y", "lon", "lat"}
-    return [a for a in axes if a.lower() not in spatial]
-
-
-def non_spatial_lower_bounds_from_row(row: pd.Series) -> Dict[str, str]:
-    """Load non-spatial axis lower bounds from the coverage metadata CSV."""
-    lower_raw = row.get("non_spatial_lower_bounds")
-    if lower_raw is None or pd.isna(lower_raw):
-        return {}
-    return json.loads(str(lower_raw))
-
-
 def non_spatial_param_set(row: pd.Series) -> Dict[str, str]:
     """Return a single parameter set using lower bounds for all non-spatial axes."""
     axes = non_spatial_axis_names(row.get("axisList", ""))
@@ -117,6 +99,191 @@ def non_spatial_param_set(row: pd.Series) -> Dict[str, str]:
     return {axis: lower[axis] for axis in axes}
 
 
+def parse_zoom_levels(spec: str) -> Tuple[int, int]:
+    """Parse --zoom-levels like "0-5" (or a single level "3")."""
+    lo, _, hi = spec.partition("-")
+    zmin, zmax = int(lo), int(hi or lo)
+    if zmin < 0 or zmax < zmin:
+        raise ValueError(f"bad zoom range {spec!r}")
+    return zmin, zmax
+
+
+def parse_viewport(spec: str) -> Tuple[int, int]:
+    """Parse --viewport like "4x3" (tiles across x tiles down)."""
+    cols, _, rows = spec.lower().partition("x")
+    width, height = int(cols), int(rows or cols)
+    if width < 1 or height < 1:
+        raise ValueError(f"bad viewport {spec!r}")
+    return width, height
+
+
+class TilePyramid:
+    """
+    A quadtree of square tiles over a coverage's bounds in its native CRS. Zoom 0 is one tile covering the longer
+    side of the bounds, anchored at the lower-left corner; each zoom level halves the tile size.
+    Rows count up from the bottom.
+    """
+
+    def __init__(self, minx: float, miny: float, maxx: float, maxy: float):
+        self.minx, self.miny, self.maxx, self.maxy = minx, miny, maxx, maxy
+        self.extent = max(maxx - minx, maxy - miny)
+
+    def tile_span(self, zoom: int) -> float:
+        return self.extent / (2 ** zoom)
+
+    def tile_counts(self, zoom: int) -> Tuple[int, int]:
+        """Tiles along x and y at this zoom that intersect the coverage."""
+        span = self.tile_span(zoom)
+        return (
+            max(1, math.ceil((self.maxx - self.minx) / span - 1e-9)),
+            max(1, math.ceil((self.maxy - self.miny) / span - 1e-9)),
+        )
+
+    def tile_bounds(self, zoom: int, col: int, row: int) -> Tuple[float, float, float, float]:
+        span = self.tile_span(zoom)
+        x0 = self.minx + col * span
+        y0 = self.miny + row * span
+        return x0, y0, x0 + span, y0 + span
+
+
+def viewport_tiles(
+    pyramid: TilePyramid, zoom: int, center_col: int, center_row: int, viewport: Tuple[int, int]
+) -> List[Tuple[int, int]]:
+    """Tiles visible in a viewport centered on a tile, clipped to the pyramid; nearest the center first."""
+    cols, rows = pyramid.tile_counts(zoom)
+    half_w, half_h = viewport[0] // 2, viewport[1] // 2
+    tiles = [
+        (c, r)
+        for c in range(center_col - half_w, center_col - half_w + viewport[0])
+        for r in range(center_row - half_h, center_row - half_h + viewport[1])
+        if 0 <= c < cols and 0 <= r < rows
+    ]
+    # clients load the middle of the screen first
+    return sorted(tiles, key=lambda t: (t[0] - center_col) ** 2 + (t[1] - center_row) ** 2)
+
+
+def tile_session(
+    pyramid: TilePyramid,
+    zoom_range: Tuple[int, int],
+    viewport: Tuple[int, int],
+    steps: int,
+    rng: random.Random,
+) -> List[Tuple[int, int, int, int]]:
+    """
+    One map-browsing session as (step, zoom, col, row) tile fetches: open at the lowest zoom, then pan, zoom in or
+    zoom out. Tiles already fetched in the session are not requested again.
+    """
+    zmin, zmax = zoom_range
+    zoom = zmin
+    cols, rows = pyramid.tile_counts(zoom)
+    col, row = rng.randrange(cols), rng.randrange(rows)
+    seen: Set[Tuple[int, int, int]] = set()
+    out: List[Tuple[int, int, int, int]] = []
+    for step in range(steps + 1):
+        if step > 0:
+            move = rng.random()
+            if move < 0.3 and zoom < zmax:
+                # zoom in on one of the four child tiles
+                zoom += 1
+                col, row = 2 * col + rng.randrange(2), 2 * row + rng.randrange(2)
+            elif move < 0.4 and zoom > zmin:
+                zoom -= 1
+                col, row = col // 2, row // 2
+            else:
+                dx, dy = rng.choice(PAN_DIRECTIONS)
+                cols, rows = pyramid.tile_counts(zoom)
+                col = min(max(col + dx, 0), cols - 1)
+                row = min(max(row + dy, 0), rows - 1)
+        for c, r in viewport_tiles(pyramid, zoom, col, row, viewport):
+            if (zoom, c, r) not in seen:
+                seen.add((zoom, c, r))
+                out.append((step, zoom, c, r))
+    return out
+
+
+def styles_for(coverage_id: str, styles: Dict[str, List[str]]) -> List[str]:
+    """Styles registered for a coverage, falling back to its base coverage for "_wms" twins."""
+    found = styles.get(coverage_id)
+    if found is None and coverage_id.endswith("_wms"):
+        found = styles.get(coverage_id[: -len("_wms")])
+    return found or [""]
+
+
+def tile_rows(
+    r: pd.Series,
+    spec: Dict[str, object],
+    styles: List[str],
+    args: argparse.Namespace,
+    zoom_range: Tuple[int, int],
+    viewport: Tuple[int, int],
+    rng: random.Random,
+) -> List[Dict[str, object]]:
+    """Tile GetMap requests for every session over one coverage."""
+    lower = r["xy_lower"] if spec["is_projected"] else r["wgs84_lower"]
+    upper = r["xy_upper"] if spec["is_projected"] else r["wgs84_upper"]
+    minx, miny = parse_pair(lower)
+    maxx, maxy = parse_pair(upper)
+    pyramid = TilePyramid(minx, miny, maxx, maxy)
+
+    decimals = 0 if spec["is_projected"] else 6
+    axis_order = "yx" if str(spec["epsg"]) == "4326" else "xy"
+    crs = f"EPSG:{spec['epsg']}"
+    axis_params = non_spatial_param_set(r)
+
+    out: List[Dict[str, object]] = []
+    for session in range(args.sessions):
+        style = rng.choice(styles)
+        for step, zoom, col, row in tile_session(pyramid, zoom_range, viewport, args.steps, rng):
+            x0, y0, x1, y1 = pyramid.tile_bounds(zoom, col, row)
+            if not spec["is_projected"]:
+                # square tiles over a wide lon/lat coverage can overshoot the poles
+                y0, y1 = max(y0, -90.0), min(y1, 90.0)
+            coords = (y0, x0, y1, x1) if axis_order == "yx" else (x0, y0, x1, y1)
+            bbox = ",".join(format_coord(c, decimals) for c in coords)
+            # wms_benchmarks.jmx binds columns by position (coverageId,wms_query), so the rest go after them
+            out.append(
+                {
+                    "coverageId": r["coverageId"],
+                    "wms_query": build_wms_query(
+                        coverage_id=str(r["coverageId"]),
+                        bbox=bbox,
+                        crs=crs,
+                        axis_params=axis_params,
+                        width=args.tile_size,
+                        height=args.tile_size,
+                        style=style,
+                    ),
+                    "session": f"{r['coverageId']}#{session}",
+                    "step": step,
+                    "zoom": zoom,
+                    "tile_col": col,
+                    "tile_row": row,
+                    "style": style,
+                }
+            )
+    return out
+
+
+def interleave_sessions(rows: List[Dict[str, object]], rng: random.Random) -> List[Dict[str, object]]:
+    """
+    Shuffle the order in which sessions run (so coverages aren't hit back to back) while keeping each session's
+    own tile order, then mark the first request for each distinct tile/style.
+    """
+    sessions: Dict[str, List[Dict[str, object]]] = {}
+    for row in rows:
+        sessions.setdefault(str(row["session"]), []).append(row)
+    order = list(sessions)
+    rng.shuffle(order)
+    out: List[Dict[str, object]] = []
+    seen: Set[str] = set()
+    for name in order:
+        for row in sessions[name]:
+            row["first_request"] = row["wms_query"] not in seen
+            seen.add(str(row["wms_query"]))
+            out.append(row)
+    return out
+
+
 def main() -> int:
     ap = argparse.ArgumentParser(
         description="Generate WMS GetMap query strings for benchmarking."
@@ -130,16 +297,69 @@ def main() -> int:
         default="zeus_wms_benchmark_requests.csv",
         help="Output CSV with WMS query strings",
     )
+    ap.add_argument(
+        "--mode",
+        choices=["extent", "tiles"],
+        default="extent",
+        help="extent: one 800x600 full-extent GetMap per coverage; tiles: slippy-map tile sessions (default: extent)",
+    )
+    ap.add_argument(
+        "--zoom-levels",
+        default="0-4",
+        help="Tile pyramid zoom range for --mode tiles (default: 0-4)",
+    )
+    ap.add_argument(
+        "--viewport",
+        default="4x3",
+        help="Tiles visible at once, columns x rows (default: 4x3)",
+    )
+    ap.add_argument(
+        "--sessions",
+        type=int,
+        default=5,
+        help="Map-browsing sessions per coverage (default: 5)",
+    )
+    ap.add_argument(
+        "--steps",
+        type=int,
+        default=8,
+        help="Pan/zoom moves per session after the initial view (default: 8)",
+    )
+    ap.add_argument(
+        "--tile-size",
+        type=int,
+        default=256,
+        help="Tile WIDTH/HEIGHT in pixels (default: 256)",
+    )
+    ap.add_argument(
+        "--repo-root",
+        default=str(REPO_ROOT),
+        help="Directory to scan for ingest recipes with WMS style hooks (default: repo root)",
+    )
+    ap.add_argument(
+        "--no-styles",
+        action="store_true",
+        help="Request tiles with the default style instead of the styles from ingest hooks",
+    )
+    ap.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed for reproducible sessions",
+    )
     args = ap.parse_args()
 
-    df = pd.read_csv(args.in_csv)
+    error = parquet_error(args.in_csv, args.out_csv)
+    if error:
+        print(f"[ERROR] {error}")
+        return 2
+
+    df = read_table(args.in_csv)
+    if args.mode == "tiles":
+        return main_tiles(df, args)
 
     # Only retain the "_wms" twin when both base and optimized coverage IDs exist.
-    s = df["coverageId"].astype(str)
-    base = s.str.replace(r"_wms$", "", regex=True)
-    has_wms_twin = base.map((s.str.endswith("_wms")).groupby(base).any())
-    keep = s.str.endswith("_wms") | ~has_wms_twin
-    df_filtered = df.loc[keep].copy()
+    df_filtered = keep_optimized_twins(df, "_wms")
 
     out_rows = []
     for _, r in df_filtered.iterrows():
@@ -178,7 +398,50 @@ def main() -> int:
         cov_count = len({row["coverageId"] for row in out_rows})
         print(f"Generated {len(out_rows)} requests across {cov_count} coverages.")
 
-    pd.DataFrame(out_rows).to_csv(args.out_csv, index=False)
+    write_table(pd.DataFrame(out_rows), args.out_csv)
+    return 0
+
+
+def main_tiles(df: pd.DataFrame, args: argparse.Namespace) -> int:
+    try:
+        zoom_range = parse_zoom_levels(args.zoom_levels)
+        viewport = parse_viewport(args.viewport)
+    except ValueError as exc:
+        print(f"[ERROR] {exc}")
+        return 2
+    rng = random.Random(args.seed)
+    styles: Dict[str, List[str]] = {} if args.no_styles else find_styles(Path(args.repo_root).resolve())
+
+    rows: List[Dict[str, object]] = []
+    styled = 0
+    for _, r in keep_optimized_twins(df, "_wms").iterrows():
+        if "wcs" in r["coverageId"]:
+            continue
+        spec = spatial_spec_from_row(r)
+        if not spec:
+            continue
+        cov_styles = styles_for(str(r["coverageId"]), styles)
+        styled += cov_styles != [""]
+        try:
+            rows.extend(tile_rows(r, spec, cov_styles, args, zoom_range, viewport, rng))
+        except (IndexError, ValueError):
+            # coverages without usable bounds can't carry a tile grid
+            continue
+
+    if not rows:
+        print("Warning: No request strings were generated.")
+        write_table(pd.DataFrame(rows), args.out_csv)
+        return 0
+
+    rows = interleave_sessions(rows, rng)
+    out = pd.DataFrame(rows)
+    cov_count = out["coverageId"].nunique()
+    repeats = int((~out["first_request"]).sum())
+    print(
+        f"Generated {len(out)} tile requests in {out['session'].nunique()} sessions across {cov_count} coverages "
+        f"({styled} with ingest styles); {repeats} repeat an earlier tile."
+    )
+    write_table(out, args.out_csv)
     return 0
 
 
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark runs per coverage and flag latency/throughput regressions.
+Accepts either raw results CSVs (JMeter or load_generator.py output) or the *_results_summary.csv files written by
+the analyzers. With raw results, each delta gets a bootstrap confidence interval and a change is only called a
+regression/improvement when the interval excludes zero and the change is bigger than --min-change. Summaries only
+hold aggregates, so for those the deltas are reported without intervals and judged on --min-change alone.
+Coverages with fewer than --min-samples samples on either side (a default WMS run sends one request per coverage)
+get "insufficient samples" instead of a verdict: a bootstrap over a handful of values has a meaningless interval.
+"""
+
+import argparse
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from benchlib.results import load_results
+from benchlib.tables import read_table, table_columns, write_table
+
+
+# statistic name -> (summary column, sample column, function over a 2D array of resamples)
+STATS: Dict[str, Tuple[str, str, Callable[[np.ndarray], np.ndarray]]] = {
+    "latency_mean_ms": ("latency_mean_ms", "latency_ms", lambda a: a.mean(axis=-1)),
+    "latency_p50_ms": ("latency_p50_ms", "latency_ms", lambda a: np.percentile(a, 50, axis=-1)),
+    "latency_p95_ms": ("latency_p95_ms", "latency_ms", lambda a: np.percentile(a, 95, axis=-1)),
+    "throughput_mean_bps": ("throughput_mean_bps", "throughput_bps", lambda a: a.mean(axis=-1)),
+}
+
+# Lower is better for latency, higher is better for throughput.
+HIGHER_IS_BETTER = {"throughput_mean_bps"}
+
+INSUFFICIENT = "insufficient samples"
+
+
+def is_raw_results(path: str) -> bool:
+    """Raw results files have a URL column; summaries don't."""
+    return "URL" in table_columns(path)
+
+
+def bootstrap_delta(
+    baseline: np.ndarray,
+    candidate: np.ndarray,
+    stat: Callable[[np.ndarray], np.ndarray],
+    n_boot: int,
+    alpha: float,
+    max_samples: int,
+    rng: np.random.Generator,
+) -> Tuple[float, float, float]:
+    """
+    Bootstrap the difference stat(candidate) - stat(baseline).
+    Returns (point estimate, CI low, CI high). Samples are capped at max_samples per side (drawn without
+    replacement) so very large runs stay cheap; resampling is vectorized as an (n_boot, n) index array.
+    """
+    baseline = baseline[~np.isnan(baseline)]
+    candidate = candidate[~np.isnan(candidate)]
+    if baseline.size == 0 or candidate.size == 0:
+        return np.nan, np.nan, np.nan
+    point = float(stat(candidate) - stat(baseline))
+    if baseline.size > max_samples:
+        baseline = rng.choice(baseline, max_samples, replace=False)
+    if candidate.size > max_samples:
+        candidate = rng.choice(candidate, max_samples, replace=False)
+    b = stat(baseline[rng.integers(0, baseline.size, (n_boot, baseline.size))])
+    c = stat(candidate[rng.integers(0, candidate.size, (n_boot, candidate.size))])
+    low, high = np.percentile(c - b, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+    return point, float(low), float(high)
+
+
+def verdict(
+    name: str,
+    baseline: float,
+    delta: float,
+    ci_low: Optional[float],
+    ci_high: Optional[float],
+    min_change: float,
+) -> str:
+    """Classify a delta as regression, improvement or no change."""
+    if np.isnan(delta) or np.isnan(baseline) or baseline == 0:
+        return "n/a"
+    if abs(delta) / abs(baseline) < min_change:
+        return "no change"
+    if ci_low is not None and ci_high is not None and ci_low <= 0 <= ci_high:
+        return "no change"
+    worse = delta < 0 if name in HIGHER_IS_BETTER else delta > 0
+    return "regression" if worse else "improvement"
+
+
+def compare_raw(
+    baseline: pd.DataFrame,
+    candidate: pd.DataFrame,
+    n_boot: int,
+    alpha: float,
+    max_samples: int,
+    min_change: float,
+    min_samples: int,
+    seed: Optional[int],
+) -> pd.DataFrame:
+    """Per-coverage deltas with bootstrap confidence intervals from per-sample results."""
+    rng = np.random.default_rng(seed)
+    base_groups = dict(tuple(baseline.groupby("coverageId")))
+    cand_groups = dict(tuple(candidate.groupby("coverageId")))
+    rows: List[Dict[str, object]] = []
+    for cov in sorted(set(base_groups) | set(cand_groups)):
+        row: Dict[str, object] = {"coverageId": cov}
+        b = base_groups.get(cov)
+        c = cand_groups.get(cov)
+        row["baseline_count"] = 0 if b is None else len(b)
+        row["candidate_count"] = 0 if c is None else len(c)
+        if b is None or c is None:
+            row["status"] = "baseline only" if c is None else "candidate only"
+            rows.append(row)
+            continue
+        statuses = []
+        for name, (_, col, fn) in STATS.items():
+            b_vals = b[col].to_numpy(dtype=np.float64)
+            c_vals = c[col].to_numpy(dtype=np.float64)
+            b_stat = float(fn(b_vals[~np.isnan(b_vals)])) if (~np.isnan(b_vals)).any() else np.nan
+            c_stat = float(fn(c_vals[~np.isnan(c_vals)])) if (~np.isnan(c_vals)).any() else np.nan
+            row[f"baseline_{name}"] = b_stat
+            row[f"candidate_{name}"] = c_stat
+            if min((~np.isnan(b_vals)).sum(), (~np.isnan(c_vals)).sum()) < min_samples:
+                delta, low, high = c_stat - b_stat, np.nan, np.nan
+                row[f"verdict_{name}"] = INSUFFICIENT
+            else:
+                delta, low, high = bootstrap_delta(b_vals, c_vals, fn, n_boot, alpha, max_samples, rng)
+                row[f"verdict_{name}"] = verdict(name, b_stat, delta, low, high, min_change)
+            row[f"delta_{name}"] = delta
+            row[f"delta_{name}_ci_low"] = low
+            row[f"delta_{name}_ci_high"] = high
+            row[f"pct_change_{name}"] = 100.0 * delta / b_stat if b_stat else np.nan
+            statuses.append(row[f"verdict_{name}"])
+        row["status"] = overall_status(statuses)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def compare_summaries(
+    baseline: pd.DataFrame, candidate: pd.DataFrame, min_change: float, min_samples: int
+) -> pd.DataFrame:
+    """Per-coverage deltas between two analyzer summaries (no intervals: summaries only hold aggregates)."""
+    merged = baseline.merge(candidate, on="coverageId", how="outer", suffixes=("_b", "_c"), indicator=True)
+    rows: List[Dict[str, object]] = []
+    for _, r in merged.sort_values("coverageId").iterrows():
+        row: Dict[str, object] = {"coverageId": r["coverageId"]}
+        row["baseline_count"] = r.get("count_total_b", np.nan)
+        row["candidate_count"] = r.get("count_total_c", np.nan)
+        if r["_merge"] != "both":
+            row["status"] = "baseline only" if r["_merge"] == "left_only" else "candidate only"
+            rows.append(row)
+            continue
+        # count_used excludes warm-up and failed samples, so it is what the summary statistics were computed from
+        counts = [r.get(f"count_used_{side}", r.get(f"count_total_{side}", np.nan)) for side in ("b", "c")]
+        too_few = any(pd.isna(n) or float(n) < min_samples for n in counts)
+        statuses = []
+        for name, (summary_col, _, _) in STATS.items():
+            if f"{summary_col}_b" not in r or f"{summary_col}_c" not in r:
+                continue
+            b_stat = float(r[f"{summary_col}_b"])
+            c_stat = float(r[f"{summary_col}_c"])
+            delta = c_stat - b_stat
+            row[f"baseline_{name}"] = b_stat
+            row[f"candidate_{name}"] = c_stat
+            row[f"delta_{name}"] = delta
+            row[f"pct_change_{name}"] = 100.0 * delta / b_stat if b_stat else np.nan
+            row[f"verdict_{name}"] = INSUFFICIENT if too_few else verdict(name, b_stat, delta, None, None, min_change)
+            statuses.append(row[f"verdict_{name}"])
+        row["status"] = overall_status(statuses)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def overall_status(statuses: List[str]) -> str:
+    """A coverage regressed if any statistic regressed; it improved if something improved and nothing regressed."""
+    if "regression" in statuses:
+        return "regression"
+    if "improvement" in statuses:
+        return "improvement"
+    if INSUFFICIENT in statuses:
+        return INSUFFICIENT
+    return "no change"
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="Compare two benchmark runs per coverage and flag regressions."
+    )
+    ap.add_argument("baseline", help="Baseline results CSV or results summary CSV")
+    ap.add_argument("candidate", help="Candidate results CSV or results summary CSV")
+    ap.add_argument(
+        "--out",
+        default="results_comparison.csv",
+        help="Output CSV (default: results_comparison.csv)",
+    )
+    ap.add_argument(
+        "--id-param",
+        default=None,
+        help="URL parameter holding the coverage ID in raw results (default: auto-detect COVERAGEID/LAYERS)",
+    )
+    ap.add_argument(
+        "--bootstrap", type=int, default=1000, help="Bootstrap resamples (default: 1000)"
+    )
+    ap.add_argument(
+        "--alpha",
+        type=float,
+        default=0.05,
+        help="Significance level for confidence intervals (default: 0.05 -> 95%% CI)",
+    )
+    ap.add_argument(
+        "--max-samples",
+        type=int,
+        default=5000,
+        help="Cap on samples per coverage per run used for bootstrapping (default: 5000)",
+    )
+    ap.add_argument(
+        "--min-change",
+        type=float,
+        default=0.05,
+        help="Smallest relative change worth flagging (default: 0.05 = 5%%)",
+    )
+    ap.add_argument(
+        "--min-samples",
+        type=int,
+        default=10,
+        help="Fewest samples per coverage on each side for a verdict; below it, 'insufficient samples' (default: 10)",
+    )
+    ap.add_argument("--seed", type=int, default=None, help="Random seed for bootstrapping")
+    args = ap.parse_args()
+    if args.min_samples < 1:
+        print("[ERROR] --min-samples must be at least 1.", file=sys.stderr)
+        return 2
+
+    try:
+        raw = [is_raw_results(args.baseline), is_raw_results(args.candidate)]
+    except Exception as exc:
+        print(f"[ERROR] Failed to read inputs: {exc}", file=sys.stderr)
+        return 2
+    if raw[0] != raw[1]:
+        print("[ERROR] Compare two raw results files or two summaries, not one of each.", file=sys.stderr)
+        return 2
+
+    try:
+        if raw[0]:
+            comparison = compare_raw(
+                load_results(args.baseline, args.id_param),
+                load_results(args.candidate, args.id_param),
+                n_boot=args.bootstrap,
+                alpha=args.alpha,
+                max_samples=args.max_samples,
+                min_change=args.min_change,
+                min_samples=args.min_samples,
+                seed=args.seed,
+            )
+        else:
+            comparison = compare_summaries(
+                read_table(args.baseline),
+                read_table(args.candidate),
+                min_change=args.min_change,
+                min_samples=args.min_samples,
+            )
+    except Exception as exc:
+        print(f"[ERROR] Failed to compare runs: {exc}", file=sys.stderr)
+        return 2
+
+    if comparison.empty:
+        print("[ERROR] No coverages found in either run.", file=sys.stderr)
+        return 2
+
+    # Round metrics for readable output.
+    for col in comparison.columns:
+        if col.startswith(("baseline_", "candidate_", "delta_")) and not col.endswith("_count"):
+            comparison[col] = comparison[col].round(0).astype("Int64")
+        elif col.startswith("pct_change_"):
+            comparison[col] = comparison[col].round(1)
+    write_table(comparison, args.out)
+
+    for status in ["regression", "improvement"]:
+        covs = comparison.loc[comparison["status"] == status, "coverageId"].tolist()
+        if covs:
+            print(f"[{status.upper()}] {len(covs)} coverage(s): {', '.join(covs)}")
+    too_few = int((comparison["status"] == INSUFFICIENT).sum())
+    if too_few:
+        print(
+            f"[WARN] {too_few} coverage(s) have fewer than {args.min_samples} samples in a run; no verdict "
+            "(send more requests per coverage, or lower --min-samples)."
+        )
+    print(f"[OK] Wrote comparison: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
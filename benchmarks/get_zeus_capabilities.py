@@ -2,18 +2,36 @@
 """
 Fetch Zeus WCS 2.1.0 GetCapabilities document and write a coverage metadata CSV that will be used to build some requests.
 Most of this script is ugly XML parsing. The best way to verify the behavior of this script is to compare the output CSV file to what you see on Petascope.
+
+The document is parsed as it streams in: each CoverageSummary becomes a CSV row as soon as its end tag arrives and
+is then dropped, so memory stays flat no matter how many coverages the server has.
+It is also cached on disk (see benchlib/http_cache.py) and re-requested with If-None-Match/If-Modified-Since,
+and with --incremental only coverages whose CoverageSummary changed since the last run are re-derived.
+Use --capabilities-file to read a local fixture XML instead of the live server.
+With --describe, DescribeCoverage is also fetched for every coverage (see benchlib/describe.py) and the CSV gains
+grid extent, resolution, irregular axis positions and band/nil columns.
 """
 
 import argparse
 import csv
+import hashlib
 import json
 import re
 import sys
-from typing import Dict, List, Optional, Tuple
+import time
+from collections import deque
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 
+import pandas as pd
 import requests
 import xml.etree.ElementTree as ET
 
+from benchlib.describe import DESCRIBE_HEADERS, DescribeHarvester, describe_columns
+from benchlib.http_cache import HttpCache
+from benchlib.tables import is_parquet, parquet_error, write_table
+
 
 ZEUS_CAPABILITIES_URL = "https://zeus.snap.uaf.edu/rasdaman/ows?SERVICE=WCS&ACCEPTVERSIONS=2.1.0&REQUEST=GetCapabilities"
 
@@ -40,6 +58,11 @@ CSV_HEADERS = [
     "non_spatial_lower_bounds",
 ]
 
+SUMMARY_TAG = f"{{{NS['wcs']}}}CoverageSummary"
+
+# bytes handed to the XML parser at a time
+CHUNK_SIZE = 1 << 16
+
 EPSG_RE = re.compile(r"/crs/EPSG/0/(\d{4})(?:\b|$)")
 FLOAT_RE = re.compile(r"[-+]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?")
 
@@ -52,13 +75,63 @@ def fmt_num(x: float) -> str:
     return s if s else "0"
 
 
-def fetch_capabilities_xml() -> ET.Element:
+def capabilities_chunks(
+    url: str = ZEUS_CAPABILITIES_URL, cache: Optional[HttpCache] = None
+) -> Iterator[bytes]:
+    """
+    Stream the Rasdaman GetCapabilities document from Zeus in chunks as they arrive.
+    With a cache, an unchanged document is answered with a 304 and replayed from disk.
+    """
+    if cache is not None:
+        yield from cache.stream(url, timeout=30, chunk_size=CHUNK_SIZE)
+        return
+    with requests.get(url, timeout=30, stream=True) as r:
+        r.raise_for_status()
+        yield from r.iter_content(chunk_size=CHUNK_SIZE)
+
+
+def file_chunks(path: str) -> Iterator[bytes]:
+    """Read a GetCapabilities document saved on disk, e.g. a test fixture."""
+    with open(path, "rb") as f:
+        yield from iter(lambda: f.read(CHUNK_SIZE), b"")
+
+
+def iter_coverage_summaries(chunks: Iterable[bytes]) -> Iterator[ET.Element]:
     """
-    Fetch the Rasdaman GetCapabilities document from Zeus.
+    Incrementally parse a GetCapabilities document, yielding each CoverageSummary element once it is complete.
+    After the caller is done with an element it is cleared and detached from its parent, so the partially built
+    tree never holds more than one summary.
     """
-    r = requests.get(ZEUS_CAPABILITIES_URL, timeout=30)
-    r.raise_for_status()
-    return ET.fromstring(r.content.strip())
+    parser = ET.XMLPullParser(events=("start", "end"))
+    ancestors: List[ET.Element] = []
+
+    def drain() -> Iterator[ET.Element]:
+        for event, el in parser.read_events():
+            if event == "start":
+                ancestors.append(el)
+                continue
+            ancestors.pop()
+            if el.tag == SUMMARY_TAG:
+                # the tail (inter-element whitespace) may still be arriving; drop it so the element serializes
+                # the same whatever the chunk boundaries were
+                el.tail = None
+                yield el
+                el.clear()
+                if ancestors:
+                    ancestors[-1].remove(el)
+
+    leading = True
+    for chunk in chunks:
+        if leading:
+            # the server sometimes sends whitespace ahead of the XML declaration
+            chunk = chunk.lstrip()
+            if not chunk:
+                continue
+            leading = False
+        parser.feed(chunk)
+        yield from drain()
+    parser.close()
+    yield from drain()
 
 
 def simplify_epsg(native_crs: str) -> str:
@@ -185,73 +258,57 @@ def xy_and_centroid(
     return "", "", "", ""
 
 
-def iter_rows(caps_root: ET.Element):
-    for cs in caps_root.findall(".//wcs:CoverageSummary", NS):
-        cov_id = (
-            cs.findtext("wcs:CoverageId", default="", namespaces=NS) or ""
-        ).strip()
-        if not cov_id:
-            continue
-
-        # declutter the benchmarks by avoiding in-flight test coverages
-        if "test" in cov_id:
-            continue
-
-        add = extract_additional_params(cs)
-        axis_list = [
-            a.strip() for a in (add.get("axisList", "")).split(",") if a.strip()
-        ]
-        size_bytes = add.get("sizeInBytes", "")
-        ndim = str(len(axis_list)) if axis_list else ""
-
-        native_crs, n_lo, n_hi = parse_corners(cs.find("ows:BoundingBox", NS))
-        epsg = simplify_epsg(native_crs)
-
-        _, w_lo, w_hi = parse_corners(cs.find("ows:WGS84BoundingBox", NS))
-        w_lower, w_upper, w_clon, w_clat = xy_and_centroid(["lon", "lat"], w_lo, w_hi)
-
-        # xy bounds and centroid
-        xy_lower, xy_upper, xy_cx, xy_cy = xy_and_centroid(axis_list, n_lo, n_hi)
-        non_spatial_lower = non_spatial_lower_bounds(axis_list, n_lo)
-
-        # some heuristics to simplify things
-        if epsg == "NOT_FOUND":
-            # if there is no CRS, we don't need to consider geospatial coordinates
-            # not a common case, but hydroviz and such are in this category
-            xy_lower = xy_upper = xy_cx = xy_cy = "NOT_FOUND"
-            w_lower = w_upper = w_clon = w_clat = "NOT_FOUND"
-            non_spatial_lower = "NOT_FOUND"
-        elif epsg == "4326":
-            # if the CRS is 4326, we don't need to consider projected XY coordinates
-            # less common for data to be unprojected 4326
-            xy_lower = xy_upper = xy_cx = xy_cy = ""
-        elif epsg == "3338" and (xy_lower.strip() or xy_upper.strip()):
-            # most common: projected data, and here we don't need the geographic lat-lon bounds for benchmarking
-            w_lower = w_upper = w_clon = w_clat = ""
-
-        # skip coverages without some type or orthodox spatial axes (i.e. those with stream segments, etc.)
-
-        if all(
-            val == "NOT_FOUND"
-            for val in [
-                xy_lower,
-                xy_upper,
-                xy_cx,
-                xy_cy,
-                w_lower,
-                w_upper,
-                w_clon,
-                w_clat,
-            ]
-        ):
-            continue
-
-        yield [
-            cov_id,
-            ",".join(axis_list),
-            ndim,
-            size_bytes,
-            epsg,
+def coverage_id_of(cs: ET.Element) -> str:
+    return (cs.findtext("wcs:CoverageId", default="", namespaces=NS) or "").strip()
+
+
+def row_from_summary(cs: ET.Element) -> Optional[List[str]]:
+    """Derive one CSV row from a CoverageSummary element, or None if the coverage is skipped."""
+    cov_id = coverage_id_of(cs)
+    if not cov_id:
+        return None
+
+    # declutter the benchmarks by avoiding in-flight test coverages
+    if "test" in cov_id:
+        return None
+
+    add = extract_additional_params(cs)
+    axis_list = [
+        a.strip() for a in (add.get("axisList", "")).split(",") if a.strip()
+    ]
+    size_bytes = add.get("sizeInBytes", "")
+    ndim = str(len(axis_list)) if axis_list else ""
+
+    native_crs, n_lo, n_hi = parse_corners(cs.find("ows:BoundingBox", NS))
+    epsg = simplify_epsg(native_crs)
+
+    _, w_lo, w_hi = parse_corners(cs.find("ows:WGS84BoundingBox", NS))
+    w_lower, w_upper, w_clon, w_clat = xy_and_centroid(["lon", "lat"], w_lo, w_hi)
+
+    # xy bounds and centroid
+    xy_lower, xy_upper, xy_cx, xy_cy = xy_and_centroid(axis_list, n_lo, n_hi)
+    non_spatial_lower = non_spatial_lower_bounds(axis_list, n_lo)
+
+    # some heuristics to simplify things
+    if epsg == "NOT_FOUND":
+        # if there is no CRS, we don't need to consider geospatial coordinates
+        # not a common case, but hydroviz and such are in this category
+        xy_lower = xy_upper = xy_cx = xy_cy = "NOT_FOUND"
+        w_lower = w_upper = w_clon = w_clat = "NOT_FOUND"
+        non_spatial_lower = "NOT_FOUND"
+    elif epsg == "4326":
+        # if the CRS is 4326, we don't need to consider projected XY coordinates
+        # less common for data to be unprojected 4326
+        xy_lower = xy_upper = xy_cx = xy_cy = ""
+    elif epsg == "3338" and (xy_lower.strip() or xy_upper.strip()):
+        # most common: projected data, and here we don't need the geographic lat-lon bounds for benchmarking
+        w_lower = w_upper = w_clon = w_clat = ""
+
+    # skip coverages without some type or orthodox spatial axes (i.e. those with stream segments, etc.)
+
+    if all(
+        val == "NOT_FOUND"
+        for val in [
             xy_lower,
             xy_upper,
             xy_cx,
@@ -260,29 +317,235 @@ def iter_rows(caps_root: ET.Element):
             w_upper,
             w_clon,
             w_clat,
-            non_spatial_lower,
         ]
+    ):
+        return None
+
+    return [
+        cov_id,
+        ",".join(axis_list),
+        ndim,
+        size_bytes,
+        epsg,
+        xy_lower,
+        xy_upper,
+        xy_cx,
+        xy_cy,
+        w_lower,
+        w_upper,
+        w_clon,
+        w_clat,
+        non_spatial_lower,
+    ]
+
+
+def iter_rows(summaries: Iterable[ET.Element]) -> Iterator[List[str]]:
+    for cs in summaries:
+        row = row_from_summary(cs)
+        if row is not None:
+            yield row
+
+
+class RowCache:
+    """
+    Rows derived on earlier runs, keyed by coverage ID and stored with a digest of the CoverageSummary they came
+    from. A coverage whose summary is byte-identical to last time reuses its row instead of being parsed again.
+    The whole cache is dropped if CSV_HEADERS change, since old rows would have the wrong shape.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, Dict[str, object]] = {}
+        self.reused = 0
+        self.derived = 0
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("headers") == CSV_HEADERS:
+            self.entries = data.get("rows", {})
+
+    def row(self, cs: ET.Element) -> Optional[List[str]]:
+        cov_id = coverage_id_of(cs)
+        digest = hashlib.sha256(ET.tostring(cs)).hexdigest()
+        cached = self.entries.get(cov_id)
+        if cached is not None and cached.get("digest") == digest:
+            self.reused += 1
+            return cached.get("row")
+        self.derived += 1
+        row = row_from_summary(cs)
+        # skipped coverages are cached too (row None) so they aren't re-examined every run
+        self.entries[cov_id] = {"digest": digest, "row": row}
+        return row
+
+    def save(self, seen: List[str]) -> None:
+        # forget coverages that disappeared from the document
+        rows = {cov: self.entries[cov] for cov in seen if cov in self.entries}
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"headers": CSV_HEADERS, "rows": rows}), encoding="utf-8")
+        tmp.replace(self.path)
+
+
+def iter_rows_incremental(summaries: Iterable[ET.Element], row_cache: RowCache) -> Iterator[List[str]]:
+    seen: List[str] = []
+    for cs in summaries:
+        seen.append(coverage_id_of(cs))
+        row = row_cache.row(cs)
+        if row is not None:
+            yield row
+    row_cache.save(seen)
+
+
+def enrich_rows(rows: Iterable[List[str]], harvester: DescribeHarvester) -> Iterator[List[str]]:
+    """
+    Append DescribeCoverage columns to each row, in input order. Requests are queued as coverages are parsed, so
+    harvesting overlaps with reading the rest of the capabilities document, but only up to twice the worker count
+    are in flight: rows stream out as their descriptions arrive instead of after the whole document is read.
+    """
+    window = 2 * harvester.workers
+    pending: Deque[Tuple[List[str], "Future[Optional[Dict[str, object]]]"]] = deque()
+    for row in rows:
+        pending.append((row, harvester.submit(row[0])))
+        if len(pending) >= window:
+            done, future = pending.popleft()
+            yield done + describe_columns(future.result())
+    while pending:
+        done, future = pending.popleft()
+        yield done + describe_columns(future.result())
+
+
+def ows_endpoint(url: str) -> str:
+    """The service endpoint of an OWS request URL, without its query string."""
+    return url.split("?", 1)[0]
 
 
 def main() -> int:
     ap = argparse.ArgumentParser()
-    ap.add_argument("--out", default="zeus_coverages.csv")
+    ap.add_argument("--out", default="zeus_coverages.csv", help="Output CSV, or Parquet for a .parquet path")
+    ap.add_argument(
+        "--url",
+        default=None,
+        help="GetCapabilities URL (default: Zeus); --describe sends DescribeCoverage to the same endpoint",
+    )
+    ap.add_argument(
+        "--capabilities-file",
+        default=None,
+        help="Read GetCapabilities from a local XML file instead of fetching it",
+    )
+    ap.add_argument(
+        "--cache-dir",
+        default=".capabilities_cache",
+        help="Directory for the cached document and derived rows (default: .capabilities_cache)",
+    )
+    ap.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always download the full document and don't touch the cache",
+    )
+    ap.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-derive rows for coverages whose CoverageSummary changed since the last run",
+    )
+    ap.add_argument(
+        "--describe",
+        action="store_true",
+        help="Also harvest DescribeCoverage for every coverage and add grid/axis/band columns",
+    )
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Concurrent DescribeCoverage requests with --describe (default: 8)",
+    )
     args = ap.parse_args()
 
+    error = parquet_error(args.out)
+    if error:
+        print(f"[ERROR] {error}", file=sys.stderr)
+        return 2
+    if args.describe and args.capabilities_file and not args.url:
+        # the rows come from the file, so don't quietly send their DescribeCoverage requests to Zeus
+        print(
+            "[ERROR] --describe with --capabilities-file needs --url for the DescribeCoverage endpoint.",
+            file=sys.stderr,
+        )
+        return 2
+    if args.incremental and args.no_cache:
+        # the rows from the last run are kept in the cache directory
+        print("[ERROR] --incremental needs the cache; it can't be combined with --no-cache.", file=sys.stderr)
+        return 2
+    url = args.url or ZEUS_CAPABILITIES_URL
+
+    cache = None if args.no_cache else HttpCache(args.cache_dir)
+    if args.capabilities_file:
+        chunks = file_chunks(args.capabilities_file)
+        previous = None
+    else:
+        chunks = capabilities_chunks(url, cache)
+        previous = cache.metadata(url) if cache is not None else None
+    summaries = iter_coverage_summaries(chunks)
+
+    row_cache = None
+    if args.incremental and cache is not None:
+        row_cache = RowCache(cache.dir / "coverage_rows.json")
+        rows = iter_rows_incremental(summaries, row_cache)
+    else:
+        rows = iter_rows(summaries)
+
+    headers = list(CSV_HEADERS)
+    harvester = None
+    if args.describe:
+        harvester = DescribeHarvester(ows_endpoint(url), workers=max(1, args.workers), cache=cache)
+        rows = enrich_rows(rows, harvester)
+        headers += DESCRIBE_HEADERS
+
+    # rows are written as they are parsed, so write to a temp file and only replace --out on success
+    out_path = Path(args.out)
+    tmp_path = out_path.with_name(out_path.name + (".csv.tmp" if is_parquet(args.out) else ".tmp"))
+    count = 0
+    start = time.perf_counter()
+    first_row_s = None
     try:
-        capabilities_root = fetch_capabilities_xml()
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(headers)
+            for row in rows:
+                if first_row_s is None:
+                    first_row_s = time.perf_counter() - start
+                w.writerow(row)
+                count += 1
     except Exception as e:
+        tmp_path.unlink(missing_ok=True)
         print(f"[ERROR] Failed to fetch/parse GetCapabilities: {e}", file=sys.stderr)
         return 2
-
-    count = 0
-    with open(args.out, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(CSV_HEADERS)
-        for row in iter_rows(capabilities_root):
-            w.writerow(row)
-            count += 1
-
+    finally:
+        if harvester is not None:
+            harvester.close()
+    if is_parquet(args.out):
+        # typed once here, with the same dtypes pd.read_csv would give the CSV
+        write_table(pd.read_csv(tmp_path), str(out_path))
+        tmp_path.unlink()
+    else:
+        tmp_path.replace(out_path)
+    elapsed_s = time.perf_counter() - start
+
+    if previous is not None and previous.get("sha256") == (cache.metadata(url) or {}).get("sha256"):
+        print("GetCapabilities unchanged since last fetch; used cached document.", file=sys.stderr)
+    if row_cache is not None:
+        print(
+            f"Reused {row_cache.reused} cached coverage rows, re-derived {row_cache.derived}.",
+            file=sys.stderr,
+        )
+    if harvester is not None and harvester.failures:
+        print(
+            f"[WARN] DescribeCoverage failed for {len(harvester.failures)} coverage(s); their columns are blank:",
+            file=sys.stderr,
+        )
+        for cov_id, err in sorted(harvester.failures.items()):
+            print(f"  {cov_id}: {err}", file=sys.stderr)
+    if first_row_s is not None:
+        print(f"Parsed in {elapsed_s:.2f}s (first row after {first_row_s:.2f}s).", file=sys.stderr)
     print(f"[OK] Wrote {count} coverages to {args.out}", file=sys.stderr)
     return 0
 
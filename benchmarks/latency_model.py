@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Fit per-coverage latency against coverage size, dimensionality, tiling and CRS, and flag coverages that are much
+slower than the fit predicts for a coverage like them. Those are the re-tiling candidates.
+Reads tiling_coverages.csv from tiling_report.py, which already joins the analyzer summaries (latency, size_bytes,
+num_dimensions, epsg) with each coverage's ingest tiling. WCS point queries and WMS GetMap are modelled separately.
+
+The model is linear in log10(latency):
+    log10(latency) ~ log10(size_bytes) + num_dimensions + tiling + epsg
+with tiling and EPSG as one-hot categories. It is fitted with Huber-weighted least squares so the slow outliers
+being hunted for don't drag the fit towards themselves. Each coverage gets an expected latency and a robust z-score
+of its residual (residual / 1.4826 MAD).
+"""
+
+import argparse
+import sys
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from benchlib.tables import parquet_error, read_table, write_table
+
+
+CATEGORICAL_FEATURES = ["tiling", "epsg"]
+
+# Huber tuning constant for 95% efficiency on normal residuals.
+HUBER_K = 1.345
+
+
+def design_matrix(df: pd.DataFrame, categorical: List[str], min_group: int) -> pd.DataFrame:
+    """
+    Model features: intercept, log10(size_bytes), num_dimensions and one-hot categories (first level dropped).
+    Category levels with fewer than min_group coverages are pooled as "other", and constant columns are dropped.
+    """
+    X = pd.DataFrame(index=df.index)
+    X["intercept"] = 1.0
+    X["log10_size_bytes"] = np.log10(df["size_bytes"].astype(float))
+    X["num_dimensions"] = df["num_dimensions"].astype(float)
+    for col in categorical:
+        values = df[col].astype(str)
+        counts = values.value_counts()
+        values = values.where(values.map(counts) >= min_group, "other")
+        X = X.join(pd.get_dummies(values, prefix=col, drop_first=True, dtype=float))
+    varying = [c for c in X.columns if c == "intercept" or X[c].nunique() > 1]
+    return X[varying]
+
+
+def robust_scale(residuals: np.ndarray) -> float:
+    """1.4826 * MAD, falling back to the standard deviation when more than half the residuals are identical."""
+    mad = float(np.median(np.abs(residuals - np.median(residuals))))
+    return 1.4826 * mad if mad > 0 else float(np.std(residuals)) or 1.0
+
+
+def huber_fit(X: np.ndarray, y: np.ndarray, iterations: int = 50) -> Tuple[np.ndarray, float]:
+    """Iteratively reweighted least squares with Huber weights. Returns (coefficients, residual scale)."""
+    weights = np.ones(len(y))
+    beta = np.zeros(X.shape[1])
+    for _ in range(iterations):
+        sw = np.sqrt(weights)
+        new_beta = np.linalg.lstsq(X * sw[:, None], y * sw, rcond=None)[0]
+        residuals = y - X @ new_beta
+        scale = robust_scale(residuals)
+        u = np.abs(residuals) / (HUBER_K * scale)
+        weights = np.where(u <= 1, 1.0, 1.0 / np.maximum(u, 1e-12))
+        converged = np.allclose(new_beta, beta, atol=1e-8)
+        beta = new_beta
+        if converged:
+            break
+    return beta, robust_scale(y - X @ beta)
+
+
+def fit_query_type(
+    df: pd.DataFrame,
+    metric: str,
+    min_group: int,
+    threshold: float,
+    min_ratio: float,
+) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """Fit one query type; returns (per-coverage rows, coefficients) or None with too few coverages."""
+    categorical = [c for c in CATEGORICAL_FEATURES if c in df.columns]
+    X = design_matrix(df, categorical, min_group)
+    # keep a few residual degrees of freedom; give up the categories before giving up the fit
+    if len(df) < X.shape[1] + 3:
+        X = design_matrix(df, [], min_group)
+    if len(df) < X.shape[1] + 3:
+        return None
+
+    y = np.log10(df[metric].astype(float).to_numpy())
+    beta, scale = huber_fit(X.to_numpy(), y)
+    predicted = X.to_numpy() @ beta
+
+    context = [c for c in ["tiling", "epsg", "size_bytes", "num_dimensions"] if c in df.columns]
+    out = df[["query_type", "coverageId"] + context].copy()
+    out[metric] = df[metric]
+    out["expected_ms"] = 10**predicted
+    out["latency_ratio"] = (df[metric] / out["expected_ms"]).round(2)
+    out["residual_z"] = ((y - predicted) / scale).round(2)
+    out["retile_candidate"] = (out["residual_z"] >= threshold) & (out["latency_ratio"] >= min_ratio)
+    out["expected_ms"] = out["expected_ms"].round(0).astype("Int64")
+
+    coefficients = pd.DataFrame(
+        {
+            "query_type": df["query_type"].iloc[0],
+            "feature": X.columns,
+            "coefficient": beta.round(4),
+            # multiplicative effect on latency of a one-unit change (one decade of size, one more dimension, ...)
+            "latency_factor": (10**beta).round(3),
+        }
+    )
+    return out, coefficients
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="Fit latency against coverage size/dimensions/tiling/CRS and flag re-tiling candidates."
+    )
+    ap.add_argument(
+        "--in",
+        dest="in_path",
+        default="tiling_coverages.csv",
+        help="Per-coverage results joined with tiling, from tiling_report.py (default: tiling_coverages.csv)",
+    )
+    ap.add_argument(
+        "--metric",
+        default="latency_p95_ms",
+        help="Latency column to model (default: latency_p95_ms, falling back to latency_mean_ms)",
+    )
+    ap.add_argument(
+        "--threshold",
+        type=float,
+        default=2.0,
+        help="Flag coverages whose robust residual z-score is at least this (default: 2.0)",
+    )
+    ap.add_argument(
+        "--min-ratio",
+        type=float,
+        default=1.5,
+        help="...and whose latency is at least this multiple of the expected latency (default: 1.5)",
+    )
+    ap.add_argument(
+        "--min-group",
+        type=int,
+        default=2,
+        help="Tiling/EPSG levels with fewer coverages than this are pooled as 'other' (default: 2)",
+    )
+    ap.add_argument(
+        "--out",
+        default="latency_model.csv",
+        help="Output CSV with expected latency, ratio and z-score per coverage",
+    )
+    ap.add_argument(
+        "--out-coefficients",
+        default="latency_model_coefficients.csv",
+        help="Output CSV with the fitted coefficients per query type",
+    )
+    args = ap.parse_args()
+
+    error = parquet_error(args.in_path, args.out, args.out_coefficients)
+    if error:
+        print(f"[ERROR] {error}", file=sys.stderr)
+        return 2
+    try:
+        df = read_table(args.in_path)
+    except Exception as exc:
+        print(f"[ERROR] Failed to read {args.in_path}: {exc}", file=sys.stderr)
+        return 2
+
+    metric = args.metric if args.metric in df.columns else "latency_mean_ms"
+    required = ["query_type", "coverageId", metric, "size_bytes", "num_dimensions"]
+    missing = [c for c in required if c not in df.columns]
+    if missing:
+        print(
+            f"[ERROR] {args.in_path} is missing {', '.join(missing)}; expected tiling_coverages.csv from "
+            "tiling_report.py, built from analyzer summaries that include coverage metadata (--coverages).",
+            file=sys.stderr,
+        )
+        return 2
+    if metric != args.metric:
+        print(f"[WARN] {args.metric} not in {args.in_path}; modelling {metric} instead.")
+
+    usable = df[required].notna().all(axis=1) & (df[metric] > 0) & (df["size_bytes"] > 0)
+    if (~usable).any():
+        print(f"[WARN] Skipping {int((~usable).sum())} coverage(s) without latency, size or dimensions.")
+    df = df[usable].reset_index(drop=True)
+
+    rows: List[pd.DataFrame] = []
+    coefficients: List[pd.DataFrame] = []
+    for query_type, group in df.groupby("query_type", sort=True):
+        fitted = fit_query_type(
+            group.reset_index(drop=True), metric, args.min_group, args.threshold, args.min_ratio
+        )
+        if fitted is None:
+            print(f"[WARN] Too few {query_type} coverages ({len(group)}) to fit a model; skipped.")
+            continue
+        rows.append(fitted[0])
+        coefficients.append(fitted[1])
+    if not rows:
+        print("[ERROR] No query type had enough coverages to fit.", file=sys.stderr)
+        return 2
+
+    result = pd.concat(rows, ignore_index=True).sort_values(
+        ["query_type", "residual_z"], ascending=[True, False]
+    )
+    coef = pd.concat(coefficients, ignore_index=True)
+    write_table(result, args.out)
+    write_table(coef, args.out_coefficients)
+
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(coef.to_string(index=False))
+        candidates = result[result["retile_candidate"]]
+        if candidates.empty:
+            print(f"No coverages are well above their expected {metric}.")
+        else:
+            print(f"Re-tiling candidates ({len(candidates)}):")
+            cols = ["query_type", "coverageId", "tiling", metric, "expected_ms", "latency_ratio", "residual_z"]
+            print(candidates[[c for c in cols if c in candidates]].to_string(index=False))
+    print(f"[OK] Wrote {args.out} and {args.out_coefficients}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Check ingest recipes against the NetCDF files they import before handing them to wcst_import, which often only
+fails (or silently imports something wrong) minutes into an ingest. Only headers and 1-D coordinate variables are
+read, so a file takes well under a second whatever its size.
+
+Checks, per recipe and input file (the first one matched by input.paths, or all with --all-files):
+  bands      every band identifier is a variable in the file
+  gridOrder  the recipe's gridOrder follows the band variable's dimension order, every dimension has an axis, and
+             with wms_import the spatial axes come last
+  coords     coordinate variables are strictly monotonic, regular axes evenly spaced, irregular ones increasing,
+             and Y/lat runs north to south (sorted descending, as zarr_to_netcdf.py does for WMS)
+  nil        nilValue / default_null_values cover the band's _FillValue, and "nan" isn't used for integer bands
+  time       num2date expressions find the time variable and its units, use its calendar, and decode its values;
+             a precomputed time index (<file>_time.json) exists and matches the time variable
+  chunks     on-disk chunks are neither huge nor tiny, and WMS imports don't read chunks spanning many time steps
+
+Exits 1 if any check fails (or warns, with --strict). Needs netCDF4, as wcst_import itself does.
+"""
+
+import argparse
+import importlib.util
+import json
+import math
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from benchlib.coverages import SPATIAL_AXES
+from benchlib.recipes import INACTIVE_DIRS, find_recipes, input_files, load_recipe, recipe_bands, recipe_options
+from benchlib.tables import parquet_error, write_table
+
+
+LEVELS = ["error", "warn", "info"]
+
+Y_AXES = {"y", "lat", "latitude", "yc"}
+SPATIAL_NAMES = SPATIAL_AXES | Y_AXES | {"longitude", "xc"}
+
+# netCDF4.num2date(x, '${netcdf:variable:time:units}', calendar='noleap')
+NUM2DATE_RE = re.compile(
+    r"num2date\([^,]+,\s*'\$\{netcdf:variable:([^:}]+):units\}'(?:\s*,\s*calendar\s*=\s*'([^']+)')?"
+)
+# directPositions read from a precomputed list next to the file (recipe_builder's ansidate_axis(time_index=True))
+TIME_INDEX_RE = re.compile(r"splitext\('\$\{file:path\}'\)\[0\]\s*\+\s*'([^']+)'")
+STRFTIME_RE = re.compile(r"""strftime\(["']([^"']+)["']\)""")
+CALENDAR_ALIASES = {
+    "gregorian": "standard",
+    "proleptic_gregorian": "standard",
+    "365_day": "noleap",
+    "366_day": "all_leap",
+}
+
+# chunks outside this range are slow to read: big ones inflate far more than a tile needs, tiny ones thrash the cache
+MAX_CHUNK_BYTES = 64 << 20
+MIN_CHUNK_BYTES = 64 << 10
+
+Finding = Tuple[str, str, str]
+
+
+def slicer_axes(recipe: dict) -> List[Tuple[str, dict]]:
+    """(axis name, axis spec) for the slicer's axes, in gridOrder."""
+    axes = recipe_options(recipe).get("coverage", {}).get("slicer", {}).get("axes", {}) or {}
+    ordered = sorted(enumerate(axes.items()), key=lambda e: (int((e[1][1] or {}).get("gridOrder", e[0])), e[0]))
+    return [(name, spec or {}) for _, (name, spec) in ordered]
+
+
+def axis_variable(name: str, spec: dict, ds) -> Optional[str]:
+    """The 1-D NetCDF coordinate variable an axis reads, from its ${netcdf:variable:...} expressions or its name."""
+    text = " ".join(str(spec.get(k, "")) for k in ("min", "max", "directPositions"))
+    m = re.search(r"\$\{netcdf:variable:([^:}]+)", text)
+    if m and m.group(1) in ds.variables:
+        return m.group(1)
+    for var in ds.variables:
+        if var.lower() == name.lower() and ds.variables[var].ndim == 1:
+            return var
+    return None
+
+
+def normalize_calendar(value: Optional[str]) -> str:
+    value = (value or "standard").strip().lower()
+    return CALENDAR_ALIASES.get(value, value)
+
+
+def nil_values(recipe: dict, band: dict) -> List[str]:
+    if "nilValue" in band:
+        return [str(v).strip() for v in str(band["nilValue"]).split(",") if str(v).strip()]
+    return [str(v) for v in recipe.get("config", {}).get("default_null_values", []) or []]
+
+
+def same_value(nil: str, fill: float) -> bool:
+    try:
+        value = float(nil)
+    except ValueError:
+        return False
+    return (math.isnan(value) and math.isnan(fill)) or value == fill
+
+
+def check_grid_order(recipe: dict, axes: List[Tuple[str, dict]], var, ds) -> Tuple[List[Finding], Dict[str, str]]:
+    findings: List[Finding] = []
+    orders = [spec.get("gridOrder") for _, spec in axes]
+    if len(set(orders)) != len(orders):
+        findings.append(("error", "gridOrder", f"duplicate gridOrder values {orders}"))
+
+    dims: Dict[str, str] = {}
+    for name, spec in axes:
+        coord = axis_variable(name, spec, ds)
+        if coord is not None and ds.variables[coord].dimensions[0] in var.dimensions:
+            dims[name] = ds.variables[coord].dimensions[0]
+        elif name.lower() in {d.lower() for d in var.dimensions}:
+            dims[name] = next(d for d in var.dimensions if d.lower() == name.lower())
+        else:
+            findings.append(("info", "gridOrder", f"axis {name} isn't a dimension of {var.name}; sliced across files"))
+
+    recipe_order = [dims[name] for name, _ in axes if name in dims]
+    file_order = [d for d in var.dimensions if d in recipe_order]
+    if recipe_order != file_order:
+        findings.append(
+            (
+                "error",
+                "gridOrder",
+                f"gridOrder reads ({', '.join(recipe_order)}) but {var.name} is stored as "
+                f"({', '.join(var.dimensions)}); set gridOrder to match or transpose the file",
+            )
+        )
+    for d in var.dimensions:
+        if d not in recipe_order:
+            size = len(ds.dimensions[d])
+            level = "warn" if size == 1 else "error"
+            findings.append((level, "gridOrder", f"dimension {d} (size {size}) of {var.name} has no recipe axis"))
+
+    if recipe_options(recipe).get("wms_import"):
+        spatial = [name.lower() in SPATIAL_NAMES for name, _ in axes]
+        n = sum(spatial)
+        if n and not all(spatial[-n:]):
+            findings.append(
+                ("error", "gridOrder", "wms_import needs the spatial axes last in gridOrder (e.g. time, then Y/X)")
+            )
+    return findings, dims
+
+
+def check_coords(axes: List[Tuple[str, dict]], ds) -> List[Finding]:
+    findings: List[Finding] = []
+    for name, spec in axes:
+        coord = axis_variable(name, spec, ds)
+        if coord is None:
+            continue
+        values = np.asarray(ds.variables[coord][:], dtype="float64")
+        if values.size < 2:
+            continue
+        steps = np.diff(values)
+        increasing = bool(np.all(steps > 0))
+        if not increasing and not np.all(steps < 0):
+            findings.append(("error", "coords", f"{coord} is not strictly monotonic"))
+            continue
+        irregular = bool(spec.get("irregular")) or "directPositions" in spec
+        if irregular:
+            if not increasing:
+                findings.append(("error", "coords", f"{coord} decreases; directPositions must increase"))
+            continue
+        if np.max(np.abs(steps - steps[0])) > 1e-3 * abs(steps[0]):
+            findings.append(
+                (
+                    "warn",
+                    "coords",
+                    f"{coord} is unevenly spaced (steps {steps.min():g} to {steps.max():g}); a regular axis "
+                    "misplaces cells, declare it irregular",
+                )
+            )
+        if name.lower() in Y_AXES and increasing:
+            findings.append(
+                (
+                    "warn",
+                    "coords",
+                    f"{coord} runs south to north; sort it descending before ingest or maps come out upside down",
+                )
+            )
+    return findings
+
+
+def check_nil(recipe: dict, band: dict, var) -> List[Finding]:
+    nils = nil_values(recipe, band)
+    attrs = var.ncattrs()
+    fill = var.getncattr("_FillValue") if "_FillValue" in attrs else None
+    if fill is None and "missing_value" in attrs:
+        fill = var.getncattr("missing_value")
+    if var.dtype.kind in "iu" and any(n.lower() == "nan" for n in nils):
+        return [("error", "nil", f"nilValue nan can't match integer band {var.name} ({var.dtype})")]
+    if fill is None:
+        return []
+    fill = float(np.asarray(fill).ravel()[0])
+    if not nils:
+        return [("warn", "nil", f"{var.name} has _FillValue {fill:g} but the recipe declares no nilValue")]
+    if not any(same_value(n, fill) for n in nils):
+        return [("warn", "nil", f"nilValue {','.join(nils)} doesn't match {var.name}'s _FillValue {fill:g}")]
+    return []
+
+
+def check_time_index(name: str, spec: dict, nc_path: Path, count: int, first: str, last: str) -> List[Finding]:
+    """The precomputed time list an axis reads must exist and agree with the decoded time variable."""
+    m = TIME_INDEX_RE.search(str(spec.get("directPositions", "")))
+    if not m:
+        return []
+    index_path = nc_path.with_name(nc_path.stem + m.group(1))
+    try:
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        return [("error", "time", f"axis {name} reads directPositions from {index_path.name}, which fails: {exc}")]
+    if len(index) != count:
+        return [("error", "time", f"{index_path.name} has {len(index)} positions, the file {count} steps")]
+    if [index[0], index[-1]] != [first, last]:
+        return [("error", "time", f"{index_path.name} runs {index[0]} to {index[-1]}, the file {first} to {last}")]
+    return []
+
+
+def check_time(axes: List[Tuple[str, dict]], ds, nc_path: Path) -> List[Finding]:
+    import netCDF4
+
+    findings: List[Finding] = []
+    for name, spec in axes:
+        text = " ".join(str(spec.get(k, "")) for k in ("min", "max", "directPositions"))
+        m = NUM2DATE_RE.search(text)
+        if not m:
+            if spec.get("type") == "ansidate" and "${netcdf:variable:" in str(spec.get("directPositions", "")):
+                findings.append(("warn", "time", f"ansidate axis {name} uses raw time values without num2date"))
+            continue
+        coord, calendar = m.group(1), m.group(2)
+        if coord not in ds.variables:
+            findings.append(("error", "time", f"axis {name} decodes {coord}, which isn't in the file"))
+            continue
+        variable = ds.variables[coord]
+        if "units" not in variable.ncattrs():
+            findings.append(("error", "time", f"{coord} has no units attribute for num2date"))
+            continue
+        units = variable.getncattr("units")
+        file_calendar = variable.getncattr("calendar") if "calendar" in variable.ncattrs() else None
+        if calendar and normalize_calendar(calendar) != normalize_calendar(file_calendar):
+            findings.append(
+                (
+                    "error",
+                    "time",
+                    f"axis {name} decodes with calendar='{calendar}' but {coord}:calendar is "
+                    f"'{file_calendar or 'standard'}'; dates drift around leap days",
+                )
+            )
+        values = np.asarray(variable[:])
+        if values.size == 0:
+            continue
+        try:
+            first, last = netCDF4.num2date(values[[0, -1]], units, calendar=calendar or "standard")
+        except Exception as exc:
+            findings.append(("error", "time", f"num2date can't decode {coord} ({units!r}): {exc}"))
+            continue
+        findings.append(("info", "time", f"{coord}: {values.size} steps, {first} to {last}"))
+        fmt = STRFTIME_RE.search(text)
+        ends = [t.strftime(fmt.group(1)) if fmt else str(t) for t in (first, last)]
+        findings += check_time_index(name, spec, nc_path, values.size, *ends)
+    return findings
+
+
+def check_chunks(recipe: dict, var, dims: Dict[str, str]) -> List[Finding]:
+    chunking = var.chunking()
+    size = int(np.prod(var.shape, dtype="int64")) * var.dtype.itemsize
+    if chunking == "contiguous":
+        return [("info", "chunks", f"{var.name} is contiguous ({size / 2**20:.0f} MiB)")]
+    chunk_bytes = int(np.prod(chunking, dtype="int64")) * var.dtype.itemsize
+    shape = ", ".join(f"{d}={c}" for d, c in zip(var.dimensions, chunking))
+    findings: List[Finding] = [("info", "chunks", f"{var.name} chunks [{shape}], {chunk_bytes / 2**20:.2f} MiB each")]
+    if chunk_bytes > MAX_CHUNK_BYTES:
+        findings.append(("warn", "chunks", f"chunks of {chunk_bytes / 2**20:.0f} MiB; every read inflates a whole one"))
+    elif chunk_bytes < MIN_CHUNK_BYTES and size > MAX_CHUNK_BYTES:
+        findings.append(("warn", "chunks", f"chunks of {chunk_bytes / 2**10:.0f} KiB; reads pay per-chunk overhead"))
+    compressed = any((var.filters() or {}).get(k) for k in ("zlib", "szip", "blosc", "zstd", "bzip2"))
+    if recipe_options(recipe).get("wms_import") and compressed:
+        spatial_dims = {d for name, d in dims.items() if name.lower() in SPATIAL_NAMES}
+        for d, c in zip(var.dimensions, chunking):
+            if d not in spatial_dims and c > 1:
+                findings.append(
+                    (
+                        "warn",
+                        "chunks",
+                        f"compressed chunks span {c} positions along {d}; "
+                        f"each map slice decompresses {c}x what it uses",
+                    )
+                )
+    return findings
+
+
+def lint_file(recipe: dict, nc_path: Path) -> List[Finding]:
+    import netCDF4
+
+    findings: List[Finding] = []
+    bands = recipe_bands(recipe)
+    axes = slicer_axes(recipe)
+    with netCDF4.Dataset(str(nc_path)) as ds:
+        ds.set_auto_mask(False)
+        names = [str(b.get("identifier") or b.get("name")) for b in bands]
+        missing = [n for n in names if n not in ds.variables]
+        for n in missing:
+            findings.append(("error", "bands", f"band {n} is not a variable in the file"))
+        if not names:
+            # the slicer takes bands from the file: every variable with the most dimensions
+            ndim = max((v.ndim for v in ds.variables.values()), default=0)
+            names = [n for n, v in ds.variables.items() if v.ndim == ndim and ndim > 1]
+            bands = [{"identifier": n} for n in names]
+        present = [(b, n) for b, n in zip(bands, names) if n in ds.variables]
+        if not present:
+            return findings
+        var = ds.variables[present[0][1]]
+
+        order_findings, dims = check_grid_order(recipe, axes, var, ds)
+        findings += order_findings
+        findings += check_coords(axes, ds)
+        for band, n in present:
+            findings += check_nil(recipe, band, ds.variables[n])
+        findings += check_time(axes, ds, nc_path)
+        findings += check_chunks(recipe, var, dims)
+    return findings
+
+
+def collect(targets: List[str]) -> List[Tuple[Path, Optional[dict]]]:
+    """Recipes named directly (None if unreadable) plus every live recipe under the given directories."""
+    out: List[Tuple[Path, Optional[dict]]] = []
+    for target in targets:
+        path = Path(target)
+        if path.is_dir():
+            out.extend(
+                (p, r) for p, r in find_recipes(path) if not INACTIVE_DIRS & set(p.relative_to(path).parts)
+            )
+        else:
+            out.append((path, load_recipe(path)))
+    return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Check ingest recipes against their NetCDF files before ingesting.")
+    ap.add_argument("targets", nargs="+", help="Ingest recipe JSON file(s) or directories to search")
+    ap.add_argument("--netcdf", default=None, help="NetCDF file to check instead of the recipe's input.paths")
+    ap.add_argument("--all-files", action="store_true", help="Check every file input.paths matches, not just the first")
+    ap.add_argument("--verbose", action="store_true", help="Also print informational findings")
+    ap.add_argument("--strict", action="store_true", help="Exit 1 on warnings as well as errors")
+    ap.add_argument("--out", default=None, help="Write all findings to this CSV/Parquet file")
+    args = ap.parse_args()
+
+    if importlib.util.find_spec("netCDF4") is None:
+        print("[ERROR] lint_ingest.py needs netCDF4: pip install netCDF4", file=sys.stderr)
+        return 2
+    if args.out:
+        error = parquet_error(args.out)
+        if error:
+            print(f"[ERROR] {error}", file=sys.stderr)
+            return 2
+    recipes = collect(args.targets)
+    if args.netcdf and len(recipes) > 1:
+        print("[ERROR] --netcdf only makes sense with a single recipe.", file=sys.stderr)
+        return 2
+
+    rows: List[dict] = []
+    for path, recipe in recipes:
+        if recipe is None:
+            rows.append(
+                {"recipe": str(path), "file": "", "level": "error", "check": "recipe", "message": "not a recipe"}
+            )
+            print(f"[ERROR] {path}: not a readable ingest recipe")
+            continue
+        files = [Path(args.netcdf)] if args.netcdf else input_files(recipe, path)
+        if not files:
+            rows.append({"recipe": str(path), "file": "", "level": "warn", "check": "files", "message": "no input"})
+            print(f"[WARN] {path}: input.paths match no files here; nothing to check")
+            continue
+        for nc_path in files if args.all_files else files[:1]:
+            t0 = time.perf_counter()
+            try:
+                findings = lint_file(recipe, nc_path)
+            except Exception as exc:
+                findings = [("error", "file", f"can't read {nc_path}: {exc}")]
+            took = time.perf_counter() - t0
+            worst = next((level for level in LEVELS if any(f[0] == level for f in findings)), "info")
+            tag = {"error": "[ERROR]", "warn": "[WARN]", "info": "[OK]"}[worst]
+            print(f"{tag} {path} ({nc_path.name}, {took:.2f}s)")
+            for level, check, message in findings:
+                rows.append(
+                    {"recipe": str(path), "file": str(nc_path), "level": level, "check": check, "message": message}
+                )
+                if level != "info" or args.verbose:
+                    print(f"  {level:5} {check:9} {message}")
+
+    if args.out:
+        write_table(pd.DataFrame(rows, columns=["recipe", "file", "level", "check", "message"]), args.out)
+        print(f"[OK] Wrote {args.out}")
+    errors = sum(r["level"] == "error" for r in rows)
+    warnings = sum(r["level"] == "warn" for r in rows)
+    print(f"{len(recipes)} recipe(s): {errors} error(s), {warnings} warning(s).")
+    return 1 if errors or (args.strict and warnings) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
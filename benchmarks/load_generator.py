@@ -0,0 +1,788 @@
+#!/usr/bin/env python3
+"""
+Replay benchmark request CSVs (zeus_wcs_benchmark_requests.csv, zeus_wms_benchmark_requests.csv) against
+Petascope with an asyncio load driver and write a results CSV in the same column layout as a JMeter CSV results file,
+so analyze_wcs_results.py and analyze_wms_results.py can consume either one.
+Only the standard library is used for HTTP so the driver runs anywhere the rest of the pipeline runs.
+
+Two modes are supported:
+- closed loop (default): N workers each wait for a response before sending their next request, like JMeter threads.
+- open loop: requests are launched on a fixed or Poisson arrival schedule regardless of completions, so queueing
+  delay shows up in the results instead of silently slowing the request rate (coordinated omission).
+Every row records the intended send time next to the actual one so the analyzers can report corrected latency.
+Request files and the results file may also be Parquet (.parquet paths); that, and only that, needs pyarrow.
+"""
+
+import argparse
+import asyncio
+import csv
+import importlib.util
+import os
+import random
+import socket
+import ssl
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+DEFAULT_BASE_URL = "https://zeus.snap.uaf.edu/rasdaman/ows"
+
+# Column layout JMeter writes with the saveConfig used in wcs_benchmarks.jmx / wms_benchmarks.jmx.
+JMETER_CSV_HEADERS = [
+    "timeStamp",
+    "elapsed",
+    "label",
+    "responseCode",
+    "responseMessage",
+    "threadName",
+    "dataType",
+    "success",
+    "failureMessage",
+    "bytes",
+    "sentBytes",
+    "grpThreads",
+    "allThreads",
+    "URL",
+    "Latency",
+    "IdleTime",
+    "Connect",
+]
+
+# Extra columns appended after the JMeter layout. The analyzers add them to latency to correct for coordinated omission.
+SCHEDULE_CSV_HEADERS = [
+    "intendedTimeStamp",
+    "scheduleLag",
+]
+
+# Per-request phase timings in ms (one decimal), appended after the schedule columns. DNS, TCP connect and TLS are
+# blank when the request reused a keep-alive connection; ttfbTime runs from the request being written to the first response byte and transferTime
+# from there to the last body byte. serverTiming is the raw Server-Timing response header, if the server sends one.
+PHASE_CSV_HEADERS = [
+    "dnsTime",
+    "tcpConnectTime",
+    "tlsTime",
+    "ttfbTime",
+    "transferTime",
+    "serverTiming",
+]
+
+RESULT_CSV_HEADERS = JMETER_CSV_HEADERS + SCHEDULE_CSV_HEADERS + PHASE_CSV_HEADERS
+
+# Request CSVs carry the query string in one of these columns, depending on which builder wrote them.
+QUERY_COLUMNS = ["wcs_query", "wms_query", "wcps_query", "query"]
+
+# Same suffixes as benchlib/tables.py; kept here so CSV-only runs don't import pandas.
+PARQUET_SUFFIXES = (".parquet", ".pq")
+
+# Results columns kept as text when converting to Parquet, whatever the first rows look like.
+TEXT_RESULT_COLUMNS = [
+    "label",
+    "responseCode",
+    "responseMessage",
+    "threadName",
+    "dataType",
+    "success",
+    "failureMessage",
+    "URL",
+    "serverTiming",
+]
+
+READ_CHUNK_BYTES = 64 * 1024
+
+
+def elapsed_ms(start: float, end: float) -> float:
+    return round((end - start) * 1000, 1)
+
+
+class Connection:
+    """A keep-alive HTTP/1.1 connection checked out from a ConnectionPool, with its setup phase timings (ms)."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+        self.dns_ms = 0.0
+        self.tcp_ms = 0.0
+        self.tls_ms = 0.0
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class ConnectionPool:
+    """
+    Bounded pool of keep-alive connections to a single host, so the driver reuses TCP/TLS sessions
+    the way JMeter's HttpClient4 implementation does with use_keepalive=true.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        use_tls: bool,
+        max_connections: int,
+        connect_timeout: float,
+        verify_tls: bool = True,
+    ):
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.ssl_context: Optional[ssl.SSLContext] = None
+        if use_tls:
+            self.ssl_context = ssl.create_default_context()
+            if not verify_tls:
+                self.ssl_context.check_hostname = False
+                self.ssl_context.verify_mode = ssl.CERT_NONE
+        self._idle: List[Connection] = []
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def acquire(self) -> Connection:
+        """Return an idle connection if one exists, else open a new one."""
+        await self._slots.acquire()
+        while self._idle:
+            conn = self._idle.pop()
+            if not conn.writer.is_closing() and not conn.reader.at_eof():
+                conn.reused = True
+                return conn
+            conn.close()
+        try:
+            return await asyncio.wait_for(self._open(), timeout=self.connect_timeout)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def _open(self) -> Connection:
+        """Open a new connection, timing name resolution, the TCP handshake and the TLS handshake separately."""
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        addresses = await loop.getaddrinfo(self.host, self.port, type=socket.SOCK_STREAM)
+        resolved = time.perf_counter()
+        # StreamWriter.start_tls (Python 3.11+) lets TLS be timed apart from TCP; before that both count as connect
+        split_tls = self.ssl_context is not None and hasattr(asyncio.StreamWriter, "start_tls")
+        error: Optional[OSError] = None
+        for _, _, _, _, address in addresses:
+            try:
+                reader, writer = await asyncio.open_connection(
+                    address[0],
+                    address[1],
+                    ssl=None if split_tls else self.ssl_context,
+                    server_hostname=self.host if self.ssl_context is not None and not split_tls else None,
+                )
+                break
+            except OSError as exc:
+                error = exc
+        else:
+            raise error or OSError(f"cannot resolve {self.host}")
+        connected = time.perf_counter()
+        if split_tls:
+            await writer.start_tls(self.ssl_context, server_hostname=self.host)
+        handshaken = time.perf_counter()
+
+        conn = Connection(reader, writer)
+        conn.dns_ms = elapsed_ms(start, resolved)
+        conn.tcp_ms = elapsed_ms(resolved, connected)
+        conn.tls_ms = elapsed_ms(connected, handshaken)
+        return conn
+
+    def release(self, conn: Connection, reusable: bool) -> None:
+        """Return a connection to the pool, or close it if the server will not keep it alive."""
+        if reusable and not conn.writer.is_closing():
+            self._idle.append(conn)
+        else:
+            conn.close()
+        self._slots.release()
+
+    def close(self) -> None:
+        for conn in self._idle:
+            conn.close()
+        self._idle.clear()
+
+
+async def read_response(
+    reader: asyncio.StreamReader, status_line: bytes
+) -> Tuple[int, str, Dict[str, str], int, int, bool]:
+    """
+    Read the rest of an HTTP/1.1 response after its status line, discarding the body.
+    Returns (status code, reason, headers, header bytes, body bytes, keep-alive).
+    """
+    if not status_line:
+        raise ConnectionResetError("connection closed before response")
+    parts = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+    version = parts[0]
+    code = int(parts[1])
+    reason = parts[2] if len(parts) > 2 else ""
+
+    header_bytes = len(status_line)
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        header_bytes += len(line)
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+    body_bytes = 0
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        while True:
+            size_line = await reader.readline()
+            size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                # trailers end with a blank line
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                break
+            await reader.readexactly(size + 2)
+            body_bytes += size
+    elif "content-length" in headers:
+        remaining = int(headers["content-length"])
+        while remaining > 0:
+            chunk = await reader.read(min(remaining, READ_CHUNK_BYTES))
+            if not chunk:
+                raise ConnectionResetError("connection closed mid-body")
+            remaining -= len(chunk)
+            body_bytes += len(chunk)
+    elif code not in (204, 304) and not 100 <= code < 200:
+        # no framing: the body runs until the server closes the connection
+        while True:
+            chunk = await reader.read(READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            body_bytes += len(chunk)
+        keep_alive = False
+
+    return code, reason, headers, header_bytes, body_bytes, keep_alive
+
+
+class RatePacer:
+    """Spaces request starts evenly so the driver does not exceed a target requests/sec."""
+
+    def __init__(self, rps: Optional[float]):
+        self.interval = 1.0 / rps if rps else 0.0
+        self._next_slot: Optional[float] = None
+
+    async def wait(self) -> Optional[float]:
+        """Sleep until the next free slot and return its time.perf_counter() value, or None when unthrottled."""
+        if not self.interval:
+            return None
+        now = time.perf_counter()
+        # A worker that falls behind keeps the original slot, so the delay is recorded as schedule lag.
+        slot = now if self._next_slot is None else self._next_slot
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+        return slot
+
+
+def arrival_offsets(count: int, rate: float, arrival: str, rng: random.Random) -> List[float]:
+    """
+    Intended send times in seconds from the start of an open-loop run.
+    "fixed" spaces requests exactly 1/rate apart; "poisson" draws exponential inter-arrival gaps with mean 1/rate.
+    """
+    offsets: List[float] = []
+    t = 0.0
+    for _ in range(count):
+        offsets.append(t)
+        t += rng.expovariate(rate) if arrival == "poisson" else 1.0 / rate
+    return offsets
+
+
+class LoadGenerator:
+    """
+    Load driver for closed-loop (run) and open-loop (run_open) replay.
+    In both modes at most `concurrency` requests are in flight; open-loop arrivals beyond that wait their turn
+    and the wait is recorded as schedule lag.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        concurrency: int,
+        rps: Optional[float] = None,
+        ramp_up: float = 0.0,
+        connect_timeout: float = 10.0,
+        response_timeout: float = 120.0,
+        verify_tls: bool = True,
+    ):
+        parts = urlsplit(base_url)
+        use_tls = parts.scheme == "https"
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or (443 if use_tls else 80)
+        self.path = parts.path or "/"
+        self.host_header = parts.netloc
+        self.url_prefix = f"{parts.scheme}://{parts.netloc}{self.path}"
+        self.concurrency = concurrency
+        self.ramp_up = ramp_up
+        self.response_timeout = response_timeout
+        self.pacer = RatePacer(rps)
+        self.pool = ConnectionPool(
+            self.host,
+            self.port,
+            use_tls,
+            max_connections=concurrency,
+            connect_timeout=connect_timeout,
+            verify_tls=verify_tls,
+        )
+        self.in_flight = asyncio.Semaphore(concurrency)
+        self.active_threads = 0
+
+    def build_request(self, query: str) -> Tuple[str, bytes]:
+        target = f"{self.path}?{query}"
+        request = (
+            f"GET {target} HTTP/1.1\r\n"
+            f"Host: {self.host_header}\r\n"
+            "Connection: keep-alive\r\n"
+            "Accept-Encoding: identity\r\n"
+            "User-Agent: rasdaman-ingest-benchmarks\r\n"
+            "\r\n"
+        ).encode("latin-1")
+        return f"{self.url_prefix}?{query}", request
+
+    @staticmethod
+    async def _receive(conn: Connection) -> Tuple[float, Tuple[int, str, Dict[str, str], int, int, bool]]:
+        """Read a response, noting when its first byte arrived (JMeter's Latency)."""
+        status_line = await conn.reader.readline()
+        first_byte = time.perf_counter()
+        return first_byte, await read_response(conn.reader, status_line)
+
+    async def _exchange(self, request: bytes) -> Dict[str, object]:
+        """Send one request on a pooled connection, retrying once if a reused keep-alive socket went stale."""
+        for attempt in range(2):
+            connect_start = time.perf_counter()
+            conn = await self.pool.acquire()
+            connect_ms = 0 if conn.reused else round((time.perf_counter() - connect_start) * 1000)
+            reusable = False
+            try:
+                sent = time.perf_counter()
+                conn.writer.write(request)
+                await conn.writer.drain()
+                first_byte, (code, reason, headers, header_bytes, body_bytes, reusable) = (
+                    await asyncio.wait_for(self._receive(conn), timeout=self.response_timeout)
+                )
+                done = time.perf_counter()
+                reused = conn.reused
+                return {
+                    "code": code,
+                    "reason": reason,
+                    "headers": headers,
+                    "bytes": header_bytes + body_bytes,
+                    "connect_ms": connect_ms,
+                    "first_byte": first_byte,
+                    "phases": [
+                        "" if reused else conn.dns_ms,
+                        "" if reused else conn.tcp_ms,
+                        "" if reused else conn.tls_ms,
+                        elapsed_ms(sent, first_byte),
+                        elapsed_ms(first_byte, done),
+                        headers.get("server-timing", ""),
+                    ],
+                }
+            except (ConnectionError, asyncio.IncompleteReadError) as exc:
+                if conn.reused and attempt == 0:
+                    continue
+                raise exc
+            finally:
+                self.pool.release(conn, reusable)
+        raise ConnectionResetError("unreachable")
+
+    async def sample(
+        self,
+        label: str,
+        query: str,
+        thread_name: str,
+        intended: Optional[float] = None,
+    ) -> List[object]:
+        """
+        Issue a single GET and return a JMeter-style results row with the schedule columns appended.
+        `intended` is the time.perf_counter() value the request was scheduled for; elapsed and Latency are measured
+        from the actual send, and the difference between the two is written as scheduleLag (ms).
+        """
+        url, request = self.build_request(query)
+        async with self.in_flight:
+            return await self._sample(label, url, request, thread_name, intended)
+
+    async def _sample(
+        self,
+        label: str,
+        url: str,
+        request: bytes,
+        thread_name: str,
+        intended: Optional[float],
+    ) -> List[object]:
+        timestamp_ms = int(time.time() * 1000)
+        start = time.perf_counter()
+        lag_ms = max(0, round((start - intended) * 1000)) if intended is not None else 0
+        first_byte: Optional[float] = None
+        code: object = ""
+        message = ""
+        failure = ""
+        data_type = ""
+        received = 0
+        connect_ms = 0
+        phases: List[object] = [""] * len(PHASE_CSV_HEADERS)
+        success = False
+        try:
+            result = await self._exchange(request)
+            code = result["code"]
+            message = str(result["reason"])
+            received = int(result["bytes"])
+            connect_ms = int(result["connect_ms"])
+            first_byte = float(result["first_byte"])
+            phases = list(result["phases"])
+            content_type = str(result["headers"].get("content-type", ""))
+            data_type = "text" if content_type.startswith(("text/", "application/json", "application/xml")) else "bin"
+            success = 200 <= int(code) < 400
+            if not success:
+                failure = f"Unexpected response code {code}"
+        except asyncio.TimeoutError:
+            code = "Non HTTP response code: java.net.SocketTimeoutException"
+            message = "Non HTTP response message: timeout"
+            failure = message
+        except Exception as exc:
+            code = f"Non HTTP response code: {type(exc).__name__}"
+            message = f"Non HTTP response message: {exc}"
+            failure = message
+        end = time.perf_counter()
+        # failed requests never saw a first byte, so report the full elapsed time as latency like JMeter does
+        if first_byte is None:
+            first_byte = end
+        return [
+            timestamp_ms,
+            round((end - start) * 1000),
+            label,
+            code,
+            message,
+            thread_name,
+            data_type,
+            "true" if success else "false",
+            failure,
+            received,
+            len(request),
+            self.active_threads,
+            self.active_threads,
+            url,
+            round((first_byte - start) * 1000),
+            0,
+            connect_ms,
+            timestamp_ms - lag_ms,
+            lag_ms,
+            *phases,
+        ]
+
+    async def _worker(self, index: int, jobs: Iterator[Tuple[str, str]], writer: Any) -> int:
+        if self.ramp_up and self.concurrency > 1:
+            await asyncio.sleep(self.ramp_up * index / self.concurrency)
+        thread_name = f"Load Generator 1-{index + 1}"
+        self.active_threads += 1
+        done = 0
+        try:
+            for label, query in jobs:
+                intended = await self.pacer.wait()
+                writer.writerow(await self.sample(label, query, thread_name, intended))
+                done += 1
+        finally:
+            self.active_threads -= 1
+        return done
+
+    async def run(self, jobs: List[Tuple[str, str]], out_path: str) -> int:
+        """Replay (label, query) jobs with the configured concurrency and write a JMeter-style CSV."""
+        shared = iter(jobs)
+        try:
+            with open(out_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(RESULT_CSV_HEADERS)
+                counts = await asyncio.gather(
+                    *(self._worker(i, shared, writer) for i in range(self.concurrency))
+                )
+        finally:
+            self.pool.close()
+        return sum(counts)
+
+    async def _open_sample(self, label: str, query: str, intended: float, writer: Any) -> None:
+        self.active_threads += 1
+        try:
+            writer.writerow(await self.sample(label, query, "Open Loop 1-1", intended))
+        finally:
+            self.active_threads -= 1
+
+    async def run_open(
+        self,
+        jobs: List[Tuple[str, str]],
+        out_path: str,
+        rate: Optional[float],
+        arrival: str = "poisson",
+        rng: Optional[random.Random] = None,
+        offsets: Optional[List[float]] = None,
+    ) -> int:
+        """
+        Replay jobs open-loop: each request is launched at its scheduled arrival time whether or not earlier
+        requests have completed. Pass `offsets` (seconds from the start, one per job) to use a recorded schedule
+        instead of generating one from `rate`.
+        """
+        if offsets is None:
+            offsets = arrival_offsets(len(jobs), rate, arrival, rng or random.Random())
+        tasks = []
+        try:
+            with open(out_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(RESULT_CSV_HEADERS)
+                origin = time.perf_counter()
+                for (label, query), offset in zip(jobs, offsets):
+                    intended = origin + offset
+                    delay = intended - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    tasks.append(
+                        asyncio.create_task(self._open_sample(label, query, intended, writer))
+                    )
+                await asyncio.gather(*tasks)
+        finally:
+            self.pool.close()
+        return len(tasks)
+
+
+def is_parquet(path: str) -> bool:
+    return path.lower().endswith(PARQUET_SUFFIXES)
+
+
+def read_request_table(path: str) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """Column names and rows of a request file: CSV, or Parquet for .parquet paths."""
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path)
+        return table.column_names, table.to_pylist()
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        return list(reader.fieldnames or []), list(reader)
+
+
+def read_queries(path: str) -> List[str]:
+    """Read query strings from a request CSV written by one of the build_*_benchmark_requests.py scripts."""
+    fields, rows = read_request_table(path)
+    column = next((c for c in QUERY_COLUMNS if c in fields), None)
+    if column is None:
+        raise ValueError(f"{path} has none of the query columns {QUERY_COLUMNS}")
+    return [row[column] for row in rows if row.get(column)]
+
+
+def read_replay_schedule(path: str) -> List[Tuple[float, str]]:
+    """Read (offset_s, query) pairs from a request CSV with a recorded schedule, e.g. from build_log_replay_requests.py."""
+    fields, rows = read_request_table(path)
+    column = next((c for c in QUERY_COLUMNS if c in fields), None)
+    if column is None:
+        raise ValueError(f"{path} has none of the query columns {QUERY_COLUMNS}")
+    if "offset_s" not in fields:
+        raise ValueError(f"{path} has no offset_s column to replay")
+    return [(float(row["offset_s"]), row[column]) for row in rows if row.get(column)]
+
+
+def build_replay_schedule(
+    sources: List[Tuple[str, List[Tuple[float, str]]]],
+    loops: int,
+) -> Tuple[List[Tuple[str, str]], List[float]]:
+    """
+    Merge recorded schedules from several files into one, ordered by offset. Each extra loop replays the whole
+    schedule again, starting where the previous pass ended.
+    """
+    merged = sorted(
+        ((offset, label, query) for label, schedule in sources for offset, query in schedule),
+        key=lambda item: item[0],
+    )
+    if not merged:
+        return [], []
+    span = merged[-1][0] - merged[0][0]
+    gap = span / max(len(merged) - 1, 1)
+    jobs: List[Tuple[str, str]] = []
+    offsets: List[float] = []
+    for n in range(loops):
+        shift = n * (span + gap) - merged[0][0]
+        for offset, label, query in merged:
+            jobs.append((label, query))
+            offsets.append(offset + shift)
+    return jobs, offsets
+
+
+def parse_request_spec(spec: str) -> Tuple[str, float]:
+    """Parse a --requests value of the form PATH or PATH:WEIGHT."""
+    path, sep, weight = spec.rpartition(":")
+    if sep and path:
+        try:
+            return path, float(weight)
+        except ValueError:
+            pass
+    return spec, 1.0
+
+
+def build_request_mix(
+    sources: List[Tuple[str, List[str], float]],
+    loops: int,
+    rng: random.Random,
+) -> List[Tuple[str, str]]:
+    """
+    Interleave requests from several files, drawing from each in proportion to its weight until all are exhausted.
+    Each file keeps its own request order so the builders' shuffling is preserved.
+    """
+    queues = [(label, queries * loops, weight) for label, queries, weight in sources]
+    positions = [0] * len(queues)
+    jobs: List[Tuple[str, str]] = []
+    while True:
+        live = [i for i, (_, queries, weight) in enumerate(queues) if positions[i] < len(queries) and weight > 0]
+        if not live:
+            break
+        i = live[0] if len(live) == 1 else rng.choices(live, weights=[queues[j][2] for j in live])[0]
+        label, queries, _ = queues[i]
+        jobs.append((label, queries[positions[i]]))
+        positions[i] += 1
+    return jobs
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="Replay benchmark request CSVs with asyncio and write JMeter-style results."
+    )
+    ap.add_argument(
+        "--requests",
+        action="append",
+        required=True,
+        help="Request CSV, optionally PATH:WEIGHT to control the request mix. Repeat for several files.",
+    )
+    ap.add_argument(
+        "--out",
+        default="benchmark_results.csv",
+        help="Output results CSV in JMeter column layout",
+    )
+    ap.add_argument(
+        "--base-url",
+        default=DEFAULT_BASE_URL,
+        help=f"OWS endpoint to send requests to (default: {DEFAULT_BASE_URL})",
+    )
+    ap.add_argument(
+        "--mode",
+        choices=["closed", "open"],
+        default="closed",
+        help="closed: workers wait for each response (default); open: send on a fixed arrival schedule",
+    )
+    ap.add_argument(
+        "--arrival",
+        choices=["poisson", "fixed", "replay"],
+        default="poisson",
+        help="Open-loop arrival process (default: poisson); replay uses the offset_s column of the request CSVs",
+    )
+    ap.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of concurrent workers (closed loop) or maximum requests in flight (open loop)",
+    )
+    ap.add_argument(
+        "--rps",
+        type=float,
+        default=None,
+        help="Target requests/sec across all workers (default: unthrottled); required for open loop",
+    )
+    ap.add_argument(
+        "--ramp-up",
+        type=float,
+        default=3.0,
+        help="Seconds over which workers are started (default: 3, like the JMeter plans)",
+    )
+    ap.add_argument(
+        "--loops", type=int, default=1, help="Number of passes over each request file"
+    )
+    ap.add_argument(
+        "--connect-timeout", type=float, default=10.0, help="Connect timeout in seconds"
+    )
+    ap.add_argument(
+        "--response-timeout",
+        type=float,
+        default=120.0,
+        help="Response timeout in seconds",
+    )
+    ap.add_argument(
+        "--insecure", action="store_true", help="Skip TLS certificate verification"
+    )
+    ap.add_argument(
+        "--seed", type=int, default=None, help="Random seed for request mix interleaving"
+    )
+    args = ap.parse_args()
+
+    if args.concurrency < 1:
+        print("[ERROR] --concurrency must be at least 1.", file=sys.stderr)
+        return 2
+    replay = args.arrival == "replay"
+    if replay and args.mode != "open":
+        print("[ERROR] --arrival replay requires --mode open.", file=sys.stderr)
+        return 2
+    if args.mode == "open" and not args.rps and not replay:
+        print("[ERROR] --mode open requires --rps.", file=sys.stderr)
+        return 2
+    if is_parquet(args.out) or any(is_parquet(parse_request_spec(s)[0]) for s in args.requests):
+        if importlib.util.find_spec("pyarrow") is None:
+            print("[ERROR] Parquet request/results files need pyarrow: pip install pyarrow", file=sys.stderr)
+            return 2
+
+    sources: List[Tuple[str, List[str], float]] = []
+    schedules: List[Tuple[str, List[Tuple[float, str]]]] = []
+    for spec in args.requests:
+        path, weight = parse_request_spec(spec)
+        label = path.rsplit("/", 1)[-1]
+        try:
+            if replay:
+                schedules.append((label, read_replay_schedule(path)))
+            else:
+                sources.append((label, read_queries(path), weight))
+        except Exception as exc:
+            print(f"[ERROR] Failed to read request CSV {path}: {exc}", file=sys.stderr)
+            return 2
+
+    rng = random.Random(args.seed)
+    offsets = None
+    if replay:
+        jobs, offsets = build_replay_schedule(schedules, args.loops)
+    else:
+        jobs = build_request_mix(sources, args.loops, rng)
+    if not jobs:
+        print("[ERROR] No requests to send.", file=sys.stderr)
+        return 2
+
+    generator = LoadGenerator(
+        base_url=args.base_url,
+        concurrency=args.concurrency,
+        rps=args.rps,
+        ramp_up=args.ramp_up,
+        connect_timeout=args.connect_timeout,
+        response_timeout=args.response_timeout,
+        verify_tls=not args.insecure,
+    )
+    # results are streamed as CSV; a Parquet --out is converted once the run is over
+    results_path = args.out + ".csv.tmp" if is_parquet(args.out) else args.out
+    started = time.perf_counter()
+    if args.mode == "open":
+        count = asyncio.run(generator.run_open(jobs, results_path, args.rps, args.arrival, rng, offsets))
+    else:
+        count = asyncio.run(generator.run(jobs, results_path))
+    wall = time.perf_counter() - started
+    if results_path != args.out:
+        from benchlib.tables import csv_to_parquet
+
+        try:
+            csv_to_parquet(results_path, args.out, text_columns=TEXT_RESULT_COLUMNS)
+        except Exception as exc:
+            print(f"[ERROR] Failed to write {args.out}; CSV results kept in {results_path}: {exc}", file=sys.stderr)
+            return 2
+        os.remove(results_path)
+
+    print(
+        f"[OK] Sent {count} requests in {wall:.1f}s ({count / wall:.1f} req/s); wrote {args.out}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
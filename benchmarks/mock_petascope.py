@@ -0,0 +1,657 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for Petascope so the benchmark pipeline can run offline.
+Serves WCS GetCapabilities/DescribeCoverage/GetCoverage/ProcessCoverages and WMS GetMap for the coverages defined
+in fixtures/mock_coverages.json. Each coverage is a small synthetic cube generated with numpy (deterministic per
+coverage ID). Responses are delayed according to a configurable latency distribution. On top of that come a
+cold-cache penalty for storage tiles not read before, mimicking rasdaman's tile cache, and a per-megabyte cost, so
+benchmark numbers respond to request shape the way the real server's do.
+
+    python mock_petascope.py --port 8080 --latency lognormal:40,0.5 --cold-penalty-ms 150
+    python get_zeus_capabilities.py --url "http://127.0.0.1:8080/rasdaman/ows?SERVICE=WCS&ACCEPTVERSIONS=2.1.0&REQUEST=GetCapabilities"
+"""
+
+import argparse
+import bisect
+import hashlib
+import io
+import json
+import math
+import random
+import re
+import struct
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlsplit
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+
+
+DEFAULT_FIXTURE = Path(__file__).resolve().parent / "fixtures" / "mock_coverages.json"
+
+X_AXES = {"x", "lon", "long", "longitude"}
+Y_AXES = {"y", "lat", "latitude"}
+
+CRS_BASE = "http://www.opengis.net/def/crs"
+
+# Just enough WCPS to find what a query reads: the coverage bound in "for $c in (ID)", the first "$c[...]" subset
+# and its axis(value) / axis(lo:hi) / axis($iterator) entries.
+WCPS_COVERAGE_RE = re.compile(r"for\s+\$\w+\s+in\s*\(\s*([^\s,()]+)\s*\)", re.IGNORECASE)
+WCPS_SUBSET_RE = re.compile(r"\$\w+\[([^\]]*)\]")
+WCPS_AXIS_RE = re.compile(r"(\w+)\(([^()]*)\)")
+# "lo":"hi" trim bounds; quoted timestamps contain colons themselves
+WCPS_BOUND_RE = re.compile(r'"[^"]*"|[^:]+')
+
+
+class OwsError(Exception):
+    """Turned into an OWS ExceptionReport response."""
+
+    def __init__(self, status: int, code: str, text: str):
+        super().__init__(text)
+        self.status = status
+        self.code = code
+        self.text = text
+
+
+class Axis:
+    """A regular axis (lower, resolution, size) or an irregular one (listed positions)."""
+
+    def __init__(self, spec: dict):
+        self.name: str = spec["name"]
+        self.positions: Optional[List[str]] = spec.get("positions")
+        self.lower = float(spec.get("lower", 0))
+        self.resolution = float(spec.get("resolution", 1))
+        self.size = len(self.positions) if self.positions else int(spec["size"])
+
+    @property
+    def irregular(self) -> bool:
+        return bool(self.positions)
+
+    def bounds(self) -> Tuple[str, str]:
+        """Lower/upper envelope values as rasdaman reports them (cell edges for regular axes)."""
+        if self.positions:
+            return f'"{self.positions[0]}"', f'"{self.positions[-1]}"'
+        return fmt(self.lower), fmt(self.lower + self.size * self.resolution)
+
+    def index(self, value: str) -> int:
+        """Grid index containing a coordinate."""
+        if self.positions:
+            i = bisect.bisect_right(self.positions, value) - 1
+        else:
+            v = to_float(value, self.name)
+            i = int(math.floor((v - self.lower) / self.resolution))
+            if i == self.size and v == self.lower + self.size * self.resolution:
+                i -= 1
+        if not 0 <= i < self.size:
+            raise OwsError(404, "InvalidSubsetting", f"{self.name}({value}) is outside the coverage domain")
+        return i
+
+    def index_range(self, lo: str, hi: str) -> Tuple[int, int]:
+        """Half-open grid index range covered by a trim."""
+        if self.positions:
+            start = bisect.bisect_left(self.positions, lo)
+            stop = bisect.bisect_right(self.positions, hi)
+        else:
+            start = int(math.floor((to_float(lo, self.name) - self.lower) / self.resolution))
+            stop = int(math.ceil((to_float(hi, self.name) - self.lower) / self.resolution))
+        start, stop = max(start, 0), min(stop, self.size)
+        if start >= stop:
+            raise OwsError(404, "InvalidSubsetting", f"{self.name}({lo},{hi}) is outside the coverage domain")
+        return start, stop
+
+
+class Coverage:
+    def __init__(self, spec: dict):
+        self.id: str = spec["id"]
+        self.epsg = str(spec["epsg"])
+        self.axes = [Axis(a) for a in spec["axes"]]
+        self.band = spec["bands"][0]
+        self.nil = float(self.band.get("nil", -9999))
+        names = [a.name.lower() for a in self.axes]
+        self.x = next(i for i, n in enumerate(names) if n in X_AXES)
+        self.y = next(i for i, n in enumerate(names) if n in Y_AXES)
+        self.data = synthetic_cube(self.id, [a.size for a in self.axes], (self.x, self.y), self.nil)
+        valid = self.data[self.data != self.nil]
+        self.vmin = float(valid.min()) if valid.size else 0.0
+        self.vmax = float(valid.max()) if valid.size else 1.0
+        if "wgs84" in spec:
+            self.wgs84 = [float(v) for v in spec["wgs84"]]
+        else:
+            (x0, x1), (y0, y1) = self.axis_extent(self.x), self.axis_extent(self.y)
+            self.wgs84 = [x0, y0, x1, y1]
+
+    def axis_extent(self, i: int) -> Tuple[float, float]:
+        a = self.axes[i]
+        return a.lower, a.lower + a.size * a.resolution
+
+    def axis(self, name: str) -> Optional[int]:
+        lname = name.lower()
+        return next((i for i, a in enumerate(self.axes) if a.name.lower() == lname), None)
+
+    def crs_uri(self) -> str:
+        epsg = f"{CRS_BASE}/EPSG/0/{self.epsg}"
+        if any(a.irregular for a in self.axes):
+            return f"{CRS_BASE}-compound?1={CRS_BASE}/OGC/0/AnsiDate&2={epsg}"
+        return epsg
+
+
+def fmt(v: float) -> str:
+    return f"{v:.10g}"
+
+
+def to_float(value: str, axis: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        raise OwsError(400, "InvalidSubsetting", f"non-numeric coordinate {value!r} on axis {axis}")
+
+
+def synthetic_cube(coverage_id: str, shape: List[int], spatial: Tuple[int, int], nil: float) -> np.ndarray:
+    """
+    Smooth, deterministic test data: a sum of sinusoids along every axis plus a little noise, with a fixed
+    "no data" mask (about 5% of spatial cells) shared by all non-spatial positions, like land/sea masks.
+    """
+    rng = np.random.default_rng(zlib.crc32(coverage_id.encode("utf-8")))
+    field = np.zeros(shape, dtype=np.float32)
+    for i, n in enumerate(shape):
+        u = np.arange(n, dtype=np.float32) / max(n, 1)
+        wave = rng.uniform(2, 10) * np.sin(2 * np.pi * rng.uniform(0.5, 2.0) * u + rng.uniform(0, np.pi))
+        view = [1] * len(shape)
+        view[i] = n
+        field += wave.reshape(view)
+    field += rng.normal(0, 0.5, size=shape).astype(np.float32)
+    mask_shape = [shape[i] if i in spatial else 1 for i in range(len(shape))]
+    mask = rng.random(mask_shape) < 0.05
+    field[np.broadcast_to(mask, shape)] = nil
+    return field
+
+
+def load_coverages(path: Path) -> Dict[str, Coverage]:
+    spec = json.loads(path.read_text(encoding="utf-8"))
+    return {c["id"]: Coverage(c) for c in spec["coverages"]}
+
+
+def capabilities_xml(coverages: Dict[str, Coverage]) -> bytes:
+    summaries = []
+    for cov in coverages.values():
+        lower, upper = zip(*(a.bounds() for a in cov.axes))
+        w = cov.wgs84
+        summaries.append(
+            f"""<wcs:CoverageSummary>
+<wcs:CoverageId>{escape(cov.id)}</wcs:CoverageId>
+<wcs:CoverageSubtype>{"ReferenceableGridCoverage" if any(a.irregular for a in cov.axes) else "RectifiedGridCoverage"}</wcs:CoverageSubtype>
+<ows:WGS84BoundingBox><ows:LowerCorner>{fmt(w[0])} {fmt(w[1])}</ows:LowerCorner><ows:UpperCorner>{fmt(w[2])} {fmt(w[3])}</ows:UpperCorner></ows:WGS84BoundingBox>
+<ows:BoundingBox crs={quoteattr(cov.crs_uri())} dimensions="{len(cov.axes)}"><ows:LowerCorner>{" ".join(lower)}</ows:LowerCorner><ows:UpperCorner>{" ".join(upper)}</ows:UpperCorner></ows:BoundingBox>
+<ows:AdditionalParameters>
+<ows:AdditionalParameter><ows:Name>sizeInBytes</ows:Name><ows:Value>{cov.data.nbytes}</ows:Value></ows:AdditionalParameter>
+<ows:AdditionalParameter><ows:Name>axisList</ows:Name><ows:Value>{",".join(a.name for a in cov.axes)}</ows:Value></ows:AdditionalParameter>
+</ows:AdditionalParameters>
+</wcs:CoverageSummary>"""
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<wcs:Capabilities xmlns:wcs="http://www.opengis.net/wcs/2.0" xmlns:ows="http://www.opengis.net/ows/2.0" '
+        'version="2.1.0">\n'
+        "<ows:ServiceIdentification><ows:Title>Mock Petascope</ows:Title></ows:ServiceIdentification>\n"
+        "<wcs:Contents>\n" + "\n".join(summaries) + "\n</wcs:Contents>\n</wcs:Capabilities>\n"
+    ).encode("utf-8")
+
+
+def describe_xml(cov: Coverage) -> bytes:
+    lower, upper = zip(*(a.bounds() for a in cov.axes))
+    labels = " ".join(a.name for a in cov.axes)
+    n = len(cov.axes)
+    low = " ".join("0" for _ in cov.axes)
+    high = " ".join(str(a.size - 1) for a in cov.axes)
+    origin = " ".join(a.bounds()[0] if a.irregular else fmt(a.lower + a.resolution / 2) for a in cov.axes)
+
+    def unit(i: int, step: float) -> str:
+        return " ".join(fmt(step) if j == i else "0" for j in range(n))
+
+    envelope = f"""<gml:GridEnvelope><gml:low>{low}</gml:low><gml:high>{high}</gml:high></gml:GridEnvelope>"""
+    if any(a.irregular for a in cov.axes):
+        axes = "".join(
+            f"""<gmlrgrid:generalGridAxis><gmlrgrid:GeneralGridAxis>
+<gmlrgrid:offsetVector srsName={quoteattr(cov.crs_uri())}>{unit(i, 1 if a.irregular else a.resolution)}</gmlrgrid:offsetVector>
+<gmlrgrid:coefficients>{" ".join(f'"{p}"' for p in a.positions) if a.irregular else ""}</gmlrgrid:coefficients>
+<gmlrgrid:gridAxesSpanned>{escape(a.name)}</gmlrgrid:gridAxesSpanned>
+<gmlrgrid:sequenceRule axisOrder="+1">Linear</gmlrgrid:sequenceRule>
+</gmlrgrid:GeneralGridAxis></gmlrgrid:generalGridAxis>"""
+            for i, a in enumerate(cov.axes)
+        )
+        grid = f"""<gmlrgrid:ReferenceableGridByVectors dimension="{n}" gml:id="{escape(cov.id)}-grid">
+<gml:limits>{envelope}</gml:limits><gml:axisLabels>{labels}</gml:axisLabels>
+<gmlrgrid:origin><gml:Point gml:id="{escape(cov.id)}-origin"><gml:pos>{origin}</gml:pos></gml:Point></gmlrgrid:origin>
+{axes}
+</gmlrgrid:ReferenceableGridByVectors>"""
+    else:
+        vectors = "".join(
+            f"<gml:offsetVector srsName={quoteattr(cov.crs_uri())}>{unit(i, a.resolution)}</gml:offsetVector>"
+            for i, a in enumerate(cov.axes)
+        )
+        grid = f"""<gml:RectifiedGrid dimension="{n}" gml:id="{escape(cov.id)}-grid">
+<gml:limits>{envelope}</gml:limits><gml:axisLabels>{labels}</gml:axisLabels>
+<gml:origin><gml:Point gml:id="{escape(cov.id)}-origin"><gml:pos>{origin}</gml:pos></gml:Point></gml:origin>
+{vectors}
+</gml:RectifiedGrid>"""
+    band = escape(cov.band["name"])
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<wcs:CoverageDescriptions xmlns:wcs="http://www.opengis.net/wcs/2.0" xmlns:gml="http://www.opengis.net/gml/3.2" xmlns:gmlcov="http://www.opengis.net/gmlcov/1.0" xmlns:gmlrgrid="http://www.opengis.net/gml/3.3/rgrid" xmlns:swe="http://www.opengis.net/swe/2.0">
+<wcs:CoverageDescription gml:id="{escape(cov.id)}">
+<gml:boundedBy><gml:Envelope srsName={quoteattr(cov.crs_uri())} axisLabels="{labels}" srsDimension="{n}"><gml:lowerCorner>{" ".join(lower)}</gml:lowerCorner><gml:upperCorner>{" ".join(upper)}</gml:upperCorner></gml:Envelope></gml:boundedBy>
+<wcs:CoverageId>{escape(cov.id)}</wcs:CoverageId>
+<gml:domainSet>{grid}</gml:domainSet>
+<gmlcov:rangeType><swe:DataRecord><swe:field name="{band}"><swe:Quantity><swe:nilValues><swe:NilValues><swe:nilValue reason="">{fmt(cov.nil)}</swe:nilValue></swe:NilValues></swe:nilValues><swe:uom code="1"/></swe:Quantity></swe:field></swe:DataRecord></gmlcov:rangeType>
+</wcs:CoverageDescription>
+</wcs:CoverageDescriptions>
+""".encode("utf-8")
+
+
+def exception_report(code: str, text: str) -> bytes:
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<ows:ExceptionReport xmlns:ows="http://www.opengis.net/ows/2.0" version="2.0.0">
+<ows:Exception exceptionCode="{escape(code)}"><ows:ExceptionText>{escape(text)}</ows:ExceptionText></ows:Exception>
+</ows:ExceptionReport>
+""".encode("utf-8")
+
+
+def parse_subset(value: str) -> Tuple[str, List[str]]:
+    """SUBSET=axis(lo,hi) or axis(v) -> (axis, [values]) with quotes stripped."""
+    name, sep, rest = value.partition("(")
+    if not sep or not rest.endswith(")"):
+        raise OwsError(400, "InvalidEncodingSyntax", f"bad SUBSET {value!r}")
+    return name.strip(), [v.strip().strip('"') for v in rest[:-1].split(",")]
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    """Minimal RGBA PNG encoder (filter type 0 on every row)."""
+    height, width, _ = rgba.shape
+    raw = np.concatenate([np.zeros((height, 1), dtype=np.uint8), rgba.reshape(height, width * 4)], axis=1)
+
+    def chunk(kind: bytes, payload: bytes) -> bytes:
+        return struct.pack(">I", len(payload)) + kind + payload + struct.pack(">I", zlib.crc32(kind + payload))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(raw.tobytes(), 1))
+        + chunk(b"IEND", b"")
+    )
+
+
+def latency_sampler(spec: str, rng: random.Random) -> Callable[[], float]:
+    """
+    Parse --latency into a function returning a base service time in ms:
+    none, fixed:MS, uniform:LO,HI or lognormal:MEDIAN,SIGMA.
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v.strip()]
+    if kind == "none":
+        return lambda: 0.0
+    if kind == "fixed" and len(values) == 1:
+        return lambda: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda: rng.uniform(values[0], values[1])
+    if kind == "lognormal" and len(values) == 2:
+        mu = math.log(values[0])
+        return lambda: rng.lognormvariate(mu, values[1])
+    raise ValueError(f"unrecognized latency spec {spec!r}")
+
+
+class MockPetascope:
+    """Request handling and the simulated cost model, shared by all handler threads."""
+
+    def __init__(self, coverages: Dict[str, Coverage], args: argparse.Namespace):
+        self.coverages = coverages
+        self.capabilities = capabilities_xml(coverages)
+        self.capabilities_etag = '"' + hashlib.sha1(self.capabilities).hexdigest() + '"'
+        self.describe = {cid: describe_xml(cov) for cid, cov in coverages.items()}
+        self.latency = latency_sampler(args.latency, random.Random(args.seed))
+        self.cold_penalty_ms = args.cold_penalty_ms
+        self.ms_per_mb = args.ms_per_mb
+        self.tile_cells = max(1, args.tile_cells)
+        self.slots = threading.BoundedSemaphore(max(1, args.max_concurrency))
+        self.warm_tiles: Set[Tuple] = set()
+        self.lock = threading.Lock()
+
+    def touch_tiles(self, cov: Coverage, ranges: List[Tuple[int, int]]) -> float:
+        """Mark the storage tiles a request reads as cached; returns the fraction that were cold."""
+        spatial = []
+        for i in (cov.x, cov.y):
+            start, stop = ranges[i]
+            spatial.append(range(start // self.tile_cells, (stop - 1) // self.tile_cells + 1))
+        other = tuple(r for i, r in enumerate(ranges) if i not in (cov.x, cov.y))
+        keys = [(cov.id, other, tx, ty) for tx in spatial[0] for ty in spatial[1]]
+        with self.lock:
+            cold = sum(1 for k in keys if k not in self.warm_tiles)
+            self.warm_tiles.update(keys)
+        return cold / len(keys)
+
+    def simulate(self, cold_fraction: float, payload_bytes: int, started: float) -> str:
+        """
+        Sleep until the simulated service time has passed and return it as a Server-Timing header value:
+        plan (the base latency), tiles (cold tile reads) and encode (per-MB cost).
+        """
+        plan_ms = self.latency()
+        tiles_ms = self.cold_penalty_ms * cold_fraction
+        encode_ms = self.ms_per_mb * payload_bytes / 1e6
+        remaining = (plan_ms + tiles_ms + encode_ms) / 1000.0 - (time.perf_counter() - started)
+        if remaining > 0:
+            time.sleep(remaining)
+        return f"plan;dur={plan_ms:.1f}, tiles;dur={tiles_ms:.1f}, encode;dur={encode_ms:.1f}"
+
+    def coverage(self, coverage_id: str) -> Coverage:
+        cov = self.coverages.get(coverage_id)
+        if cov is None:
+            raise OwsError(404, "NoSuchCoverage", f"coverage {coverage_id!r} does not exist")
+        return cov
+
+    def handle(self, params: List[Tuple[str, str]], headers) -> Tuple[int, str, bytes, Dict[str, str]]:
+        lookup = {k.upper(): v for k, v in params}
+        service = lookup.get("SERVICE", "").upper()
+        request = lookup.get("REQUEST", "").lower()
+        if request == "getcapabilities" and service == "WCS":
+            if headers.get("If-None-Match") == self.capabilities_etag:
+                return 304, "application/xml", b"", {"ETag": self.capabilities_etag}
+            return 200, "application/xml", self.capabilities, {"ETag": self.capabilities_etag}
+        if request == "describecoverage" and service == "WCS":
+            return 200, "application/xml", self.describe[self.coverage(lookup.get("COVERAGEID", "")).id], {}
+        if request == "getcoverage" and service == "WCS":
+            return self.get_coverage(params, lookup)
+        if request == "processcoverages" and service == "WCS":
+            return self.process_coverages(lookup.get("QUERY", ""))
+        if request == "getmap" and service == "WMS":
+            return self.get_map(lookup)
+        raise OwsError(400, "OperationNotSupported", f"{service} {lookup.get('REQUEST', '')} is not supported by the mock")
+
+    def get_coverage(self, params: List[Tuple[str, str]], lookup: Dict[str, str]) -> Tuple[int, str, bytes, Dict[str, str]]:
+        started = time.perf_counter()
+        cov = self.coverage(lookup.get("COVERAGEID", ""))
+        ranges = [(0, a.size) for a in cov.axes]
+        sliced: List[int] = []
+        for key, value in params:
+            if key.upper() != "SUBSET":
+                continue
+            name, values = parse_subset(value)
+            i = cov.axis(name)
+            if i is None:
+                raise OwsError(400, "InvalidAxisLabel", f"coverage {cov.id} has no axis {name!r}")
+            if len(values) == 1:
+                idx = cov.axes[i].index(values[0])
+                ranges[i] = (idx, idx + 1)
+                sliced.append(i)
+            else:
+                ranges[i] = cov.axes[i].index_range(values[0], values[1])
+        cube = cov.data[tuple(slice(a, b) for a, b in ranges)]
+        cube = cube.squeeze(axis=tuple(sliced)) if sliced else cube
+
+        fmt_param = lookup.get("FORMAT", "application/json").lower()
+        if fmt_param == "application/json":
+            body = json.dumps(np.round(cube.astype(np.float64), 2).tolist()).encode("utf-8")
+            content_type = "application/json"
+        elif fmt_param in {"application/netcdf", "application/x-netcdf"}:
+            body = self.netcdf(cov, ranges, sliced, cube)
+            content_type = "application/netcdf"
+        else:
+            raise OwsError(400, "InvalidParameterValue", f"FORMAT {fmt_param} is not supported by the mock")
+        with self.slots:
+            timing = self.simulate(self.touch_tiles(cov, ranges), len(body), started)
+        return 200, content_type, body, {"Server-Timing": timing}
+
+    def process_coverages(self, query: str) -> Tuple[int, str, bytes, Dict[str, str]]:
+        """
+        Approximate WCPS: no expression is evaluated. The mock reads the cells selected by the query's first subset,
+        averages over axes subset by an iterator variable (condense) and returns the mean as a scalar, or the
+        remaining array as JSON when the query calls encode(). The per-MB cost applies to the cells read, since
+        aggregation queries read far more than they return.
+        """
+        started = time.perf_counter()
+        match = WCPS_COVERAGE_RE.search(query)
+        if not match:
+            raise OwsError(400, "WcpsError", "the mock only understands queries of the form for $c in (ID) return ...")
+        cov = self.coverage(match.group(1))
+        ranges = [(0, a.size) for a in cov.axes]
+        sliced: List[int] = []
+        condensed: List[int] = []
+        subset = WCPS_SUBSET_RE.search(query)
+        for name, value in WCPS_AXIS_RE.findall(subset.group(1) if subset else ""):
+            i = cov.axis(name)
+            if i is None:
+                raise OwsError(400, "WcpsError", f"coverage {cov.id} has no axis {name!r}")
+            values = [v.strip().strip('"') for v in WCPS_BOUND_RE.findall(value)]
+            if values[0].startswith("$"):
+                condensed.append(i)
+            elif len(values) == 1:
+                idx = cov.axes[i].index(values[0])
+                ranges[i] = (idx, idx + 1)
+                sliced.append(i)
+            else:
+                ranges[i] = cov.axes[i].index_range(values[0], values[1])
+        cube = cov.data[tuple(slice(a, b) for a, b in ranges)]
+        if "encode(" in query:
+            # the nil mask is the same at every non-spatial position, so averaging members keeps nil cells nil
+            kept = cube.mean(axis=tuple(condensed), keepdims=True) if condensed else cube
+            kept = kept.squeeze(axis=tuple(set(sliced) | set(condensed)))
+            body = json.dumps(np.round(kept.astype(np.float64), 2).tolist()).encode("utf-8")
+            content_type = "application/json"
+        else:
+            valid = cube[cube != cov.nil]
+            body = fmt(round(float(valid.mean()), 4) if valid.size else cov.nil).encode("utf-8")
+            content_type = "text/plain"
+        with self.slots:
+            timing = self.simulate(self.touch_tiles(cov, ranges), cube.nbytes, started)
+        return 200, content_type, body, {"Server-Timing": timing}
+
+    def netcdf(self, cov: Coverage, ranges: List[Tuple[int, int]], sliced: List[int], cube: np.ndarray) -> bytes:
+        try:
+            import xarray as xr
+        except ImportError:
+            raise OwsError(400, "InvalidParameterValue", "NetCDF output needs xarray installed next to the mock")
+        dims = [a.name for i, a in enumerate(cov.axes) if i not in sliced]
+        coords = {}
+        for i, a in enumerate(cov.axes):
+            if i in sliced:
+                continue
+            start, stop = ranges[i]
+            if a.irregular:
+                coords[a.name] = a.positions[start:stop]
+            else:
+                coords[a.name] = a.lower + (np.arange(start, stop) + 0.5) * a.resolution
+        ds = xr.Dataset({cov.band["name"]: (dims, cube)}, coords=coords)
+        return bytes(ds.to_netcdf())
+
+    def get_map(self, lookup: Dict[str, str]) -> Tuple[int, str, bytes, Dict[str, str]]:
+        started = time.perf_counter()
+        cov = self.coverage(lookup.get("LAYERS", "").split(",")[0])
+        crs = lookup.get("CRS", "")
+        if crs.upper() != f"EPSG:{cov.epsg}":
+            raise OwsError(400, "InvalidCRS", f"the mock only serves {cov.id} in EPSG:{cov.epsg}, not {crs}")
+        try:
+            bbox = [float(v) for v in lookup.get("BBOX", "").split(",")]
+            width, height = int(lookup.get("WIDTH", 256)), int(lookup.get("HEIGHT", 256))
+        except ValueError:
+            raise OwsError(400, "InvalidParameterValue", "BBOX, WIDTH and HEIGHT must be numeric")
+        if len(bbox) != 4 or not (0 < width <= 8192 and 0 < height <= 8192):
+            raise OwsError(400, "InvalidParameterValue", "bad BBOX/WIDTH/HEIGHT")
+        # WMS 1.3.0 uses lat/lon order for EPSG:4326
+        minx, miny, maxx, maxy = (bbox[1], bbox[0], bbox[3], bbox[2]) if cov.epsg == "4326" else bbox
+
+        ranges: List[Tuple[int, int]] = [(0, a.size) for a in cov.axes]
+        index = []
+        for i, a in enumerate(cov.axes):
+            if i in (cov.x, cov.y):
+                index.append(slice(None))
+                continue
+            # non-spatial axes are selected by extra parameters named after the axis (TIME for time); default first
+            value = lookup.get(a.name.upper()) or (lookup.get("TIME") if a.name.lower() in {"time", "ansi"} else None)
+            idx = a.index(value.strip('"')) if value else 0
+            index.append(idx)
+            ranges[i] = (idx, idx + 1)
+        plane = cov.data[tuple(index)]
+        # remaining dims are (x, y) in axis order; put y first for image rows
+        if cov.x > cov.y:
+            plane = plane.T
+        plane = plane.T
+
+        xs = minx + (np.arange(width) + 0.5) * (maxx - minx) / width
+        ys = maxy - (np.arange(height) + 0.5) * (maxy - miny) / height
+        ax, ay = cov.axes[cov.x], cov.axes[cov.y]
+        ix = np.floor((xs - ax.lower) / ax.resolution).astype(int)
+        iy = np.floor((ys - ay.lower) / ay.resolution).astype(int)
+        inside = (iy[:, None] >= 0) & (iy[:, None] < ay.size) & (ix[None, :] >= 0) & (ix[None, :] < ax.size)
+        values = plane[np.clip(iy, 0, ay.size - 1)[:, None], np.clip(ix, 0, ax.size - 1)[None, :]]
+        valid = inside & (values != cov.nil)
+
+        scaled = np.clip((values - cov.vmin) / max(cov.vmax - cov.vmin, 1e-9), 0, 1)
+        rgba = np.zeros((height, width, 4), dtype=np.uint8)
+        rgba[..., 0] = (255 * scaled).astype(np.uint8)
+        rgba[..., 1] = (255 * (1 - np.abs(scaled - 0.5) * 2)).astype(np.uint8)
+        rgba[..., 2] = (255 * (1 - scaled)).astype(np.uint8)
+        rgba[..., 3] = np.where(valid, 255, 0).astype(np.uint8)
+        body = encode_png(rgba)
+
+        touched_x = ix[(ix >= 0) & (ix < ax.size)]
+        touched_y = iy[(iy >= 0) & (iy < ay.size)]
+        if touched_x.size and touched_y.size:
+            ranges[cov.x] = (int(touched_x.min()), int(touched_x.max()) + 1)
+            ranges[cov.y] = (int(touched_y.min()), int(touched_y.max()) + 1)
+            cold = self.touch_tiles(cov, ranges)
+        else:
+            cold = 0.0
+        with self.slots:
+            timing = self.simulate(cold, len(body), started)
+        return 200, "image/png", body, {"Server-Timing": timing}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MockPetascope/1.0"
+    # headers and body go out as separate writes; without TCP_NODELAY the body waits on the client's delayed ACK
+    disable_nagle_algorithm = True
+    app: MockPetascope
+    access_log: Optional[io.TextIOBase] = None
+    log_lock = threading.Lock()
+
+    def do_GET(self) -> None:
+        parts = urlsplit(self.path)
+        try:
+            if not parts.path.rstrip("/").endswith("/ows"):
+                raise OwsError(404, "NotFound", f"no OWS endpoint at {parts.path}")
+            status, content_type, body, extra = self.app.handle(
+                parse_qsl(parts.query, keep_blank_values=True), self.headers
+            )
+        except OwsError as exc:
+            status, content_type, body, extra = exc.status, "application/xml", exception_report(exc.code, exc.text), {}
+        except Exception as exc:
+            status, content_type = 500, "application/xml"
+            body, extra = exception_report("NoApplicableCode", f"mock failure: {exc}"), {}
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in extra.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+        self.write_access_log(status, len(body))
+
+    def write_access_log(self, status: int, size: int) -> None:
+        if self.access_log is None:
+            return
+        stamp = time.strftime("%d/%b/%Y:%H:%M:%S %z")
+        line = (
+            f'{self.client_address[0]} - - [{stamp}] "{self.requestline}" {status} {size} "-" '
+            f'"{self.headers.get("User-Agent", "-")}"\n'
+        )
+        with self.log_lock:
+            self.access_log.write(line)
+            self.access_log.flush()
+
+    def log_message(self, format: str, *args) -> None:
+        # keep stdout quiet; use --access-log for a request log
+        pass
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Serve a local mock Petascope (WCS/WMS) for offline benchmarking.")
+    ap.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    ap.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080)")
+    ap.add_argument(
+        "--coverages",
+        default=str(DEFAULT_FIXTURE),
+        help="Coverage definitions JSON (default: fixtures/mock_coverages.json)",
+    )
+    ap.add_argument(
+        "--latency",
+        default="lognormal:40,0.5",
+        help="Base service time: none, fixed:MS, uniform:LO,HI or lognormal:MEDIAN,SIGMA (default: lognormal:40,0.5)",
+    )
+    ap.add_argument(
+        "--cold-penalty-ms",
+        type=float,
+        default=150.0,
+        help="Extra ms when every storage tile a request reads is uncached, prorated by the cold fraction (default: 150)",
+    )
+    ap.add_argument(
+        "--ms-per-mb",
+        type=float,
+        default=20.0,
+        help="Extra ms per MB of response body (default: 20)",
+    )
+    ap.add_argument(
+        "--tile-cells",
+        type=int,
+        default=16,
+        help="Storage tile edge in grid cells along X/Y for the cold-cache model (default: 16)",
+    )
+    ap.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=8,
+        help="Requests processed at once; the rest queue, like a saturated server (default: 8)",
+    )
+    ap.add_argument("--access-log", default=None, help="Write a combined-format access log to this file")
+    ap.add_argument("--seed", type=int, default=None, help="Random seed for the latency distribution")
+    args = ap.parse_args()
+
+    try:
+        coverages = load_coverages(Path(args.coverages))
+        app = MockPetascope(coverages, args)
+    except Exception as exc:
+        print(f"[ERROR] Failed to set up mock coverages: {exc}", file=sys.stderr)
+        return 2
+
+    Handler.app = app
+    if args.access_log:
+        Handler.access_log = open(args.access_log, "a", encoding="utf-8")
+    try:
+        server = ThreadingHTTPServer((args.host, args.port), Handler)
+    except OSError as exc:
+        print(f"[ERROR] Cannot listen on {args.host}:{args.port}: {exc}", file=sys.stderr)
+        return 2
+    server.daemon_threads = True
+    print(
+        f"[OK] Mock Petascope serving {len(coverages)} coverages at "
+        f"http://{args.host}:{server.server_address[1]}/rasdaman/ows",
+        flush=True,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if Handler.access_log is not None:
+            Handler.access_log.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
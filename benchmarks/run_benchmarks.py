@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
+import argparse
+import socket
 import subprocess
 import sys
+import time
+import urllib.request
 from pathlib import Path
+from typing import Tuple
 
 
 ROOT = Path(__file__).resolve().parent
@@ -11,16 +16,146 @@ def run(*args: str) -> None:
     subprocess.run(args, cwd=ROOT, check=True)
 
 
+def run_load(requests_csv: str, results_csv: str, args: argparse.Namespace) -> None:
+    """Replay a request CSV with the Python load generator."""
+    cmd = [
+        sys.executable,
+        "load_generator.py",
+        "--requests",
+        requests_csv,
+        "--out",
+        results_csv,
+        "--base-url",
+        args.base_url,
+        "--concurrency",
+        str(args.concurrency),
+        "--ramp-up",
+        str(args.ramp_up),
+        "--mode",
+        args.mode,
+        "--arrival",
+        args.arrival,
+    ]
+    if args.rps:
+        cmd += ["--rps", str(args.rps)]
+    run(*cmd)
+
+
+def start_mock(timeout: float = 30.0) -> Tuple[subprocess.Popen, str]:
+    """Start mock_petascope.py on a free local port and wait until it answers GetCapabilities."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    proc = subprocess.Popen([sys.executable, "mock_petascope.py", "--port", str(port)], cwd=ROOT)
+    endpoint = f"http://127.0.0.1:{port}/rasdaman/ows"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("mock_petascope.py exited during startup")
+        try:
+            with urllib.request.urlopen(f"{endpoint}?SERVICE=WCS&REQUEST=GetCapabilities", timeout=2):
+                return proc, endpoint
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"mock_petascope.py did not come up within {timeout:.0f}s")
+
+
 def main() -> int:
-    run(sys.executable, "get_zeus_capabilities.py")
-    run(sys.executable, "build_wcs_benchmark_requests.py")
-    run(sys.executable, "build_wms_benchmark_requests.py")
+    ap = argparse.ArgumentParser(description="Run the full benchmark pipeline.")
+    ap.add_argument(
+        "--runner",
+        choices=["python", "jmeter"],
+        default="python",
+        help="Load runner: the asyncio load_generator.py (default) or the JMeter test plans",
+    )
+    ap.add_argument(
+        "--base-url",
+        default="https://zeus.snap.uaf.edu/rasdaman/ows",
+        help="OWS endpoint for the Python runner",
+    )
+    ap.add_argument(
+        "--mode",
+        choices=["closed", "open"],
+        default="closed",
+        help="Python runner load model; open loop requires --rps",
+    )
+    ap.add_argument(
+        "--arrival",
+        choices=["poisson", "fixed"],
+        default="poisson",
+        help="Open-loop arrival process for the Python runner",
+    )
+    ap.add_argument(
+        "--concurrency", type=int, default=1, help="Concurrent workers for the Python runner"
+    )
+    ap.add_argument(
+        "--rps", type=float, default=None, help="Target requests/sec for the Python runner"
+    )
+    ap.add_argument(
+        "--ramp-up", type=float, default=3.0, help="Ramp-up seconds for the Python runner"
+    )
+    ap.add_argument(
+        "--mock",
+        action="store_true",
+        help="Run offline against a local mock_petascope.py instead of --base-url (Python runner only)",
+    )
+    ap.add_argument(
+        "--wcps",
+        action="store_true",
+        help="Also run the WCPS aggregation suite (build_wcps_benchmark_requests.py; Python runner only)",
+    )
+    args = ap.parse_args()
+
+    if args.mock and args.runner == "jmeter":
+        print("[ERROR] --mock only works with the Python runner.", file=sys.stderr)
+        return 2
+    if args.wcps and args.runner == "jmeter":
+        print("[ERROR] --wcps only works with the Python runner; there is no JMeter plan for it.", file=sys.stderr)
+        return 2
+
+    mock = None
+    capabilities_args = []
+    if args.mock:
+        try:
+            mock, args.base_url = start_mock()
+        except RuntimeError as exc:
+            print(f"[ERROR] {exc}", file=sys.stderr)
+            return 2
+        print(f"[OK] Mock Petascope running at {args.base_url}")
+        capabilities_args = [
+            "--url",
+            f"{args.base_url}?SERVICE=WCS&ACCEPTVERSIONS=2.1.0&REQUEST=GetCapabilities",
+            "--no-cache",
+        ]
+
+    if args.wcps:
+        # WCPS windows and time/ensemble aggregation need grid resolution and axis positions
+        capabilities_args.append("--describe")
+
+    try:
+        run(sys.executable, "get_zeus_capabilities.py", *capabilities_args)
+        run(sys.executable, "build_wcs_benchmark_requests.py")
+        run(sys.executable, "build_wms_benchmark_requests.py")
+
+        if args.runner == "jmeter":
+            run("jmeter", "-n", "-t", "wcs_benchmarks.jmx", "-l", "wcs_benchmark_results.csv")
+            run("jmeter", "-n", "-t", "wms_benchmarks.jmx", "-l", "wms_benchmark_results.csv")
+        else:
+            run_load("zeus_wcs_benchmark_requests.csv", "wcs_benchmark_results.csv", args)
+            run_load("zeus_wms_benchmark_requests.csv", "wms_benchmark_results.csv", args)
 
-    run("jmeter", "-n", "-t", "wcs_benchmarks.jmx", "-l", "wcs_benchmark_results.csv")
-    run("jmeter", "-n", "-t", "wms_benchmarks.jmx", "-l", "wms_benchmark_results.csv")
+        run(sys.executable, "analyze_wcs_results.py", "--results", "wcs_benchmark_results.csv")
+        run(sys.executable, "analyze_wms_results.py", "--results", "wms_benchmark_results.csv")
 
-    run(sys.executable, "analyze_wcs_results.py", "--results", "wcs_benchmark_results.csv")
-    run(sys.executable, "analyze_wms_results.py", "--results", "wms_benchmark_results.csv")
+        if args.wcps:
+            run(sys.executable, "build_wcps_benchmark_requests.py")
+            run_load("zeus_wcps_benchmark_requests.csv", "wcps_benchmark_results.csv", args)
+            run(sys.executable, "analyze_wcps_results.py", "--results", "wcps_benchmark_results.csv")
+    finally:
+        if mock is not None:
+            mock.terminate()
+            mock.wait()
     return 0
 
 
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Recommend a rasdaman tiling clause for an ingest recipe from the shape of the data it ingests and the queries the
+coverage is expected to serve, instead of copying "ALIGNED [0:*, 0:31, 0:31] tile size 16777216" everywhere.
+
+For each recipe the script opens the first NetCDF file matched by input.paths and reads the grid size along every
+recipe axis (in gridOrder), the band dtypes and the file's own chunking. It then scores candidate ALIGNED tilings
+(and the recipe's current one) against a query profile of two shapes:
+  point  one X/Y cell, the full extent of every other axis (a time series, like the WCS point benchmarks)
+  map    the full X/Y extent, one position on every other axis (a map slice, like WMS GetMap)
+Each query's cost is estimated as tiles touched * --tile-overhead-ms + MB read * --ms-per-mb, where whole tiles are
+read even when only part of them is needed. The profile-weighted cheapest candidate is recommended, and --write
+puts it into the recipe.
+
+Needs netCDF4, as wcst_import itself does.
+"""
+
+import argparse
+import importlib.util
+import math
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from benchlib.coverages import SPATIAL_AXES
+from benchlib.recipes import input_files, load_recipe, parse_tiling, recipe_axes, recipe_bands, recipe_options
+from benchlib.tables import parquet_error, write_table
+
+
+QUERY_TYPES = ["point", "map"]
+
+SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMG]i?B?)?\s*$", re.IGNORECASE)
+
+# rasdaman's tiling when a recipe doesn't set one
+DEFAULT_TILE_SIZE = 4194304
+
+
+def parse_profile(spec: str) -> Dict[str, float]:
+    """Parse --profile like "point=0.7,map=0.3" into normalized weights."""
+    weights: Dict[str, float] = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, sep, weight = part.partition("=")
+        name = name.strip()
+        if name not in QUERY_TYPES:
+            raise ValueError(f"unknown query type {name!r} (expected {' or '.join(QUERY_TYPES)})")
+        w = float(weight) if sep else 1.0
+        if w < 0:
+            raise ValueError(f"negative weight for {name!r}")
+        weights[name] = w
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("profile needs at least one positive weight")
+    return {name: weights.get(name, 0.0) / total for name in QUERY_TYPES}
+
+
+def parse_size(value: str) -> int:
+    """Byte count from "16777216", "4MiB", "512KB", ... (binary multiples either way)."""
+    m = SIZE_RE.match(value)
+    if not m:
+        raise ValueError(f"bad size {value!r}")
+    unit = (m.group(2) or "").upper()[:1]
+    return int(float(m.group(1)) * {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}[unit])
+
+
+def parse_axis_sizes(values: List[str]) -> Dict[str, int]:
+    out: Dict[str, int] = {}
+    for value in values:
+        axis, sep, size = value.partition("=")
+        if not sep or not size.strip().isdigit() or int(size) < 1:
+            raise ValueError(f"expected AXIS=N, got {value!r}")
+        out[axis.strip()] = int(size)
+    return out
+
+
+class Layout:
+    """Grid size along each recipe axis (grid order), bytes per cell over all bands, and the NetCDF chunking."""
+
+    def __init__(
+        self,
+        axes: List[str],
+        sizes: List[int],
+        cell_bytes: int,
+        chunks: Optional[List[int]],
+        notes: List[str],
+    ):
+        self.axes = axes
+        self.sizes = sizes
+        self.cell_bytes = cell_bytes
+        self.chunks = chunks
+        self.notes = notes
+        self.spatial = [a.lower() in SPATIAL_AXES for a in axes]
+
+    def describe(self) -> str:
+        grid = ", ".join(f"{a}={n}" for a, n in zip(self.axes, self.sizes))
+        chunks = "contiguous" if self.chunks is None else "[" + ", ".join(str(c) for c in self.chunks) + "]"
+        return f"{grid}; {self.cell_bytes} bytes/cell; NetCDF chunks {chunks}"
+
+
+def inspect_netcdf(
+    nc_path: Path,
+    axes: List[Tuple[str, Optional[str]]],
+    bands: List[dict],
+    file_count: int,
+    overrides: Dict[str, int],
+) -> Layout:
+    """Read axis sizes, band dtypes and chunking from one NetCDF file (header only)."""
+    import netCDF4
+
+    notes: List[str] = []
+    with netCDF4.Dataset(str(nc_path)) as ds:
+        names = [str(b.get("identifier") or b.get("name")) for b in bands]
+        missing = [n for n in names if n not in ds.variables]
+        if missing:
+            raise ValueError(f"band variable(s) {', '.join(missing)} not in {nc_path}")
+        if not names:
+            # the slicer takes bands from the file: every variable with the most dimensions
+            ndim = max((v.ndim for v in ds.variables.values()), default=0)
+            names = [n for n, v in ds.variables.items() if v.ndim == ndim and ndim > 1]
+        if not names:
+            raise ValueError(f"no gridded variables in {nc_path}")
+        band = ds.variables[names[0]]
+        cell_bytes = sum(ds.variables[n].dtype.itemsize for n in names)
+        dim_sizes = {d: len(ds.dimensions[d]) for d in band.dimensions}
+        chunking = band.chunking()
+
+        sizes: List[int] = []
+        dims: List[Optional[str]] = []
+        for name, variable in axes:
+            dim = None
+            if variable in ds.variables and ds.variables[variable].ndim == 1:
+                dim = ds.variables[variable].dimensions[0]
+            elif name.lower() in {d.lower() for d in dim_sizes}:
+                dim = next(d for d in dim_sizes if d.lower() == name.lower())
+            if name in overrides:
+                sizes.append(overrides[name])
+            elif dim is not None:
+                sizes.append(len(ds.dimensions[dim]))
+            else:
+                # an axis the file doesn't have is sliced across files (e.g. one time step per file)
+                sizes.append(file_count)
+                notes.append(f"{name} not in the file; assuming one position per input file ({file_count})")
+            dims.append(dim)
+
+        chunks = None
+        if chunking != "contiguous":
+            by_dim = dict(zip(band.dimensions, chunking))
+            chunks = [by_dim.get(d, 1) if d else 1 for d in dims]
+    return Layout([a for a, _ in axes], sizes, cell_bytes, chunks, notes)
+
+
+def current_extents(tiling: Optional[str], layout: Layout) -> Tuple[str, Optional[List[int]]]:
+    """
+    Tile extents rasdaman would use for the recipe's current tiling. "*" axes share whatever the tile size leaves
+    after the fixed ones, smallest axis first, which is how ALIGNED tiling fills them.
+    """
+    parsed = parse_tiling(tiling)
+    if parsed["tiling_scheme"] == "default":
+        config = [None] * len(layout.sizes)
+        tile_size = DEFAULT_TILE_SIZE
+    elif parsed["tiling_scheme"] in {"ALIGNED", "REGULAR"} and parsed["tile_config"]:
+        config = []
+        for part in str(parsed["tile_config"]).strip("[]").split(","):
+            lo, _, hi = part.strip().partition(":")
+            config.append(None if hi.strip() == "*" else int(hi) - int(lo) + 1)
+        tile_size = int(parsed["tile_size"])
+    else:
+        return str(parsed["tiling"]), None
+    if len(config) != len(layout.sizes):
+        return str(parsed["tiling"]), None
+
+    extents = [min(c, n) if c else 0 for c, n in zip(config, layout.sizes)]
+    budget = max(tile_size // layout.cell_bytes, 1)
+    for e in extents:
+        budget //= max(e, 1)
+    free = sorted((n, i) for i, (c, n) in enumerate(zip(config, layout.sizes)) if c is None)
+    for k, (n, i) in enumerate(free):
+        share = int(budget ** (1.0 / (len(free) - k))) if budget > 1 else 1
+        extents[i] = max(1, min(n, share))
+        budget //= extents[i]
+    return str(parsed["tiling"]), extents
+
+
+def candidate_extents(layout: Layout, tile_sizes: List[int]) -> Iterator[List[int]]:
+    """
+    ALIGNED candidates for each target tile size: a power-of-two depth of cells along the non-spatial axes (filling
+    the largest axis first) times a square-ish X/Y footprint using the rest of the tile, plus the NetCDF chunk shape.
+    """
+    other = sorted((i for i, s in enumerate(layout.spatial) if not s), key=lambda i: -layout.sizes[i])
+    spatial = [i for i, s in enumerate(layout.spatial) if s]
+    total_depth = math.prod(layout.sizes[i] for i in other)
+    if layout.chunks:
+        yield list(layout.chunks)
+    for target in tile_sizes:
+        cells = max(target // layout.cell_bytes, 1)
+        depths = {1 << k for k in range(int(math.log2(max(total_depth, 1))) + 1)} | {total_depth}
+        for depth in sorted(d for d in depths if d <= cells):
+            extents = [1] * len(layout.sizes)
+            remaining = depth
+            for i in other:
+                extents[i] = min(layout.sizes[i], remaining)
+                remaining = max(remaining // extents[i], 1)
+            footprint = cells // math.prod(extents)
+            for k, i in enumerate(spatial):
+                edge = int(footprint ** (1.0 / (len(spatial) - k)))
+                extents[i] = max(1, min(layout.sizes[i], edge))
+                footprint //= extents[i]
+            yield extents
+
+
+def query_costs(
+    extents: List[int], layout: Layout, tile_overhead_ms: float, ms_per_mb: float
+) -> Dict[str, Tuple[int, float, float]]:
+    """(tiles touched, MB read, estimated ms) per query type for one tiling."""
+    tile_mb = math.prod(min(e, n) for e, n in zip(extents, layout.sizes)) * layout.cell_bytes / 1e6
+    out = {}
+    for query in QUERY_TYPES:
+        # point: one X/Y cell, whole other axes; map: whole X/Y, one position elsewhere
+        full = [not s if query == "point" else s for s in layout.spatial]
+        tiles = math.prod(math.ceil(n / e) if f else 1 for e, n, f in zip(extents, layout.sizes, full))
+        out[query] = (tiles, tiles * tile_mb, tiles * tile_overhead_ms + tiles * tile_mb * ms_per_mb)
+    return out
+
+
+def tiling_clause(extents: List[int], cell_bytes: int) -> str:
+    axes = ", ".join(f"0:{e - 1}" for e in extents)
+    return f"ALIGNED [{axes}] tile size {math.prod(extents) * cell_bytes}"
+
+
+def rewrite_tiling(path: Path, clause: str) -> bool:
+    """
+    Set the recipe's tiling option in place. The text is edited rather than re-serialized, so hooks with raw
+    control characters and the file's formatting survive. Returns False if there's no options block to add it to.
+    """
+    text = path.read_text(encoding="utf-8")
+    new, count = re.subn(r'("tiling"\s*:\s*")[^"]*(")', lambda m: m.group(1) + clause + m.group(2), text, count=1)
+    if not count:
+        m = re.search(r'"options"\s*:\s*\{(\s*)', text)
+        if not m:
+            return False
+        new = text[: m.end()] + f'"tiling": "{clause}",' + m.group(1) + text[m.end():]
+    path.write_text(new, encoding="utf-8")
+    return True
+
+
+def advise(path: Path, args: argparse.Namespace, profile: Dict[str, float], tile_sizes: List[int]) -> List[dict]:
+    """Score the current and candidate tilings for one recipe; returns rows ranked by weighted cost."""
+    recipe = load_recipe(path)
+    if recipe is None:
+        raise ValueError("not a wcst_import recipe")
+    axes = recipe_axes(recipe)
+    if not axes:
+        raise ValueError("recipe has no slicer axes")
+    files = [Path(args.netcdf)] if args.netcdf else input_files(recipe, path)
+    if not files:
+        raise ValueError("input.paths matches no files here (pass --netcdf)")
+    layout = inspect_netcdf(files[0], axes, recipe_bands(recipe), len(files), args.axis_size)
+
+    coverage_id = recipe.get("input", {}).get("coverage_id", "")
+    print(f"{coverage_id} ({path})")
+    print(f"  grid: {layout.describe()}")
+    for note in layout.notes:
+        print(f"  [WARN] {note}")
+
+    def row(label: str, tiling: str, extents: List[int]) -> dict:
+        costs = query_costs(extents, layout, args.tile_overhead_ms, args.ms_per_mb)
+        r = {"recipe_path": str(path), "coverageId": coverage_id, "candidate": label, "tiling": tiling}
+        r["tile_bytes"] = math.prod(min(e, n) for e, n in zip(extents, layout.sizes)) * layout.cell_bytes
+        for query in QUERY_TYPES:
+            tiles, mb, _ = costs[query]
+            r[f"{query}_tiles"] = tiles
+            r[f"{query}_mb"] = round(mb, 2)
+        r["cost_ms"] = round(sum(profile[q] * costs[q][2] for q in QUERY_TYPES), 1)
+        return r
+
+    rows = []
+    seen = set()
+    for extents in candidate_extents(layout, tile_sizes):
+        if tuple(extents) not in seen:
+            seen.add(tuple(extents))
+            rows.append(row("candidate", tiling_clause(extents, layout.cell_bytes), extents))
+    rows.sort(key=lambda r: (r["cost_ms"], -r["tile_bytes"]))
+    rows = rows[: args.top]
+    rows[0]["candidate"] = "recommended"
+
+    current_tiling, current = current_extents(recipe_options(recipe).get("tiling"), layout)
+    if current is None:
+        print(f"  current: {current_tiling} (not modelled)")
+    else:
+        rows.insert(0, row("current", current_tiling, current))
+
+    for r in rows:
+        print(
+            f"  {r['candidate']:<11} {r['tiling']}: point {r['point_tiles']} tiles / {r['point_mb']} MB, "
+            f"map {r['map_tiles']} tiles / {r['map_mb']} MB, cost {r['cost_ms']} ms"
+        )
+    return rows
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Recommend a rasdaman tiling for ingest recipes from their NetCDF layout.")
+    ap.add_argument("recipes", nargs="+", help="Ingest recipe JSON file(s)")
+    ap.add_argument("--netcdf", default=None, help="NetCDF file to inspect instead of the recipe's input.paths")
+    ap.add_argument(
+        "--profile",
+        default="point=0.5,map=0.5",
+        help="Expected query mix: point (time series at one cell) and map (one slice) weights (default: 0.5 each)",
+    )
+    ap.add_argument(
+        "--tile-sizes",
+        default="1MiB,4MiB,16MiB",
+        help="Target tile sizes to consider (default: 1MiB,4MiB,16MiB)",
+    )
+    ap.add_argument(
+        "--axis-size",
+        action="append",
+        default=[],
+        help="Override an axis size, e.g. time=23741 when the files hold only part of it (repeatable)",
+    )
+    ap.add_argument(
+        "--tile-overhead-ms",
+        type=float,
+        default=5.0,
+        help="Estimated fixed cost per tile read (default: 5)",
+    )
+    ap.add_argument("--ms-per-mb", type=float, default=10.0, help="Estimated cost per MB read (default: 10)")
+    ap.add_argument("--top", type=int, default=5, help="Candidates to list per recipe (default: 5)")
+    ap.add_argument("--out", default="tiling_advice.csv", help="Output CSV with the scored tilings")
+    ap.add_argument("--write", action="store_true", help="Write the recommended tiling into each recipe")
+    args = ap.parse_args()
+
+    if importlib.util.find_spec("netCDF4") is None:
+        print("[ERROR] tiling_advisor.py needs netCDF4: pip install netCDF4", file=sys.stderr)
+        return 2
+    error = parquet_error(args.out)
+    if error:
+        print(f"[ERROR] {error}", file=sys.stderr)
+        return 2
+    try:
+        profile = parse_profile(args.profile)
+        tile_sizes = [parse_size(v) for v in args.tile_sizes.split(",") if v.strip()]
+        args.axis_size = parse_axis_sizes(args.axis_size)
+    except ValueError as exc:
+        print(f"[ERROR] {exc}", file=sys.stderr)
+        return 2
+    if args.netcdf and len(args.recipes) > 1:
+        print("[ERROR] --netcdf only makes sense with a single recipe.", file=sys.stderr)
+        return 2
+    args.top = max(args.top, 1)
+
+    rows: List[dict] = []
+    failed = 0
+    for recipe_path in args.recipes:
+        path = Path(recipe_path)
+        try:
+            recipe_rows = advise(path, args, profile, tile_sizes)
+        except Exception as exc:
+            print(f"[ERROR] {path}: {exc}", file=sys.stderr)
+            failed += 1
+            continue
+        rows.extend(recipe_rows)
+        if args.write:
+            best = next(r for r in recipe_rows if r["candidate"] == "recommended")
+            if rewrite_tiling(path, best["tiling"]):
+                print(f"  [OK] Wrote tiling to {path}")
+            else:
+                print(f"  [WARN] No recipe.options block in {path}; tiling not written.")
+
+    if rows:
+        write_table(pd.DataFrame(rows), args.out)
+        print(f"[OK] Wrote {args.out}")
+    return 2 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
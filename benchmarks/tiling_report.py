@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Correlate benchmark latency with how each coverage was tiled at ingest.
+Scans every ingest recipe in the repo for coverage ID, tiling scheme, tile size, wms_import and band count, joins
+that onto the per-coverage WCS/WMS results summaries, and ranks tiling configurations by observed latency
+(WCS point queries and WMS GetMap requests separately).
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+from benchlib.recipes import find_recipes, recipe_row
+from benchlib.tables import read_table, write_table
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+SUMMARY_METRICS = ["latency_mean_ms", "latency_p95_ms", "throughput_mean_bps"]
+
+
+def recipe_table(root: Path) -> pd.DataFrame:
+    """One row per coverage ID found in the repo's ingest recipes."""
+    rows = [recipe_row(path, recipe, root) for path, recipe in find_recipes(root)]
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    # templates like "cmip6_downscaled_{varname}_..." aren't real coverage IDs
+    df = df[df["coverageId"].astype(str).str.len().gt(0) & ~df["coverageId"].astype(str).str.contains("{")]
+    df = df.drop_duplicates(subset=["coverageId"], keep="first").reset_index(drop=True)
+    for col in ["tile_size", "band_count"]:
+        df[col] = df[col].astype("Int64")
+    return df
+
+
+def load_summary(path: Optional[str], query_type: str, recipes: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Join an analyzer summary onto recipe metadata; returns None if the summary is missing."""
+    if not path:
+        return None
+    try:
+        summary = read_table(path)
+    except Exception as exc:
+        print(f"[WARN] Skipping {query_type} summary {path}: {exc}", file=sys.stderr)
+        return None
+    joined = summary.merge(recipes, on="coverageId", how="left")
+    missing = joined["tiling"].isna()
+    if missing.any():
+        print(
+            f"[WARN] {int(missing.sum())} {query_type} coverage(s) have no ingest recipe in the repo: "
+            + ", ".join(joined.loc[missing, "coverageId"].astype(str)),
+            file=sys.stderr,
+        )
+    joined["tiling"] = joined["tiling"].fillna("no recipe")
+    joined.insert(1, "query_type", query_type)
+    return joined
+
+
+def rank_tilings(coverages: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate per-coverage results by tiling and rank, fastest median p95 first within each query type."""
+    metrics = [m for m in SUMMARY_METRICS if m in coverages.columns]
+    agg = {f"median_{m}": (m, "median") for m in metrics}
+    report = (
+        coverages.groupby(["query_type", "tiling"], dropna=False)
+        .agg(
+            coverages=("coverageId", "nunique"),
+            samples=("count_total", "sum"),
+            wms_import_share=("wms_import", "mean"),
+            median_band_count=("band_count", "median"),
+            **agg,
+        )
+        .reset_index()
+    )
+    sort_col = "median_latency_p95_ms" if "median_latency_p95_ms" in report.columns else "median_latency_mean_ms"
+    report = report.sort_values(["query_type", sort_col]).reset_index(drop=True)
+    report.insert(0, "rank", report.groupby("query_type").cumcount() + 1)
+    return report
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="Rank ingest tiling schemes by observed benchmark latency."
+    )
+    ap.add_argument(
+        "--repo-root",
+        default=str(REPO_ROOT),
+        help="Directory to scan for ingest JSON recipes (default: repo root)",
+    )
+    ap.add_argument(
+        "--wcs-summary",
+        default="wcs_results_summary.csv",
+        help="WCS summary from analyze_wcs_results.py (point queries)",
+    )
+    ap.add_argument(
+        "--wms-summary",
+        default="wms_results_summary.csv",
+        help="WMS summary from analyze_wms_results.py (GetMap)",
+    )
+    ap.add_argument(
+        "--out-coverages",
+        default="tiling_coverages.csv",
+        help="Output CSV of per-coverage results joined with recipe tiling metadata",
+    )
+    ap.add_argument(
+        "--out",
+        default="tiling_report.csv",
+        help="Output CSV ranking tiling configurations per query type",
+    )
+    args = ap.parse_args()
+
+    root = Path(args.repo_root).resolve()
+    recipes = recipe_table(root)
+    if recipes.empty:
+        print(f"[ERROR] No ingest recipes found under {root}.", file=sys.stderr)
+        return 2
+    print(f"Found {len(recipes)} ingest recipes with coverage IDs under {root}.")
+
+    joined: List[pd.DataFrame] = []
+    for path, query_type in [(args.wcs_summary, "wcs_point"), (args.wms_summary, "wms_getmap")]:
+        j = load_summary(path, query_type, recipes)
+        if j is not None:
+            joined.append(j)
+    if not joined:
+        print("[ERROR] No results summaries could be read.", file=sys.stderr)
+        return 2
+
+    coverages = pd.concat(joined, ignore_index=True)
+    write_table(coverages, args.out_coverages)
+
+    report = rank_tilings(coverages)
+    for col in [c for c in report.columns if c.startswith("median_") and c != "median_band_count"]:
+        report[col] = report[col].round(0).astype("Int64")
+    report["wms_import_share"] = report["wms_import_share"].astype(float).round(2)
+    write_table(report, args.out)
+
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(report.to_string(index=False))
+    print(f"[OK] Wrote {args.out_coverages} and {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
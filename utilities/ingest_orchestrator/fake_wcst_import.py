@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Stand-in for wcst_import.sh to exercise run_ingests.py without rasdaman. It accepts the same arguments, checks
+that the recipe (the last argument) exists and names a coverage, sleeps for a while, and fails at random.
+
+Environment:
+  FAKE_WCST_SECONDS    seconds per import, or "lo,hi" for a random duration (default: 1,3)
+  FAKE_WCST_FAIL_RATE  chance that an attempt exits with status 1 (default: 0.3)
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+
+def main() -> int:
+    if len(sys.argv) < 2:
+        print("Usage: fake_wcst_import.py [options] <recipe.json>", file=sys.stderr)
+        return 2
+    recipe = sys.argv[-1]
+    try:
+        with open(recipe, encoding="utf-8") as f:
+            coverage_id = json.loads(f.read(), strict=False)["input"]["coverage_id"]
+    except (OSError, ValueError, KeyError) as exc:
+        print(f"Error: cannot read ingredients file {recipe}: {exc}", file=sys.stderr)
+        return 1
+
+    lo, _, hi = os.environ.get("FAKE_WCST_SECONDS", "1,3").partition(",")
+    seconds = random.uniform(float(lo), float(hi or lo))
+    fail_rate = float(os.environ.get("FAKE_WCST_FAIL_RATE", "0.3"))
+
+    print(f"Importing {coverage_id} from {recipe} ({seconds:.1f}s)")
+    sys.stdout.flush()
+    time.sleep(seconds)
+    if random.random() < fail_rate:
+        print(f"Error: simulated failure while importing {coverage_id}", file=sys.stderr)
+        return 1
+    print(f"Coverage {coverage_id} imported successfully.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
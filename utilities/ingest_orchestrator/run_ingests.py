@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+Run wcst_import.sh over many ingest recipes: several at once, retried with exponential backoff, and resumable.
+
+Recipes are found from the given files, directories (searched recursively for --pattern) or globs and queued
+largest input first (--priority), so the longest imports start early and don't end up alone at the tail. Recipes
+importing into the same coverage never run at the same time; a lock file per coverage extends that to other
+orchestrators sharing the --state-dir. --after DEPENDENT=PREREQUISITE (fnmatch patterns on recipe paths) holds a
+recipe back until its prerequisites are done.
+
+Every start, retry and finish is appended to a JSON-lines journal in --state-dir. On the next run, recipes whose last
+journaled attempt succeeded with the same file contents are skipped. A run killed mid-import therefore picks up where
+it stopped, and wcst_import's own resume file skips the NetCDF files it had already imported. Each recipe's output
+goes to its own log, and a CSV report lists every recipe's status, attempts and wall time.
+
+Try it without rasdaman using the stand-in in this directory:
+  python run_ingests.py ../../ardac/daily_wrf_downscaled_era5 --wcst-import ./fake_wcst_import.py \
+      --state-dir /tmp/ingest
+"""
+
+import argparse
+import csv
+import fcntl
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import random
+import shlex
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+DEFAULT_WCST_IMPORT = "/opt/rasdaman/bin/wcst_import.sh"
+DEFAULT_ENV_SCRIPT = "/etc/profile.d/rasdaman.sh"
+
+PENDING, RUNNING, DONE, FAILED, SKIPPED = "pending", "running", "done", "failed", "skipped"
+
+
+class Recipe:
+    """One ingest recipe and its progress through the queue."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        text = path.read_text(encoding="utf-8")
+        self.digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        try:
+            # recipes often carry raw newlines inside hook commands, which strict JSON rejects
+            data = json.loads(text, strict=False)
+        except ValueError:
+            data = {}
+        inputs = data.get("input", {}) if isinstance(data, dict) else {}
+        self.coverage_id = str(inputs.get("coverage_id") or path.stem)
+        self.input_bytes = input_bytes(path.parent, inputs.get("paths", []))
+        self.status = PENDING
+        self.attempts = 0
+        self.exit_code: Optional[int] = None
+        self.not_before = 0.0
+        self.started: Optional[float] = None
+        self.wall_s = 0.0
+
+    @property
+    def name(self) -> str:
+        return str(self.path)
+
+
+def input_bytes(base: Path, patterns: List[str]) -> int:
+    """Total size of the files a recipe's input.paths match (relative paths resolve against the recipe's dir)."""
+    total = 0
+    for pattern in patterns:
+        pattern = str(pattern)
+        full = pattern if os.path.isabs(pattern) else str(base / pattern)
+        for match in glob.glob(full, recursive=True):
+            try:
+                total += os.path.getsize(match)
+            except OSError:
+                pass
+    return total
+
+
+def discover(targets: List[str], pattern: str) -> List[Path]:
+    found: Dict[Path, None] = {}
+    for target in targets:
+        path = Path(target)
+        if path.is_dir():
+            matches = sorted(path.rglob(pattern))
+        elif path.is_file():
+            matches = [path]
+        else:
+            matches = sorted(Path(p) for p in glob.glob(target, recursive=True))
+        for match in matches:
+            if match.is_file():
+                found[match.resolve()] = None
+    return list(found)
+
+
+def parse_after(specs: List[str]) -> List[Tuple[str, str]]:
+    rules = []
+    for spec in specs:
+        dependent, sep, prerequisite = spec.partition("=")
+        if not sep or not dependent or not prerequisite:
+            raise ValueError(spec)
+        rules.append((dependent, prerequisite))
+    return rules
+
+
+def matches(recipe: Recipe, pattern: str) -> bool:
+    return fnmatch.fnmatch(recipe.name, pattern) or fnmatch.fnmatch(recipe.path.name, pattern)
+
+
+def prerequisites(recipes: List[Recipe], rules: List[Tuple[str, str]]) -> Dict[str, List[Recipe]]:
+    deps: Dict[str, List[Recipe]] = {r.name: [] for r in recipes}
+    for dependent, prerequisite in rules:
+        for r in recipes:
+            if matches(r, dependent):
+                deps[r.name] += [p for p in recipes if p is not r and matches(p, prerequisite)]
+    return deps
+
+
+def find_cycle(recipes: List[Recipe], deps: Dict[str, List[Recipe]]) -> Optional[str]:
+    state: Dict[str, int] = {}
+
+    def visit(r: Recipe) -> Optional[str]:
+        state[r.name] = 1
+        for p in deps[r.name]:
+            if state.get(p.name) == 1:
+                return p.name
+            if p.name not in state:
+                found = visit(p)
+                if found:
+                    return found
+        state[r.name] = 2
+        return None
+
+    for r in recipes:
+        if r.name not in state:
+            found = visit(r)
+            if found:
+                return found
+    return None
+
+
+class Journal:
+    """Append-only JSON-lines record of every attempt, flushed per event so a crash loses nothing."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def completed(self) -> Dict[str, str]:
+        """Recipe path -> digest of the contents it last succeeded with."""
+        done: Dict[str, str] = {}
+        if not self.path.exists():
+            return done
+        with self.path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash
+                if event.get("event") == DONE:
+                    done[event["recipe"]] = event["digest"]
+                elif event.get("event") in {"start", FAILED}:
+                    done.pop(event.get("recipe"), None)
+        return done
+
+    def write(self, recipe: Recipe, event: str, **fields: object) -> None:
+        record = {
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "event": event,
+            "recipe": recipe.name,
+            "coverage_id": recipe.coverage_id,
+            "digest": recipe.digest,
+            "attempt": recipe.attempts,
+            **fields,
+        }
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class CoverageLock:
+    """Non-blocking flock on <state-dir>/locks/<coverage>.lock, held for the duration of one import."""
+
+    def __init__(self, lock_dir: Path, coverage_id: str):
+        self.path = lock_dir / f"{coverage_id}.lock"
+        self.fd: Optional[int] = None
+
+    def acquire(self) -> bool:
+        fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self.fd = fd
+        return True
+
+    def release(self) -> None:
+        if self.fd is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+            self.fd = None
+
+
+def ingest_command(recipe: Recipe, wcst_import: str, wcst_args: List[str], env_script: Optional[str]) -> List[str]:
+    cmd = [wcst_import, *wcst_args, recipe.path.name]
+    if not env_script:
+        return cmd
+    return ["bash", "-c", f"source {shlex.quote(env_script)} && exec {shlex.join(cmd)}"]
+
+
+def run_one(recipe: Recipe, cmd: List[str], log_path: Path, timeout: Optional[float]) -> int:
+    """Run one attempt from the recipe's directory (recipes use relative paths), appending output to its log."""
+    with log_path.open("a", encoding="utf-8") as log:
+        stamp = datetime.now().isoformat(timespec="seconds")
+        log.write(f"\n=== attempt {recipe.attempts} at {stamp}: {shlex.join(cmd)}\n")
+        log.flush()
+        try:
+            proc = subprocess.run(
+                cmd, cwd=recipe.path.parent, stdout=log, stderr=subprocess.STDOUT, timeout=timeout
+            )
+        except subprocess.TimeoutExpired:
+            log.write(f"=== timed out after {timeout:.0f}s\n")
+            return 124
+        except OSError as exc:
+            log.write(f"=== could not start: {exc}\n")
+            return 127
+        return proc.returncode
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng: random.Random) -> float:
+    """Exponential backoff with full jitter: uniform in [base, min(cap, base * 2^(attempt-1))]."""
+    ceiling = min(cap, base * 2 ** (attempt - 1))
+    return rng.uniform(min(base, ceiling), ceiling)
+
+
+def log_name(recipe: Recipe) -> str:
+    # recipes in different dirs often share a file name (ingest.json); keep their logs apart
+    tag = hashlib.sha1(recipe.name.encode("utf-8")).hexdigest()[:8]
+    return f"{recipe.path.stem}-{tag}.log"
+
+
+def format_seconds(seconds: float) -> str:
+    minutes, secs = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}"
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="Run wcst_import.sh over many recipes in parallel, with retries and resume."
+    )
+    ap.add_argument("targets", nargs="+", help="Recipe files, directories to search, or globs")
+    ap.add_argument(
+        "--pattern",
+        default="*ingest*.json",
+        help="File name pattern when searching directories (default: *ingest*.json)",
+    )
+    ap.add_argument("-j", "--jobs", type=int, default=2, help="Imports to run at once (default: 2)")
+    ap.add_argument(
+        "--priority",
+        choices=["size", "name"],
+        default="size",
+        help="Queue order: size = largest input first (default), name = path order",
+    )
+    ap.add_argument(
+        "--after",
+        action="append",
+        default=[],
+        metavar="DEPENDENT=PREREQUISITE",
+        help="Hold recipes matching DEPENDENT until those matching PREREQUISITE are done (repeatable)",
+    )
+    ap.add_argument(
+        "--max-attempts",
+        type=int,
+        default=5,
+        help="Attempts per recipe before giving up; 0 retries forever like run_ingest.sh (default: 5)",
+    )
+    ap.add_argument("--backoff", type=float, default=5.0, help="First retry delay in seconds (default: 5)")
+    ap.add_argument("--backoff-max", type=float, default=600.0, help="Longest retry delay in seconds (default: 600)")
+    ap.add_argument("--timeout", type=float, default=None, help="Kill an attempt after this many seconds")
+    ap.add_argument(
+        "--wcst-import",
+        default=DEFAULT_WCST_IMPORT,
+        help=f"wcst_import executable (default: {DEFAULT_WCST_IMPORT})",
+    )
+    ap.add_argument(
+        "--wcst-args",
+        default="-c 0",
+        help='Arguments passed before the recipe (default: "-c 0")',
+    )
+    ap.add_argument(
+        "--env-script",
+        default=DEFAULT_ENV_SCRIPT,
+        help=f"Shell script sourced before each import if it exists (default: {DEFAULT_ENV_SCRIPT}); '' to skip",
+    )
+    ap.add_argument(
+        "--state-dir",
+        default="ingest_state",
+        help="Journal, per-recipe logs and coverage locks (default: ingest_state)",
+    )
+    ap.add_argument("--report", default=None, help="Per-recipe report CSV (default: <state-dir>/ingest_report.csv)")
+    ap.add_argument("--restart", action="store_true", help="Ignore the journal and run every recipe again")
+    ap.add_argument("--dry-run", action="store_true", help="Print the queue and exit")
+    args = ap.parse_args()
+
+    if args.jobs < 1:
+        print("[ERROR] --jobs must be at least 1.", file=sys.stderr)
+        return 2
+    try:
+        rules = parse_after(args.after)
+    except ValueError as exc:
+        print(f"[ERROR] --after expects DEPENDENT=PREREQUISITE, got {exc}", file=sys.stderr)
+        return 2
+
+    recipes = [Recipe(p) for p in discover(args.targets, args.pattern)]
+    if not recipes:
+        print("[ERROR] No ingest recipes found.", file=sys.stderr)
+        return 2
+    if args.priority == "size":
+        recipes.sort(key=lambda r: (-r.input_bytes, r.name))
+    else:
+        recipes.sort(key=lambda r: r.name)
+    deps = prerequisites(recipes, rules)
+    cycle = find_cycle(recipes, deps)
+    if cycle:
+        print(f"[ERROR] --after rules form a cycle through {cycle}", file=sys.stderr)
+        return 2
+
+    state_dir = Path(args.state_dir)
+    log_dir = state_dir / "logs"
+    lock_dir = state_dir / "locks"
+    for d in (log_dir, lock_dir):
+        d.mkdir(parents=True, exist_ok=True)
+    journal = Journal(state_dir / "journal.jsonl")
+    completed = {} if args.restart else journal.completed()
+    for r in recipes:
+        if completed.get(r.name) == r.digest:
+            r.status = DONE
+
+    env_script = args.env_script if args.env_script and os.path.exists(args.env_script) else None
+    wcst_args = shlex.split(args.wcst_args)
+    # imports run from each recipe's directory, so a relative executable path has to be made absolute here
+    wcst_import = os.path.abspath(args.wcst_import) if os.sep in args.wcst_import else args.wcst_import
+
+    resumed = sum(r.status == DONE for r in recipes)
+    print(
+        f"Found {len(recipes)} recipes; {resumed} already done, "
+        f"{len(recipes) - resumed} to run with {args.jobs} jobs."
+    )
+    if args.dry_run:
+        for r in recipes:
+            after = ", ".join(p.path.name for p in deps[r.name])
+            print(
+                f"  {r.status:8} {r.input_bytes / 1e9:8.2f} GB  {r.coverage_id:40} {r.name}"
+                + (f"  (after {after})" if after else "")
+            )
+        return 0
+
+    rng = random.Random()
+    running: Dict[Future, Tuple[Recipe, CoverageLock]] = {}
+    busy_coverages = set()
+    t0 = time.monotonic()
+
+    def ready(r: Recipe, now: float) -> bool:
+        return (
+            r.status == PENDING
+            and r.not_before <= now
+            and r.coverage_id not in busy_coverages
+            and all(p.status == DONE for p in deps[r.name])
+        )
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+            while True:
+                # anything waiting on a recipe that gave up can never run
+                for r in recipes:
+                    if r.status == PENDING and any(p.status in {FAILED, SKIPPED} for p in deps[r.name]):
+                        r.status = SKIPPED
+                        journal.write(r, SKIPPED, reason="prerequisite failed")
+                        print(f"[WARN] Skipping {r.name}: a prerequisite failed.")
+
+                now = time.monotonic()
+                for r in recipes:
+                    if len(running) >= args.jobs:
+                        break
+                    if not ready(r, now):
+                        continue
+                    lock = CoverageLock(lock_dir, r.coverage_id)
+                    if not lock.acquire():
+                        # another orchestrator is importing this coverage; look again shortly
+                        r.not_before = now + args.backoff
+                        continue
+                    r.status = RUNNING
+                    r.attempts += 1
+                    r.started = time.monotonic()
+                    busy_coverages.add(r.coverage_id)
+                    journal.write(r, "start")
+                    print(f"[{format_seconds(now - t0)}] start  {r.coverage_id} (attempt {r.attempts}) {r.name}")
+                    cmd = ingest_command(r, wcst_import, wcst_args, env_script)
+                    running[pool.submit(run_one, r, cmd, log_dir / log_name(r), args.timeout)] = (r, lock)
+
+                if not running:
+                    waiting = [r for r in recipes if r.status == PENDING]
+                    if not waiting:
+                        break
+                    time.sleep(max(0.05, min(r.not_before for r in waiting) - time.monotonic()))
+                    continue
+
+                finished, _ = wait(list(running), timeout=1.0, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    r, lock = running.pop(future)
+                    lock.release()
+                    busy_coverages.discard(r.coverage_id)
+                    code = future.result()
+                    took = time.monotonic() - (r.started or time.monotonic())
+                    r.wall_s += took
+                    r.exit_code = code
+                    stamp = format_seconds(time.monotonic() - t0)
+                    if code == 0:
+                        r.status = DONE
+                        journal.write(r, DONE, exit_code=code, seconds=round(took, 1))
+                        print(f"[{stamp}] done   {r.coverage_id} in {format_seconds(took)}")
+                    elif args.max_attempts and r.attempts >= args.max_attempts:
+                        r.status = FAILED
+                        journal.write(r, FAILED, exit_code=code, seconds=round(took, 1))
+                        print(f"[{stamp}] failed {r.coverage_id}: exit {code}, giving up after {r.attempts} attempts")
+                    else:
+                        delay = backoff_delay(r.attempts, args.backoff, args.backoff_max, rng)
+                        r.status = PENDING
+                        r.not_before = time.monotonic() + delay
+                        journal.write(r, "retry", exit_code=code, seconds=round(took, 1), delay=round(delay, 1))
+                        print(f"[{stamp}] retry  {r.coverage_id}: exit {code}, next attempt in {delay:.0f}s")
+    except KeyboardInterrupt:
+        # the pool waits for running imports; their recipes stay unfinished in the journal and rerun next time
+        print("[WARN] Interrupted; rerun the same command to resume.", file=sys.stderr)
+        return 130
+
+    report = Path(args.report) if args.report else state_dir / "ingest_report.csv"
+    with report.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["recipe", "coverage_id", "status", "attempts", "wall_s", "exit_code", "input_bytes"])
+        for r in recipes:
+            resumed_only = r.attempts == 0 and r.status == DONE
+            writer.writerow(
+                [
+                    r.name,
+                    r.coverage_id,
+                    "resumed" if resumed_only else r.status,
+                    r.attempts,
+                    round(r.wall_s, 1),
+                    "" if r.exit_code is None else r.exit_code,
+                    r.input_bytes,
+                ]
+            )
+
+    print(f"\n{'wall time':>10}  {'tries':>5}  {'status':8}  coverage")
+    for r in sorted(recipes, key=lambda r: -r.wall_s):
+        if r.attempts:
+            print(f"{format_seconds(r.wall_s):>10}  {r.attempts:>5}  {r.status:8}  {r.coverage_id}")
+    failed = [r for r in recipes if r.status in {FAILED, SKIPPED}]
+    print(f"Total {format_seconds(time.monotonic() - t0)}; report: {report}")
+    if failed:
+        print(f"[ERROR] {len(failed)} recipe(s) did not finish; see {log_dir}", file=sys.stderr)
+        return 1
+    print("[OK] All recipes ingested.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,208 @@
+"""
+Build wcst_import ingest recipes in Python instead of hand-maintaining JSON variants.
+
+A dataset describes its recipe once (axes, bands, title, styles) and gets both twins from it:
+  wms_twin  the coverage that backs WMS: wms_import on, style hooks, tiling for map slices
+  wcs_twin  the "_wcs" coverage for WCS point/time-series queries: no WMS pyramid or hooks, its own tiling
+Templates with {placeholders} are parsed once and rendered per combination, so regenerating hundreds of recipes
+takes milliseconds and tiling can be changed in one place.
+"""
+
+import copy
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+from urllib.parse import quote
+
+
+DEFAULT_CONFIG = {
+    "service_url": "https://localhost/rasdaman/ows",
+    "tmp_directory": "/tmp/",
+    "mock": False,
+    "automated": True,
+}
+
+# precomputed time positions written next to a NetCDF file, e.g. by daily_wrf_downscaled_era5/combine_netcdfs.py
+TIME_INDEX_SUFFIX = "_time.json"
+
+STYLE_ENDPOINT = "https://datacubes.earthmaps.io/rasdaman/admin/layer/style/add"
+
+# {name} placeholders; ${netcdf:...} expressions and JSON inside hook commands are left alone
+PLACEHOLDER_RE = re.compile(r"(?<!\$)\{(\w+)\}")
+
+
+class Template:
+    """An ingest recipe JSON with {placeholders}, read and parsed once and rendered as often as needed."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.data = json.loads(self.path.read_text(encoding="utf-8"), strict=False)
+
+    def render(self, **values: object) -> dict:
+        """A new recipe with every {name} found in `values` substituted; unknown placeholders stay as they are."""
+        return substitute(self.data, {k: str(v) for k, v in values.items()})
+
+
+def substitute(node: object, values: Dict[str, str]) -> object:
+    if isinstance(node, str):
+        if "{" not in node:
+            return node
+        return PLACEHOLDER_RE.sub(lambda m: values.get(m.group(1), m.group(0)), node)
+    if isinstance(node, dict):
+        return {key: substitute(value, values) for key, value in node.items()}
+    if isinstance(node, list):
+        return [substitute(value, values) for value in node]
+    return node
+
+
+def tiling_clause(extents: Sequence[Optional[int]], tile_size: int, scheme: str = "ALIGNED") -> str:
+    """e.g. tiling_clause([None, 32, 32], 16777216) -> "ALIGNED [0:*, 0:31, 0:31] tile size 16777216"."""
+    axes = ", ".join("0:*" if e is None else f"0:{e - 1}" for e in extents)
+    return f"{scheme} [{axes}] tile size {tile_size}"
+
+
+def regular_axis(variable: str, grid_order: int) -> dict:
+    """A regular axis read from a NetCDF coordinate variable."""
+    return {
+        "min": f"${{netcdf:variable:{variable}:min}}",
+        "max": f"${{netcdf:variable:{variable}:max}}",
+        "resolution": f"${{netcdf:variable:{variable}:resolution}}",
+        "gridOrder": grid_order,
+    }
+
+
+def ansidate_axis(
+    variable: str = "time",
+    grid_order: int = 0,
+    calendar: str = "standard",
+    date_format: str = "%Y-%m-%dT%H:%M",
+    time_index: bool = False,
+) -> dict:
+    """
+    An irregular AnsiDate axis decoded from a CF time variable with netCDF4.num2date. With time_index, the
+    positions are read from a JSON list of timestamps next to each input file (<file name>_time.json), so
+    wcst_import doesn't have to call num2date once per time step.
+    """
+
+    def num2date(value: str) -> str:
+        return (
+            f"netCDF4.num2date({value}, '${{netcdf:variable:{variable}:units}}', calendar='{calendar}')"
+            f'.strftime("{date_format}")'
+        )
+
+    statements = "from datetime import datetime; import netCDF4"
+    positions = f"[{num2date('x')} for x in ${{netcdf:variable:{variable}}}]"
+    if time_index:
+        statements += "; import json; import os"
+        positions = f"json.load(open(os.path.splitext('${{file:path}}')[0] + '{TIME_INDEX_SUFFIX}'))"
+    return {
+        "statements": statements,
+        "min": num2date(f"${{netcdf:variable:{variable}:min}}"),
+        "max": num2date(f"${{netcdf:variable:{variable}:max}}"),
+        "directPositions": positions,
+        "gridOrder": grid_order,
+        "type": "ansidate",
+        "irregular": True,
+    }
+
+
+def band(name: str, identifier: Optional[str] = None, nil_value: Optional[str] = None) -> dict:
+    out = {"name": name, "identifier": identifier or name}
+    if nil_value is not None:
+        out["nilValue"] = nil_value
+    return out
+
+
+def style_hook(
+    coverage_id: str,
+    style_id: str,
+    abstract: str,
+    colormap: Union[dict, str],
+    description: str,
+    wcps: str = "$c",
+) -> dict:
+    """
+    An after_import hook registering a WMS style through rasdaman's admin endpoint, encoded the way
+    utilities/wms_style_hooks/encode_style_ingest.py does it by hand. A colormap given as a string is taken as the
+    JSON text of the color table definition and kept verbatim, for styles whose existing text should not change.
+    """
+    if not isinstance(colormap, str):
+        colormap = json.dumps(colormap, separators=(",", ":"))
+    colortable = colormap.replace('"', '\\"')
+    url = (
+        f"{STYLE_ENDPOINT}?COVERAGEID={coverage_id}&STYLEID={style_id}&ABSTRACT={quote(abstract, safe='()')}"
+        f"&WCPSQUERYFRAGMENT={quote(wcps, safe='')}&COLORTABLETYPE=ColorMap&"
+    )
+    cmd = f'. /etc/default/rasdaman; curl --user $RASCURL "{url}" --data-urlencode "COLORTABLEDEFINITION={colortable}"'
+    return {
+        "description": description,
+        "when": "after_import",
+        "cmd": cmd,
+        "abort_on_error": True,
+    }
+
+
+def netcdf_recipe(
+    coverage_id: str,
+    paths: List[str],
+    crs: str,
+    axes: Dict[str, dict],
+    bands: List[dict],
+    title: str,
+    tiling: Optional[str] = None,
+    config: Optional[dict] = None,
+    import_order: str = "ascending",
+    metadata: Optional[Dict[str, str]] = None,
+) -> dict:
+    """A general_coverage recipe with a NetCDF slicer. Use wms_twin/wcs_twin for the WMS and WCS variants."""
+    options: dict = {"import_order": import_order}
+    if tiling:
+        options["tiling"] = tiling
+    options["coverage"] = {
+        "crs": crs,
+        "metadata": {"type": "xml", "global": {"Title": title, **(metadata or {})}},
+        "slicer": {"type": "netcdf", "pixelIsPoint": True, "bands": bands, "axes": axes},
+    }
+    return {
+        "config": copy.deepcopy(config if config is not None else DEFAULT_CONFIG),
+        "input": {"coverage_id": coverage_id, "paths": list(paths)},
+        "recipe": {"name": "general_coverage", "options": options},
+    }
+
+
+def with_tiling(options: dict, tiling: Optional[str]) -> dict:
+    out = {k: v for k, v in options.items() if k != "coverage"}
+    if tiling:
+        out["tiling"] = tiling
+    out["coverage"] = options["coverage"]
+    return out
+
+
+def wms_twin(recipe: dict, tiling: Optional[str], hooks: Sequence[dict] = ()) -> dict:
+    """The WMS-optimized coverage: same coverage ID, wms_import on, the given style hooks (added to any the recipe
+    already has) and tiling."""
+    out = copy.deepcopy(recipe)
+    hooks = out.get("hooks", []) + list(hooks)
+    options = out["recipe"]["options"]
+    options = with_tiling({k: v for k, v in options.items() if k != "wms_import"}, tiling)
+    out["recipe"]["options"] = {"wms_import": True, **options}
+    ordered = {"config": out["config"]}
+    if hooks:
+        ordered["hooks"] = list(hooks)
+    ordered.update((k, v) for k, v in out.items() if k not in {"config", "hooks"})
+    return ordered
+
+
+def wcs_twin(recipe: dict, tiling: Optional[str], suffix: str = "_wcs") -> dict:
+    """The WCS-optimized coverage: coverage ID + suffix, no WMS import or hooks, its own tiling."""
+    out = copy.deepcopy(recipe)
+    out.pop("hooks", None)
+    out["input"]["coverage_id"] += suffix
+    options = {k: v for k, v in out["recipe"]["options"].items() if k != "wms_import"}
+    out["recipe"]["options"] = with_tiling(options, tiling)
+    return out
+
+
+def write_recipe(recipe: dict, path: Union[str, Path], indent: int = 4) -> None:
+    Path(path).write_text(json.dumps(recipe, indent=indent) + "\n", encoding="utf-8")